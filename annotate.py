@@ -0,0 +1,328 @@
+# annotate.py
+"""
+文章标注：把一篇英文文章中的每个单词标注上词典释义
+
+用法:
+    python annotate.py article.txt                  # 每个单词一行 JSON
+    python annotate.py article.txt --vocab          # 生词表：按首次出现的顺序，每个单词一行
+    python annotate.py article.txt --fetch          # 本地未收录的单词在后台在线抓取
+    python annotate.py article.txt --vocab --fetch --fetch-timeout 30   # 最后最多再等 30 秒，Ctrl-C 立即停止
+
+流水线（逐行读取，整个过程是生成器，不会把输入全部读入内存）:
+    分词 -> 词形还原（规则 + 常见不规则变化，生成候选原形）-> 去重
+    -> 批量查询数据库（lookup_many）-> 未收录的单词交给爬虫在后台抓取
+已收录的单词立即返回；未收录的单词随标注一起返回一个 Future，抓取完成后得到 WordSnapshot。
+"""
+import argparse
+import json
+import re
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+
+from database import normalize_word, lookup_many
+from lookup import fetch_and_store
+
+# 字母开头，允许内部的撇号和连字符（don't, well-known）
+TOKEN_RE = re.compile(r"[A-Za-z]+(?:['’\-][A-Za-z]+)*")
+
+# token: 原文中的单词；line/start: 所在行号（从 1 开始）和行内位置；
+# word: 查到的词条（原形）；snapshot: WordSnapshot，未收录时为 None；
+# future: 正在后台抓取时为 concurrent.futures.Future（结果为 WordSnapshot 或 None）
+Annotation = namedtuple('Annotation', ['token', 'line', 'start', 'word', 'snapshot', 'future'])
+
+# 规则无法还原的常见不规则变化
+IRREGULAR = {
+    'am': 'be', 'is': 'be', 'are': 'be', 'was': 'be', 'were': 'be', 'been': 'be', 'being': 'be',
+    'has': 'have', 'had': 'have', 'does': 'do', 'did': 'do', 'done': 'do',
+    'went': 'go', 'gone': 'go', 'made': 'make', 'said': 'say', 'took': 'take', 'taken': 'take',
+    'came': 'come', 'saw': 'see', 'seen': 'see', 'knew': 'know', 'known': 'know',
+    'got': 'get', 'gotten': 'get', 'gave': 'give', 'given': 'give', 'found': 'find',
+    'thought': 'think', 'told': 'tell', 'became': 'become', 'left': 'leave', 'felt': 'feel',
+    'brought': 'bring', 'began': 'begin', 'begun': 'begin', 'kept': 'keep', 'held': 'hold',
+    'wrote': 'write', 'written': 'write', 'stood': 'stand', 'heard': 'hear', 'meant': 'mean',
+    'met': 'meet', 'ran': 'run', 'paid': 'pay', 'sat': 'sit', 'spoke': 'speak', 'spoken': 'speak',
+    'led': 'lead', 'grew': 'grow', 'grown': 'grow', 'lost': 'lose', 'fell': 'fall', 'fallen': 'fall',
+    'sent': 'send', 'built': 'build', 'understood': 'understand', 'drew': 'draw', 'drawn': 'draw',
+    'broke': 'break', 'broken': 'break', 'spent': 'spend', 'rose': 'rise', 'risen': 'rise',
+    'drove': 'drive', 'driven': 'drive', 'bought': 'buy', 'wore': 'wear', 'worn': 'wear',
+    'chose': 'choose', 'chosen': 'choose', 'sought': 'seek', 'taught': 'teach', 'caught': 'catch',
+    'fought': 'fight', 'ate': 'eat', 'eaten': 'eat', 'flew': 'fly', 'flown': 'fly',
+    'men': 'man', 'women': 'woman', 'children': 'child', 'people': 'person', 'feet': 'foot',
+    'teeth': 'tooth', 'mice': 'mouse', 'geese': 'goose', 'better': 'good', 'best': 'good',
+    'worse': 'bad', 'worst': 'bad',
+}
+
+VOWELS = set('aeiou')
+
+
+def iter_tokens(lines):
+    """
+    分词
+    :param lines: 文本行的可迭代对象（例如打开的文件）
+    :return: (单词, 行号, 行内位置) 的生成器
+    """
+    for number, line in enumerate(lines, 1):
+        for match in TOKEN_RE.finditer(line):
+            yield match.group(), number, match.start()
+
+
+def lemma_candidates(word):
+    """
+    词形还原：按可能性从高到低返回候选原形（第一个是单词本身）
+    规则只生成候选，由数据库中实际收录的词条决定采用哪一个
+    :param word: 规范化后的单词
+    :return: 候选列表
+    """
+    word = word.replace('’', "'")
+    if word.endswith("'s"):
+        word = word[:-2]
+    word = word.rstrip("'")
+    candidates = [word]
+
+    def add(form):
+        if len(form) >= 2 and form not in candidates:
+            candidates.append(form)
+
+    if word in IRREGULAR:
+        add(IRREGULAR[word])
+    n = len(word)
+    if n > 4 and word.endswith('ies'):
+        add(word[:-3] + 'y')                       # studies -> study
+    if n > 3 and word.endswith('es'):
+        add(word[:-2])                             # boxes -> box
+    if n > 3 and word.endswith('s') and not word.endswith('ss'):
+        add(word[:-1])                             # words -> word
+    if n > 4 and word.endswith('ied'):
+        add(word[:-3] + 'y')                       # studied -> study
+    if n > 3 and word.endswith('ed'):
+        stem = word[:-2]
+        add(word[:-1])                             # hoped -> hope
+        add(stem)                                  # worked -> work
+        if len(stem) > 2 and stem[-1] == stem[-2] and stem[-1] not in VOWELS:
+            add(stem[:-1])                         # stopped -> stop
+    if n > 4 and word.endswith('ing'):
+        stem = word[:-3]
+        add(stem)                                  # working -> work
+        add(stem + 'e')                            # making -> make
+        if len(stem) > 2 and stem[-1] == stem[-2] and stem[-1] not in VOWELS:
+            add(stem[:-1])                         # running -> run
+    for suffix in ('est', 'er'):
+        if n > len(suffix) + 2 and word.endswith(suffix):
+            stem = word[:-len(suffix)]
+            add(stem[:-1] + 'y' if stem.endswith('i') else stem)  # happier -> happy, faster -> fast
+            add(stem + 'e')                        # later -> late
+            if len(stem) > 2 and stem[-1] == stem[-2] and stem[-1] not in VOWELS:
+                add(stem[:-1])                     # bigger -> big
+    if n > 4 and word.endswith('ly'):
+        add(word[:-3] + 'y' if word.endswith('ily') else word[:-2])  # happily -> happy, quickly -> quick
+    return candidates
+
+
+class Annotator:
+    """
+    流式标注器
+    按批处理单词：同一批中的不同单词及其候选原形只查询一次数据库（lookup_many），
+    已解析的单词保存在有界的 LRU 中，后续出现时不再查询；未收录的单词交给爬虫在后台抓取。
+    排队和进行中的抓取数有上限，达到上限时标注暂停，等有抓取完成后再继续（背压）
+    """
+
+    def __init__(self, spider=None, batch_size=2000, fetch_workers=2, cache_size=50000, max_pending=32):
+        """
+        :param spider: OnlineDictionarySpider 实例；为 None 时只查本地数据库
+        :param batch_size: 每批处理的单词数（决定一次批量查询覆盖的范围和缓冲的内存）
+        :param fetch_workers: 后台抓取线程数（实际速率由爬虫的限速器控制）
+        :param cache_size: 已解析单词的缓存条数
+        :param max_pending: 排队和进行中的抓取数上限
+        """
+        self.spider = spider
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self._resolved = OrderedDict()  # 规范化单词 -> (词条, WordSnapshot 或 None, Future 或 None)
+        self._seen = set()  # 解析过的规范化单词（LRU 淘汰后再次解析时不重复计入 unique）
+        self._executor = ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix='annotate') \
+            if spider is not None else None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = set()  # 尚未完成的抓取
+        self._pending_lock = threading.Lock()
+        self.stats = {"tokens": 0, "unique": 0, "lookups": 0, "fetches": 0}
+
+    def _fetch(self, word):
+        return fetch_and_store(self.spider, word).snapshot
+
+    def _submit_fetch(self, word):
+        """ 提交后台抓取；在途抓取数达到上限时阻塞，直到有抓取完成 """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._fetch, word)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._pending_lock:
+            self._pending.add(future)
+        future.add_done_callback(self._fetch_done)
+        self.stats["fetches"] += 1
+        return future
+
+    def _fetch_done(self, future):
+        with self._pending_lock:
+            self._pending.discard(future)
+        self._slots.release()
+
+    def _resolve(self, keys):
+        """ 批量解析一批新出现的单词 """
+        candidates = {key: lemma_candidates(key) for key in keys}
+        forms = list(dict.fromkeys(form for forms in candidates.values() for form in forms))
+        found, _ = lookup_many(forms)
+        self.stats["lookups"] += 1
+        for key in keys:
+            if key not in self._seen:
+                self._seen.add(key)
+                self.stats["unique"] += 1
+        for key, forms in candidates.items():
+            lemma = next((form for form in forms if form in found), None)
+            if lemma is not None:
+                entry = (lemma, found[lemma], None)
+            elif self._executor is not None:
+                # 抓取原词形：词典网站会自动跳转到原形词条
+                entry = (forms[0], None, self._submit_fetch(forms[0]))
+            else:
+                entry = (forms[0], None, None)
+            self._remember(key, entry)
+
+    def _remember(self, key, entry):
+        self._resolved[key] = entry
+        while len(self._resolved) > self.cache_size:
+            self._resolved.popitem(last=False)
+
+    def _lookup(self, key):
+        entry = self._resolved.get(key)
+        if entry is None:
+            return None
+        self._resolved.move_to_end(key)
+        lemma, snapshot, future = entry
+        if future is not None and future.done():
+            # 抓取已经完成：之后出现的同一单词直接带上结果
+            snapshot = None if future.exception() else future.result()
+            entry = (lemma, snapshot, None)
+            self._resolved[key] = entry
+        return entry
+
+    def _flush(self, batch):
+        new = list(dict.fromkeys(
+            key for key in (normalize_word(token) for token, _, _ in batch) if key not in self._resolved
+        ))
+        if new:
+            self._resolve(new)
+        for token, line, start in batch:
+            key = normalize_word(token)
+            entry = self._lookup(key)
+            if entry is None:
+                # 同一批中的单词在解析后又被 LRU 淘汰（批大小超过缓存容量时），单独解析
+                self._resolve([key])
+                entry = self._lookup(key)
+            lemma, snapshot, future = entry
+            yield Annotation(token, line, start, lemma, snapshot, future)
+
+    def annotate(self, lines):
+        """
+        标注文本
+        :param lines: 文本行的可迭代对象
+        :return: Annotation 生成器（顺序与原文一致）
+        """
+        batch = []
+        for token in iter_tokens(lines):
+            batch.append(token)
+            self.stats["tokens"] += 1
+            if len(batch) >= self.batch_size:
+                yield from self._flush(batch)
+                batch = []
+        if batch:
+            yield from self._flush(batch)
+
+    def close(self, wait=True, timeout=None):
+        """
+        :param wait: 是否等待进行中的抓取完成（False 时取消尚未开始的抓取）
+        :param timeout: 等待的最长时间(秒)，超时后取消尚未开始的抓取（已开始的最多 fetch_workers 个仍会完成）
+        :return: 被取消的抓取数
+        """
+        if self._executor is None:
+            return 0
+        if wait and timeout is not None:
+            with self._pending_lock:
+                pending = list(self._pending)
+            wait_futures(pending, timeout)
+            wait = False
+        with self._pending_lock:
+            pending = list(self._pending)
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+        return sum(1 for future in pending if future.cancelled())
+
+
+def summarize(snapshot, width=80):
+    """ 释义的第一行，用于输出 """
+    if snapshot is None or not snapshot.definition:
+        return None
+    first = snapshot.definition.strip().splitlines()[0]
+    return first if len(first) <= width else first[:width - 1] + "…"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="英文文章单词标注")
+    parser.add_argument('path', help="文本文件路径，- 表示标准输入")
+    parser.add_argument('--vocab', action='store_true', help="只输出生词表（每个词条一行，附出现次数）")
+    parser.add_argument('--fetch', action='store_true', help="在线抓取本地未收录的单词")
+    parser.add_argument('--fetch-timeout', type=float, default=60,
+                        help="标注结束后等待剩余抓取的最长时间(秒)，超时的单词按未收录输出")
+    parser.add_argument('--max-pending', type=int, default=32, help="排队和进行中的抓取数上限")
+    parser.add_argument('--batch-size', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    spider = None
+    if args.fetch:
+        from spider import OnlineDictionarySpider
+        spider = OnlineDictionarySpider()
+    annotator = Annotator(spider, batch_size=args.batch_size, max_pending=args.max_pending)
+    source = sys.stdin if args.path == '-' else open(args.path, encoding='utf-8')
+    vocab = OrderedDict()  # 词条 -> [次数, 快照, Future]
+    interrupted = False
+    cancelled = 0
+    try:
+        for annotation in annotator.annotate(source):
+            if args.vocab:
+                item = vocab.setdefault(annotation.word, [0, annotation.snapshot, annotation.future])
+                item[0] += 1
+                continue
+            print(json.dumps({
+                "line": annotation.line,
+                "start": annotation.start,
+                "token": annotation.token,
+                "word": annotation.word,
+                "definition": summarize(annotation.snapshot),
+                "pending": annotation.future is not None
+            }, ensure_ascii=False))
+    except KeyboardInterrupt:
+        interrupted = True  # Ctrl-C：不再等待抓取，已有的结果照常输出
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        try:
+            cancelled = annotator.close(wait=not interrupted, timeout=args.fetch_timeout)
+        except KeyboardInterrupt:
+            interrupted = True
+            cancelled = annotator.close(wait=False)
+
+    for word, (count, snapshot, future) in vocab.items():
+        if snapshot is None and future is not None and future.done() and not future.cancelled() \
+                and not future.exception():
+            snapshot = future.result()
+        print(f"{word}\t{count}\t{summarize(snapshot) or '（未收录）'}")
+    print(f"共 {annotator.stats['tokens']} 个单词，{annotator.stats['unique']} 个不同词形，"
+          f"在线抓取 {annotator.stats['fetches']} 个" + (f"（{cancelled} 个未完成已取消）" if cancelled else ""),
+          file=sys.stderr)
+    return 130 if interrupted else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,306 @@
+# backends.py
+"""
+词典数据源
+
+本地数据源（离线词典文件）:
+    EcdictBackend    - ECDICT 的 CSV 版本（https://github.com/skywind3000/ECDICT）
+    StarDictBackend  - StarDict 词典（.ifo / .idx / .dict[.dz]）
+    OfflineDictBackend - 由 offline_dict.py 生成的内存映射词典（.wdict）
+在线数据源:
+    HtmlBackend      - 网页词典（地址前缀 + 页面解析函数），由 OnlineDictionarySpider 负责下载、限速和重试
+
+所有数据源返回与爬虫相同的结果格式 {"definitions": [...], "examples": [...]}，查不到时返回 {"error": ...}
+"""
+import csv
+import gzip
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from itertools import zip_longest
+from urllib.parse import quote
+
+from lxml import html as lxml_html
+
+from parsers import MAX_DEFINITIONS, get_parser
+
+NOT_FOUND = {"error": "单词不存在"}
+
+
+class DictionaryBackend:
+    """ 数据源接口 """
+    name = 'backend'
+    local = True  # 本地数据源同步查询，在线数据源由爬虫下载
+
+    def lookup(self, word):
+        """
+        查询单词
+        :param word: 规范化后的单词
+        :return: 结果字典，查不到时返回 {"error": ...}
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class HtmlBackend(DictionaryBackend):
+    """ 网页词典：只描述地址和解析方式，下载由爬虫完成 """
+    local = False
+
+    def __init__(self, name, base_url, parser):
+        """
+        :param name: 数据源名称
+        :param base_url: 页面地址前缀，后面拼接URL编码后的单词
+        :param parser: 解析模式名称（见 parsers.PARSERS）或 html -> 结果字典 的函数
+        """
+        self.name = name
+        self.base_url = base_url
+        self.parse = get_parser(parser) if isinstance(parser, str) else parser
+
+    def url(self, word):
+        return self.base_url + quote(word.lower())
+
+    def lookup(self, word):
+        raise TypeError("在线数据源需要通过 OnlineDictionarySpider 查询")
+
+
+def _build_result(english_lines, chinese_lines):
+    """ 把英文释义和中文翻译逐行配对，生成与网页解析相同格式的结果 """
+    definitions = [
+        "\n".join(part for part in pair if part)
+        for pair in zip_longest(english_lines, chinese_lines, fillvalue="")
+    ][:MAX_DEFINITIONS]
+    if not definitions:
+        return dict(NOT_FOUND)
+    return {"definitions": definitions, "examples": []}
+
+
+class _SortedIndex:
+    """ 有序单词数组 + 偏移量数组，二分查找；比 dict 占用的内存少得多 """
+
+    def __init__(self, entries):
+        """ :param entries: (小写单词, 偏移量, 长度) 序列 """
+        entries = sorted(entries)
+        self.words = [e[0] for e in entries]
+        self.offsets = array('q', (e[1] for e in entries))
+        self.sizes = array('q', (e[2] for e in entries))
+
+    def find(self, word):
+        i = bisect_left(self.words, word)
+        if i < len(self.words) and self.words[i] == word:
+            return self.offsets[i], self.sizes[i]
+        return None
+
+    def __len__(self):
+        return len(self.words)
+
+
+class EcdictBackend(DictionaryBackend):
+    """
+    ECDICT CSV 词典
+    首次查询时扫描一遍文件，只在内存中保存 单词 -> 行偏移 的有序索引，查询时按偏移读取该行
+    """
+    name = 'ecdict'
+
+    def __init__(self, path):
+        self.path = path
+        self._index = None
+        self._columns = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with open(self.path, 'rb') as f:
+            header = f.readline()
+            self._columns = next(csv.reader([header.decode('utf-8-sig')]))
+            entries = []
+            offset = f.tell()
+            for line in iter(f.readline, b''):
+                end = offset + len(line)
+                word = line.split(b',', 1)[0].strip(b'"').decode('utf-8', 'replace').strip().lower()
+                if word:
+                    entries.append((word, offset, end - offset))
+                offset = end
+        self._index = _SortedIndex(entries)
+        self._file = open(self.path, 'rb')
+
+    def _read_row(self, offset, size):
+        self._file.seek(offset)
+        line = self._file.read(size).decode('utf-8')
+        row = next(csv.reader([line]))
+        return dict(zip(self._columns, row))
+
+    def lookup(self, word):
+        with self._lock:
+            if self._index is None:
+                self._load()
+            found = self._index.find(word.lower())
+            if found is None:
+                return dict(NOT_FOUND)
+            row = self._read_row(*found)
+        # ECDICT 字段中的换行写作字面的 \n
+        english = [s.strip() for s in row.get('definition', '').split('\\n') if s.strip()]
+        chinese = [s.strip() for s in row.get('translation', '').split('\\n') if s.strip()]
+        return _build_result(english, chinese)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class StarDictBackend(DictionaryBackend):
+    """
+    StarDict 词典
+    .idx 中的索引读入内存（有序数组），.dict 按偏移读取；.dict.dz 首次使用时整体解压
+    """
+    name = 'stardict'
+
+    def __init__(self, ifo_path):
+        """ :param ifo_path: .ifo 文件路径，同目录下需要有同名的 .idx 和 .dict / .dict.dz """
+        self.ifo_path = ifo_path
+        self.base = ifo_path[:-len('.ifo')] if ifo_path.endswith('.ifo') else ifo_path
+        self.info = {}
+        self._index = None
+        self._data = None  # 解压后的 .dict.dz 内容
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with open(self.base + '.ifo', encoding='utf-8') as f:
+            for line in f:
+                key, sep, value = line.strip().partition('=')
+                if sep:
+                    self.info[key] = value
+        offset_format = '>Q' if self.info.get('idxoffsetbits') == '64' else '>I'
+        offset_size = struct.calcsize(offset_format)
+
+        idx_path = self.base + '.idx'
+        if os.path.exists(idx_path):
+            with open(idx_path, 'rb') as f:
+                idx = f.read()
+        else:
+            with gzip.open(idx_path + '.gz', 'rb') as f:
+                idx = f.read()
+
+        entries = []
+        pos = 0
+        while pos < len(idx):
+            end = idx.index(b'\0', pos)
+            word = idx[pos:end].decode('utf-8', 'replace').lower()
+            pos = end + 1
+            (offset,) = struct.unpack_from(offset_format, idx, pos)
+            (size,) = struct.unpack_from('>I', idx, pos + offset_size)
+            pos += offset_size + 4
+            entries.append((word, offset, size))
+        self._index = _SortedIndex(entries)
+
+        if os.path.exists(self.base + '.dict'):
+            self._file = open(self.base + '.dict', 'rb')
+        else:
+            with gzip.open(self.base + '.dict.dz', 'rb') as f:
+                self._data = f.read()
+
+    def _read(self, offset, size):
+        if self._data is not None:
+            return self._data[offset:offset + size]
+        self._file.seek(offset)
+        return self._file.read(size)
+
+    def _fields(self, data):
+        """ 按 sametypesequence 拆分词条数据，返回 (类型, 文本) 列表 """
+        types = self.info.get('sametypesequence')
+        fields = []
+        if types:
+            pos = 0
+            for i, t in enumerate(types):
+                last = i == len(types) - 1
+                if t.islower():
+                    end = len(data) if last else data.index(b'\0', pos)
+                    fields.append((t, data[pos:end]))
+                    pos = end + 1
+                else:
+                    size = len(data) - pos if last else struct.unpack_from('>I', data, pos)[0]
+                    pos += size if last else 4 + size
+        else:
+            pos = 0
+            while pos < len(data):
+                t = chr(data[pos])
+                pos += 1
+                if t.islower():
+                    end = data.find(b'\0', pos)
+                    end = len(data) if end < 0 else end
+                    fields.append((t, data[pos:end]))
+                    pos = end + 1
+                else:
+                    (size,) = struct.unpack_from('>I', data, pos)
+                    pos += 4 + size
+        return fields
+
+    def _text(self, field_type, raw):
+        text = raw.decode('utf-8', 'replace')
+        if field_type in 'hgx':  # HTML / Pango / XDXF 标记，只保留文本
+            text = lxml_html.fromstring(f"<div>{text.replace('<br>', chr(10))}</div>").text_content()
+        return text
+
+    def lookup(self, word):
+        with self._lock:
+            if self._index is None:
+                self._load()
+            found = self._index.find(word.lower())
+            if found is None:
+                return dict(NOT_FOUND)
+            data = self._read(*found)
+        lines = []
+        for field_type, raw in self._fields(data):
+            if field_type in 'mtyhgxlk':
+                lines.extend(s.strip() for s in self._text(field_type, raw).splitlines() if s.strip())
+        return _build_result([], lines)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class OfflineDictBackend(DictionaryBackend):
+    """ offline_dict.py 生成的 .wdict 文件 """
+    name = 'wdict'
+
+    def __init__(self, path):
+        from offline_dict import OfflineDictionary
+        self._dictionary = OfflineDictionary(path)
+
+    def lookup(self, word):
+        entry = self._dictionary.get(word.lower())
+        if entry is None or not entry.definition:
+            return dict(NOT_FOUND)
+        # 保存的是 words 表中已合并的释义文本，作为一条释义返回
+        return {"definitions": [entry.definition], "examples": []}
+
+    def close(self):
+        self._dictionary.close()
+
+
+def open_backend(path):
+    """
+    按文件类型打开本地词典
+    :param path: ECDICT 的 .csv 文件、StarDict 的 .ifo 文件或离线词典 .wdict 文件
+    """
+    if path.lower().endswith('.csv'):
+        return EcdictBackend(path)
+    if path.lower().endswith('.ifo'):
+        return StarDictBackend(path)
+    if path.lower().endswith('.wdict'):
+        return OfflineDictBackend(path)
+    raise ValueError(f"不支持的词典文件: {path}（支持 ECDICT .csv、StarDict .ifo 和 .wdict）")
+
+
+def backends_from_env(variable='DICTIONARY_LOCAL_DICTS'):
+    """ 从环境变量读取本地词典列表（多个路径用 os.pathsep 分隔） """
+    paths = os.environ.get(variable, '')
+    return [open_backend(p) for p in paths.split(os.pathsep) if p.strip()]
@@ -0,0 +1,14 @@
+# benchmarks/_util.py
+"""
+基准脚本共用的小工具（脚本从 benchmarks/ 目录直接运行，按 `from _util import ...` 导入）
+"""
+import os
+
+
+def rss_kb():
+    """ 当前常驻内存(KB)，不支持时返回 None """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, AttributeError):
+        return None
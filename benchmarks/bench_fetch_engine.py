@@ -0,0 +1,166 @@
+# benchmarks/bench_fetch_engine.py
+"""
+抓取引擎验证：在本地替身 HTTP 服务器上检查 ThreadedFetchEngine 和同步接口的行为
+
+    python benchmarks/bench_fetch_engine.py --requests 200 --concurrency 8 --rate 100
+
+替身服务器（HTTP/1.1 长连接）按 /dict/<单词> 返回 benchmarks/pages/ 中的样例页面，
+未收录的单词返回 404，/dict/throttled 第一次请求返回 429（带 Retry-After）。依次检查:
+    1. fetch_many 的结果与黄金文件一致，长连接被复用（新建连接数不超过并发数）
+    2. 服务器观察到的请求速率不超过令牌桶的速率
+    3. 404 转换为“单词不存在”，429 按 Retry-After 等待后重试成功
+    4. 同步接口 fetch_definition 在同一个爬虫上正常工作
+    5. 抓取期间事件循环没有被阻塞（下载在线程中进行，记录事件循环的最大延迟）
+任何一项不满足时以非零状态退出。
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages')
+WORDS = ['ambition', 'synchronize', 'set', 'whitespace']
+
+
+class StandInServer(ThreadingHTTPServer):
+    """ 词典网站的替身：统计新建连接数和每个请求的到达时间 """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.arrivals = []
+        self.hits = {}
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/dict/"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # 长连接
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        word = self.path.rsplit('/', 1)[-1]
+        with self.server.lock:
+            self.server.arrivals.append(time.monotonic())
+            hits = self.server.hits[word] = self.server.hits.get(word, 0) + 1
+        if word == 'throttled' and hits == 1:
+            self.reply(429, b'slow down', {'Retry-After': '0.2'})
+            return
+        path = os.path.join(PAGES_DIR, ('ambition' if word == 'throttled' else word) + '.html')
+        if not os.path.exists(path):
+            self.reply(404, b'not found')
+            return
+        with open(path, 'rb') as f:
+            self.reply(200, f.read(), {'Content-Type': 'text/html; charset=utf-8'})
+
+    def reply(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def golden(word):
+    with open(os.path.join(PAGES_DIR, word + '.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+async def fetch_with_lag(engine, words):
+    """ 并发抓取，同时每 5 毫秒检查一次事件循环的调度延迟 """
+    lag = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal lag
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lag = max(lag, time.perf_counter() - start - 0.005)
+
+    task = asyncio.create_task(ticker())
+    try:
+        return await engine.fetch_many(words), lag
+    finally:
+        done = True
+        await task
+
+
+def main():
+    parser = argparse.ArgumentParser(description="抓取引擎验证（本地替身服务器）")
+    parser.add_argument('--requests', type=int, default=200, help="fetch_many 抓取的单词数")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=100, help="令牌桶速率（每秒请求数）")
+    args = parser.parse_args()
+
+    from rate_limit import AdaptiveRateLimiter, RetryPolicy
+    from spider import OnlineDictionarySpider, ThreadedFetchEngine
+
+    server = StandInServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    failures = []
+
+    def check(ok, message):
+        print(f"[{'通过' if ok else '失败'}] {message}")
+        if not ok:
+            failures.append(message)
+
+    try:
+        spider = OnlineDictionarySpider(
+            base_url=server.base_url, parser='lxml', pool_size=args.concurrency,
+            limiter=AdaptiveRateLimiter(args.rate, max_rate=args.rate),  # 固定速率上限，便于检查
+            retry_policy=RetryPolicy(base_delay=0.05)
+        )
+        engine = ThreadedFetchEngine(spider, args.concurrency)
+        words = [WORDS[i % len(WORDS)] for i in range(args.requests)]
+
+        start = time.perf_counter()
+        results, lag = asyncio.run(fetch_with_lag(engine, words))
+        elapsed = time.perf_counter() - start
+        mismatched = [w for w, r in zip(words, results) if r != golden(w)]
+        check(not mismatched, f"{len(words)} 个结果与黄金文件一致（不一致 {len(mismatched)} 个）")
+        check(server.connections <= args.concurrency,
+              f"新建连接 {server.connections} 个，不超过并发数 {args.concurrency}（长连接复用）")
+
+        arrivals = server.arrivals
+        observed = (len(arrivals) - 1) / (arrivals[-1] - arrivals[0]) if len(arrivals) > 1 else 0
+        check(observed <= args.rate * 1.1,
+              f"服务器观察到的速率 {observed:.1f} 请求/秒，令牌桶速率 {args.rate:.0f}（用时 {elapsed:.2f} 秒）")
+        check(lag < 0.05, f"抓取期间事件循环的最大调度延迟 {lag * 1000:.1f} ms")
+
+        missing, throttled = asyncio.run(engine.fetch_many(['nosuchword', 'throttled']))
+        check(missing == {"error": "单词不存在"}, f"404 -> {missing}")
+        check(throttled == golden('ambition') and server.hits.get('throttled') == 2,
+              f"429 + Retry-After 后重试成功（请求 {server.hits.get('throttled')} 次）")
+
+        check(spider.fetch_definition('synchronize') == golden('synchronize'), "同步接口 fetch_definition")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    if failures:
+        print(f"{len(failures)} 项检查失败")
+        sys.exit(1)
+    print("全部检查通过")
+
+
+if __name__ == '__main__':
+    main()
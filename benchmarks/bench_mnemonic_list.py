@@ -0,0 +1,122 @@
+# benchmarks/bench_mnemonic_list.py
+"""
+记忆方法列表刷新耗时对比：每条一个控件的 QListWidget vs 模型/视图
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_mnemonic_list.py --sizes 10 1000 10000
+
+旧方案按原先 MnemonicItem 的结构为每条记忆方法创建一个带样式表和布局的控件；
+新方案使用 MnemonicListModel + MnemonicDelegate。计时包括首次绘制完成。
+旧方案在 10000 条时需要数分钟，默认跳过，可用 --skip-legacy-above 调整。
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import Qt  # noqa: E402
+from PyQt5.QtWidgets import (  # noqa: E402
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+    QListWidget, QListWidgetItem, QListView
+)
+
+from database import MnemonicSnapshot  # noqa: E402
+from mnemonic_view import MnemonicListModel, MnemonicDelegate  # noqa: E402
+
+
+class LegacyMnemonicItem(QWidget):
+    """ 旧方案的条目控件（结构与原 MnemonicItem 相同） """
+
+    def __init__(self, mnemonic):
+        super().__init__()
+        layout = QHBoxLayout()
+        layout.setContentsMargins(10, 5, 10, 5)
+        vote_layout = QVBoxLayout()
+        button = QPushButton("▲")
+        button.setFixedSize(30, 30)
+        button.setStyleSheet("QPushButton { background: #e9ecef; border-radius: 5px; font-weight: bold; }"
+                             "QPushButton:hover { background: #dee2e6; }")
+        vote_label = QLabel(str(mnemonic.votes))
+        vote_label.setAlignment(Qt.AlignCenter)
+        vote_label.setStyleSheet("color: #495057;")
+        vote_layout.addWidget(button)
+        vote_layout.addWidget(vote_label)
+        layout.addLayout(vote_layout)
+        content_layout = QVBoxLayout()
+        content_layout.addWidget(QLabel(f"[{mnemonic.method_type}]", styleSheet="color: #6c757d; font-size: 12px;"))
+        content_label = QLabel(mnemonic.content)
+        content_label.setWordWrap(True)
+        content_label.setStyleSheet("font-size: 14px; color: #212529;")
+        content_layout.addWidget(content_label)
+        layout.addLayout(content_layout)
+        self.setLayout(layout)
+        self.setStyleSheet("background: #fff; border-radius: 8px;")
+
+
+def make_mnemonics(n):
+    return [
+        MnemonicSnapshot(i, 1, '联想法', f'第 {i} 条记忆方法：am(上午) + bit(一点) + ion(离子) → 上午一点离子实验激发雄心', n - i)
+        for i in range(n)
+    ]
+
+
+def refresh_legacy(view, mnemonics, app):
+    start = time.perf_counter()
+    view.clear()
+    for m in mnemonics:
+        item = QListWidgetItem()
+        widget = LegacyMnemonicItem(m)
+        view.addItem(item)
+        view.setItemWidget(item, widget)
+        item.setSizeHint(widget.sizeHint())
+    app.processEvents()
+    view.viewport().repaint()
+    return time.perf_counter() - start
+
+
+def refresh_model(view, model, mnemonics, app):
+    start = time.perf_counter()
+    model.set_mnemonics(1, mnemonics, exhausted=True)
+    app.processEvents()
+    view.viewport().repaint()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="记忆方法列表刷新耗时对比")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000])
+    parser.add_argument('--skip-legacy-above', type=int, default=1000,
+                        help="超过该条数时跳过旧方案（旧方案在大列表上非常慢）")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    legacy_view = QListWidget()
+    legacy_view.resize(780, 400)
+    legacy_view.show()
+
+    model = MnemonicListModel()
+    model_view = QListView()
+    model_view.setModel(model)
+    model_view.setItemDelegate(MnemonicDelegate(model_view))
+    model_view.setResizeMode(QListView.Adjust)
+    model_view.setLayoutMode(QListView.Batched)
+    model_view.resize(780, 400)
+    model_view.show()
+    app.processEvents()
+
+    print(f"{'条数':>8} {'控件列表':>12} {'模型/视图':>12}")
+    for n in args.sizes:
+        mnemonics = make_mnemonics(n)
+        if n <= args.skip_legacy_above:
+            legacy = f"{refresh_legacy(legacy_view, mnemonics, app) * 1000:10.1f}ms"
+        else:
+            legacy = f"{'跳过':>10}"
+        modern = refresh_model(model_view, model, mnemonics, app)
+        print(f"{n:>8} {legacy:>12} {modern * 1000:10.1f}ms")
+        legacy_view.clear()
+        app.processEvents()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/bench_offline_dict.py
+"""
+离线词典（内存映射）与 SQLite 冷查询的耗时和内存对比
+
+    python benchmarks/bench_offline_dict.py --words 200000 --lookups 20000
+
+在临时目录中生成测试数据库和离线词典文件，分别随机查询单词：
+SQLite 路径与 get_word_snapshot 缓存未命中时相同（ORM 查询单词及第一页记忆方法），
+离线词典路径只在映射文件上二分查找并解压释义。内存为进程常驻内存（Linux 的 /proc/self/statm）。
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from database import Base, Word, create_db_engine, snapshot_word  # noqa: E402
+from offline_dict import OfflineDictionary, build_offline_dict  # noqa: E402
+from _util import rss_kb  # noqa: E402
+
+DEFINITION = ("n. a strong desire to do or achieve something, typically requiring determination "
+              "and hard work\n雄心，抱负；野心\nn. desire and determination to achieve success\n追求成功的决心")
+
+
+def build(tmp, words):
+    engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", profile='performance')
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Word.__table__), [
+            {'id': i, 'word': f'word{i:07d}', 'definition': f'{i} {DEFINITION}'} for i in range(1, words + 1)
+        ])
+    path = os.path.join(tmp, 'bench.wdict')
+    with engine.connect() as conn:
+        samples = [f'{i} {DEFINITION}' for i in range(100)]
+        rows = conn.execute(select(Word.id, Word.word, Word.definition).order_by(Word.word))
+        start = time.perf_counter()
+        build_offline_dict(path, rows, samples)
+        build_time = time.perf_counter() - start
+    return engine, path, build_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线词典与 SQLite 冷查询对比")
+    parser.add_argument('--words', type=int, default=200000)
+    parser.add_argument('--lookups', type=int, default=20000)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    queries = [f'word{rnd.randint(1, args.words):07d}' for _ in range(args.lookups)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, path, build_time = build(tmp, args.words)
+        db_size = os.path.getsize(os.path.join(tmp, 'bench.db'))
+        print(f"{args.words} 个单词：生成离线词典 {build_time:.1f} 秒，"
+              f"文件 {os.path.getsize(path) / 1024 / 1024:.1f} MB（数据库 {db_size / 1024 / 1024:.1f} MB）")
+
+        before = rss_kb()
+        dictionary = OfflineDictionary(path)
+        opened = rss_kb()
+        start = time.perf_counter()
+        for word in queries:
+            dictionary.get(word)
+        offline = (time.perf_counter() - start) / len(queries)
+        touched = rss_kb()
+        dictionary.close()
+
+        Session = sessionmaker(bind=engine)
+        start = time.perf_counter()
+        for word in queries:
+            with Session() as session:
+                snapshot_word(session.query(Word).filter_by(word=word).first(), session)
+        sqlite = (time.perf_counter() - start) / len(queries)
+        engine.dispose()
+
+        print(f"{'离线词典':>10}: {offline * 1e6:8.1f} 微秒/次")
+        print(f"{'SQLite+ORM':>10}: {sqlite * 1e6:8.1f} 微秒/次")
+        if before is not None:
+            print(f"常驻内存：打开文件后 +{opened - before} KB，{len(queries)} 次查询后 +{touched - before} KB")
+
+
+if __name__ == '__main__':
+    main()
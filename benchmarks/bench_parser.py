@@ -0,0 +1,123 @@
+# benchmarks/bench_parser.py
+"""
+解析器黄金文件校验与性能对比
+
+    python benchmarks/bench_parser.py --check        校验所有解析模式的输出与黄金文件一致
+    python benchmarks/bench_parser.py --update       用参考实现(bs4)重新生成黄金文件
+    python benchmarks/bench_parser.py                对比各解析模式的耗时
+    python benchmarks/bench_parser.py --from-cache spider_cache.db
+                                                     把爬虫缓存中的真实页面加入语料
+
+语料位于 benchmarks/pages/：每个 <单词>.html 对应一个 <单词>.json 黄金结果。
+随仓库提供的页面是按剑桥词典页面结构手工构造的样例（含页头页脚等无关内容、
+多词性多释义、空白/注释/脚本等边界情况）；建议用 --from-cache 补充真实页面。
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import zlib
+import sqlite3
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import PARSERS  # noqa: E402
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages')
+REFERENCE = 'bs4'
+
+
+def run_parser(parse, html):
+    """ 运行解析器，异常也作为结果的一部分进行比较 """
+    try:
+        return parse(html)
+    except Exception as e:
+        return {"exception": f"{type(e).__name__}: {e}"}
+
+
+def load_corpus():
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(PAGES_DIR, '*.html'))):
+        with open(path, encoding='utf-8') as f:
+            corpus.append((os.path.splitext(os.path.basename(path))[0], f.read()))
+    return corpus
+
+
+def update_golden(corpus):
+    for name, html in corpus:
+        result = run_parser(PARSERS[REFERENCE], html)
+        with open(os.path.join(PAGES_DIR, name + '.json'), 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+    print(f"已更新 {len(corpus)} 个黄金文件")
+
+
+def check_golden(corpus):
+    failures = 0
+    for name, html in corpus:
+        golden_path = os.path.join(PAGES_DIR, name + '.json')
+        if not os.path.exists(golden_path):
+            print(f"缺少黄金文件: {name}.json（先运行 --update）")
+            failures += 1
+            continue
+        with open(golden_path, encoding='utf-8') as f:
+            golden = json.load(f)
+        for mode, parse in PARSERS.items():
+            if run_parser(parse, html) != golden:
+                print(f"不一致: {name} [{mode}]")
+                failures += 1
+    print(f"校验 {len(corpus)} 个页面 × {len(PARSERS)} 种模式，失败 {failures} 项")
+    return failures == 0
+
+
+def import_from_cache(path):
+    conn = sqlite3.connect(path)
+    count = 0
+    for word, blob in conn.execute("SELECT word, html FROM pages WHERE html IS NOT NULL"):
+        with open(os.path.join(PAGES_DIR, word + '.html'), 'w', encoding='utf-8') as f:
+            f.write(zlib.decompress(blob).decode('utf-8'))
+        count += 1
+    conn.close()
+    print(f"从缓存导入 {count} 个页面")
+
+
+def benchmark(corpus, repeat):
+    total_bytes = sum(len(html.encode('utf-8')) for _, html in corpus)
+    print(f"语料: {len(corpus)} 个页面, {total_bytes / 1024:.0f} KB, 每种模式重复 {repeat} 轮")
+    baseline = None
+    for mode, parse in PARSERS.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for _, html in corpus:
+                run_parser(parse, html)
+        elapsed = time.perf_counter() - start
+        per_page = elapsed / (repeat * len(corpus)) * 1000
+        if baseline is None:
+            baseline = elapsed
+        print(f"{mode:>9}: {per_page:7.3f} ms/页  {baseline / elapsed:5.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="解析器黄金文件校验与性能对比")
+    parser.add_argument('--check', action='store_true', help="校验输出与黄金文件一致")
+    parser.add_argument('--update', action='store_true', help="重新生成黄金文件")
+    parser.add_argument('--from-cache', metavar='PATH', help="从爬虫缓存导入页面")
+    parser.add_argument('--repeat', type=int, default=20, help="性能测试轮数")
+    args = parser.parse_args()
+
+    if args.from_cache:
+        import_from_cache(args.from_cache)
+    corpus = load_corpus()
+    if args.update:
+        update_golden(corpus)
+    if args.check:
+        return 0 if check_golden(corpus) else 1
+    if not args.update:
+        benchmark(corpus, args.repeat)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
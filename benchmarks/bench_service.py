@@ -0,0 +1,223 @@
+# benchmarks/bench_service.py
+"""
+查询服务压测：按固定请求速率发送请求，统计延迟分位数
+
+    python benchmarks/bench_service.py --rate 500 --seconds 10 --connections 32
+    python benchmarks/bench_service.py --target 127.0.0.1:8080 --wordlist words.txt --rate 200
+
+不指定 --target 时在临时目录中生成测试数据库，并以离线模式启动 service.py 子进程。
+请求按计划时间发出（开环），延迟从计划时间开始计算，服务端变慢导致的排队也计入延迟，
+不会因为客户端等待而少发请求。--revalidate 指定携带上次 ETag 的请求比例（期望得到 304）。
+--vote / --miss 指定点赞请求（POST /mnemonics/<ID>/vote，期望 202）和查询未收录单词
+（GET /words/<不存在的单词>，离线模式下期望 404）的比例，其余为 GET /words/<单词>；
+延迟和状态码按请求类型分别统计。
+"""
+import json
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def build_database(path, words, mnemonics_per_word):
+    from sqlalchemy import insert
+    from database import Word, Mnemonic, create_db_engine, initialize_db
+
+    engine = create_db_engine(f'sqlite:///{path}', profile='default')
+    initialize_db(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Word.__table__), [
+            {'id': i, 'word': f'word{i}', 'definition': f'释义 {i}'} for i in range(1, words + 1)
+        ])
+        conn.execute(insert(Mnemonic.__table__), [
+            {'word_id': i, 'method_type': 'general', 'content': f'记忆方法 {i}-{j}', 'votes': j}
+            for i in range(1, words + 1) for j in range(mnemonics_per_word)
+        ])
+    engine.dispose()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+async def wait_ready(host, port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("查询服务启动超时")
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("连接已关闭")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length:
+        await reader.readexactly(length)
+    return status, headers
+
+
+def build_request(host, kind, target, etag=None):
+    """ 按请求类型拼出 HTTP 请求 """
+    if kind == 'vote':
+        body = json.dumps({"count": 1}).encode('utf-8')
+        head = (f"POST /mnemonics/{target}/vote HTTP/1.1\r\nHost: {host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+        return head.encode('utf-8') + body
+    request = f"GET /words/{target} HTTP/1.1\r\nHost: {host}\r\n"
+    if etag is not None:
+        request += f"If-None-Match: {etag}\r\n"
+    return (request + "\r\n").encode('utf-8')
+
+
+def next_request(rnd, words, args):
+    """ 按比例随机选择下一个请求：(类型, 单词或记忆方法ID) """
+    r = rnd.random()
+    if r < args.vote:
+        return 'vote', rnd.randint(1, args.max_mnemonic_id)
+    if r < args.vote + args.miss:
+        return 'miss', f'missing{rnd.randint(1, 10 ** 9)}'
+    return 'word', rnd.choice(words)
+
+
+async def run_load(host, port, words, args):
+    queue = asyncio.Queue()
+    latencies = {}  # 请求类型 -> 延迟列表
+    statuses = {}  # 请求类型 -> {状态码: 次数}
+    etags = {}
+    rnd = random.Random(42)
+
+    async def connection():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                scheduled, kind, target = item
+                etag = etags.get(target) if kind == 'word' and rnd.random() < args.revalidate else None
+                writer.write(build_request(host, kind, target, etag))
+                await writer.drain()
+                status, headers = await read_response(reader)
+                latencies.setdefault(kind, []).append(time.perf_counter() - scheduled)
+                counts = statuses.setdefault(kind, {})
+                counts[status] = counts.get(status, 0) + 1
+                if kind == 'word' and 'etag' in headers:
+                    etags[target] = headers['etag']
+        finally:
+            writer.close()
+
+    workers = [asyncio.create_task(connection()) for _ in range(args.connections)]
+    total = int(args.rate * args.seconds)
+    start = time.perf_counter()
+    for i in range(total):
+        scheduled = start + i / args.rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        queue.put_nowait((scheduled, *next_request(rnd, words, args)))
+    sent_time = time.perf_counter() - start
+    for _ in workers:
+        queue.put_nowait(None)
+    await asyncio.gather(*workers)
+    return latencies, statuses, sent_time, time.perf_counter() - start
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="查询服务压测")
+    parser.add_argument('--target', help="已运行的服务地址 host:port（默认启动临时服务）")
+    parser.add_argument('--wordlist', help="要查询的单词表（配合 --target 使用）")
+    parser.add_argument('--words', type=int, default=20000, help="临时数据库的单词数")
+    parser.add_argument('--mnemonics', type=int, default=5, help="临时数据库中每个单词的记忆方法数")
+    parser.add_argument('--rate', type=float, default=500, help="每秒请求数")
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--connections', type=int, default=32, help="长连接数量")
+    parser.add_argument('--revalidate', type=float, default=0.0, help="携带 If-None-Match 的请求比例")
+    parser.add_argument('--vote', type=float, default=0.0, help="点赞请求的比例")
+    parser.add_argument('--miss', type=float, default=0.0, help="查询未收录单词的比例")
+    parser.add_argument('--max-mnemonic-id', type=int, help="点赞的记忆方法ID范围（默认按临时数据库计算）")
+    parser.add_argument('--workers', type=int, default=8, help="临时服务的数据库线程数")
+    args = parser.parse_args()
+    if args.vote + args.miss > 1:
+        parser.error("--vote 与 --miss 之和不能超过 1")
+    if args.max_mnemonic_id is None:
+        args.max_mnemonic_id = max(1, args.words * args.mnemonics)
+
+    process = None
+    tmp = None
+    if args.target:
+        host, port = args.target.rsplit(':', 1)
+        port = int(port)
+        if args.wordlist:
+            from bulk_import import read_word_list
+            words = read_word_list(args.wordlist)
+        else:
+            words = [f'word{i}' for i in range(1, args.words + 1)]
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(tmp.name, 'bench.db')
+        build_database(path, args.words, args.mnemonics)
+        host, port = '127.0.0.1', free_port()
+        env = dict(os.environ, DICTIONARY_DB_URL=f'sqlite:///{path}', DICTIONARY_LOCAL_DICTS='')
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, 'service.py'), '--host', host, '--port', str(port),
+             '--offline', '--workers', str(args.workers)],
+            cwd=tmp.name, env=env, stdout=subprocess.DEVNULL
+        )
+        words = [f'word{i}' for i in range(1, args.words + 1)]
+
+    try:
+        asyncio.run(wait_ready(host, port))
+        latencies, statuses, sent_time, elapsed = asyncio.run(run_load(host, port, words, args))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+            tmp.cleanup()
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"目标 {args.rate:.0f} 请求/秒，发送 {total} 个请求用时 {sent_time:.1f} 秒，"
+          f"全部完成 {elapsed:.1f} 秒（实际 {total / elapsed:.0f} 请求/秒）")
+    for kind in ('word', 'miss', 'vote'):
+        values = sorted(latencies.get(kind, []))
+        if not values:
+            continue
+        codes = ", ".join(f"{status}={count}" for status, count in sorted(statuses[kind].items()))
+        print(f"[{kind}] {len(values)} 个请求，状态码: {codes}")
+        for p in (50, 90, 99, 99.9):
+            print(f"  p{p:<5}: {percentile(values, p) * 1000:8.2f} ms")
+        print(f"  max   : {values[-1] * 1000:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/bench_sqlite_profile.py
+"""
+对比 SQLite 连接配置下的并发读写吞吐
+
+    python benchmarks/bench_sqlite_profile.py --words 20000 --readers 4 --writers 2 --seconds 5
+
+在临时目录中生成测试数据库，分别用每个配置运行：
+读线程不断查询随机单词及其记忆方法，写线程不断给随机记忆方法点赞。
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from database import Base, Word, Mnemonic, SQLITE_PROFILES, create_db_engine, upvote_mnemonic  # noqa: E402
+
+
+def build_database(path, words, mnemonics_per_word):
+    engine = create_db_engine(f'sqlite:///{path}', profile='default')
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Word.__table__), [
+            {'id': i, 'word': f'word{i}', 'definition': f'释义 {i}'} for i in range(1, words + 1)
+        ])
+        conn.execute(insert(Mnemonic.__table__), [
+            {'word_id': i, 'method_type': 'general', 'content': f'记忆方法 {i}-{j}', 'votes': 0}
+            for i in range(1, words + 1) for j in range(mnemonics_per_word)
+        ])
+    engine.dispose()
+
+
+def run(path, profile, args):
+    engine = create_db_engine(f'sqlite:///{path}', profile=profile, pool_size=args.readers + args.writers)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    max_mnemonic = args.words * args.mnemonics
+    stop = time.time() + args.seconds
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    def reader():
+        n = 0
+        rnd = random.Random()
+        while time.time() < stop:
+            with Session() as session:
+                word = session.query(Word).filter_by(word=f'word{rnd.randint(1, args.words)}').first()
+                len(word.mnemonics)
+            n += 1
+        with lock:
+            counts['reads'] += n
+
+    def writer():
+        n = errors = 0
+        rnd = random.Random()
+        while time.time() < stop:
+            with Session() as session:
+                try:
+                    upvote_mnemonic(session, rnd.randint(1, max_mnemonic))
+                    n += 1
+                except RuntimeError:
+                    errors += 1
+        with lock:
+            counts['writes'] += n
+            counts['errors'] += errors
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer) for _ in range(args.writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    engine.dispose()
+    return {k: v / args.seconds if k != 'errors' else v for k, v in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite 连接配置并发读写对比")
+    parser.add_argument('--words', type=int, default=20000)
+    parser.add_argument('--mnemonics', type=int, default=3, help="每个单词的记忆方法数")
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{args.words} 个单词, {args.readers} 个读线程, {args.writers} 个写线程, 每项 {args.seconds} 秒")
+        for profile in SQLITE_PROFILES:
+            path = os.path.join(tmp, f'{profile}.db')
+            build_database(path, args.words, args.mnemonics)
+            result = run(path, profile, args)
+            print(f"{profile:>12}: 读 {result['reads']:8.0f} 次/秒  写 {result['writes']:7.0f} 次/秒  "
+                  f"失败 {result['errors']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# benchmarks/bench_startup.py
+"""
+冷启动耗时：从启动 Python 进程到主窗口第一次绘制完成
+
+    python benchmarks/bench_startup.py --runs 5 --target-ms 600
+
+每次运行都在新的子进程中（python -X importtime）导入 dictionary_app、检查数据库结构、
+创建并显示主窗口，收到窗口的第一个 Paint 事件时记录耗时。数据库为临时目录中的新库，
+第一次运行（建表）不计入结果。输出各次耗时的中位数、与目标的比较，
+以及最慢一次运行中耗时最多的顶层导入，并检查首次绘制前是否加载了爬虫和网络相关模块。
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 首次在线查询之前不应该加载的模块
+DEFERRED_MODULES = ['spider', 'backends', 'parsers', 'requests', 'bs4', 'fake_useragent', 'lxml']
+IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def child():
+    """ 子进程：模拟 dictionary_app 的启动流程 """
+    start = float(os.environ['BENCH_START'])
+    sys.path.insert(0, ROOT)
+    from PyQt5.QtCore import QObject, QEvent, QTimer
+    from PyQt5.QtWidgets import QApplication
+    import dictionary_app
+    imported = time.time()
+
+    app = QApplication(sys.argv)
+    dictionary_app.initialize_db()
+    schema_checked = time.time()
+    window = dictionary_app.DictionaryApp()
+    result = {}
+
+    class PaintWatcher(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and not result:
+                result['paint'] = time.time()
+                QTimer.singleShot(0, app.quit)
+            return False
+
+    watcher = PaintWatcher()
+    window.installEventFilter(watcher)
+    window.show()
+    app.exec_()
+    print(json.dumps({
+        "import": imported - start,
+        "schema": schema_checked - imported,
+        "first_paint": result['paint'] - start,
+        "deferred_loaded": [m for m in DEFERRED_MODULES if m in sys.modules]
+    }))
+    window.close()
+
+
+def run_once(env):
+    env = dict(env, BENCH_START=repr(time.time()))
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', os.path.abspath(__file__), '--child'],
+        env=env, capture_output=True, text=True, check=True
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    # 顶层导入（缩进最少的行）的累计耗时
+    imports = []
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match and len(match.group(3)) == 1:
+            imports.append((int(match.group(2)), match.group(4)))
+    result['imports'] = sorted(imports, reverse=True)
+    return result
+
+
+def main():
+    if '--child' in sys.argv:
+        child()
+        return
+    parser = argparse.ArgumentParser(description="冷启动耗时")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--target-ms', type=float, default=600, help="首次绘制的目标耗时(毫秒)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            DICTIONARY_DB_URL=f"sqlite:///{os.path.join(tmp, 'startup.db')}",
+            DICTIONARY_OFFLINE_DICT=os.path.join(tmp, 'none.wdict'),
+            QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen')
+        )
+        run_once(env)  # 建表，不计入结果
+        results = [run_once(env) for _ in range(args.runs)]
+
+    paints = [r['first_paint'] * 1000 for r in results]
+    median = statistics.median(paints)
+    slowest = max(results, key=lambda r: r['first_paint'])
+    print(f"首次绘制: 中位数 {median:.0f} ms（最快 {min(paints):.0f} / 最慢 {max(paints):.0f}），"
+          f"目标 {args.target_ms:.0f} ms：{'达标' if median <= args.target_ms else '未达标'}")
+    print(f"  其中导入 {statistics.median(r['import'] for r in results) * 1000:.0f} ms，"
+          f"结构检查 {statistics.median(r['schema'] for r in results) * 1000:.1f} ms")
+    print("最慢一次运行中耗时最多的顶层导入:")
+    for cumulative, name in slowest['imports'][:8]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    loaded = sorted({m for r in results for m in r['deferred_loaded']})
+    print("首次绘制前加载的网络/解析模块: " + (", ".join(loaded) if loaded else "无"))
+    sys.exit(0 if median <= args.target_ms else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# benchmarks/soak_sessions.py
+"""
+会话生命周期浸泡测试：界面连续查询数千次后内存是否保持稳定
+
+    python benchmarks/soak_sessions.py --searches 5000 --report 1000
+    python benchmarks/soak_sessions.py --searches 5000 --legacy    # 对照：再开一个长期会话逐词查询
+
+在临时目录中生成测试数据库，以离线模式打开 DictionaryApp（offscreen），
+随机查询单词（少量拼错的词走拼写建议），并穿插添加记忆方法和点赞。
+定期输出：常驻内存、存活的 ORM 对象数、热词缓存大小、借出的连接数，
+以及 PRAGMA wal_checkpoint(TRUNCATE) 是否被读事务阻塞（busy=1）和 WAL 文件大小。
+--legacy 模拟旧实现中窗口持有的 self.session：整个运行期间一直占用一个池化连接，
+被引用的 ORM 对象停留在它的标识映射中，不会看到其他会话的更新。
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _util import rss_kb  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="会话生命周期浸泡测试")
+    parser.add_argument('--words', type=int, default=20000)
+    parser.add_argument('--mnemonics', type=int, default=5, help="每个单词的记忆方法数")
+    parser.add_argument('--searches', type=int, default=5000)
+    parser.add_argument('--report', type=int, default=1000, help="每隔多少次查询输出一次")
+    parser.add_argument('--legacy', action='store_true', help="同时保持一个长期会话逐词查询（旧实现）")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    db_path = os.path.join(tmp.name, 'soak.db')
+    # 界面使用全局数据库引擎，需要在导入前指定测试数据库；纠错索引、爬虫缓存等文件写到临时目录
+    os.environ['DICTIONARY_DB_URL'] = f'sqlite:///{db_path}'
+    os.environ['DICTIONARY_OFFLINE'] = '1'
+    os.environ['DICTIONARY_LOCAL_DICTS'] = ''
+    os.environ['DICTIONARY_OFFLINE_DICT'] = os.path.join(tmp.name, 'none.wdict')
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    os.chdir(tmp.name)
+
+    from sqlalchemy import insert
+    from PyQt5.QtWidgets import QApplication
+    from database import (
+        Session, Word, Mnemonic, engine, initialize_db, session_scope, add_mnemonic, word_cache
+    )
+
+    initialize_db()
+    with engine.begin() as conn:
+        conn.execute(insert(Word.__table__), [
+            {'id': i, 'word': f'word{i}', 'definition': f'释义 {i}'} for i in range(1, args.words + 1)
+        ])
+        conn.execute(insert(Mnemonic.__table__), [
+            {'word_id': i, 'method_type': 'general', 'content': f'记忆方法 {i}-{j}', 'votes': 0}
+            for i in range(1, args.words + 1) for j in range(args.mnemonics)
+        ])
+
+    app = QApplication(sys.argv)
+    from dictionary_app import DictionaryApp
+    window = DictionaryApp()
+    legacy = Session() if args.legacy else None
+    rnd = random.Random(42)
+
+    def report(n, elapsed):
+        gc.collect()
+        orm_objects = sum(1 for o in gc.get_objects() if isinstance(o, (Word, Mnemonic)))
+        with engine.connect() as conn:
+            busy, _, _ = conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        wal = db_path + '-wal'
+        wal_kb = os.path.getsize(wal) // 1024 if os.path.exists(wal) else 0
+        line = (f"{n:>7} 次查询 {elapsed:6.1f} 秒 | 内存 {rss_kb() or 0:>7} KB | ORM 对象 {orm_objects:>7} | "
+                f"热词缓存 {word_cache.stats()['size']:>5} | 借出连接 {engine.pool.checkedout()} | "
+                f"检查点 busy={busy} WAL {wal_kb} KB")
+        if legacy is not None:
+            line += f" | 长期会话标识映射 {len(legacy.identity_map)}"
+        print(line, flush=True)
+
+    start = time.perf_counter()
+    report(0, 0.0)
+    for n in range(1, args.searches + 1):
+        word = f'word{rnd.randint(1, args.words)}'
+        if rnd.random() < 0.05:
+            word = word.replace('word', 'wrod')  # 拼错，走拼写建议
+        window.search_word(word)
+        if legacy is not None:
+            found = legacy.query(Word).filter_by(word=word).first()
+            if found is not None:
+                len(found.mnemonics)
+        if n % 10 == 0 and window.current_word is not None:
+            if n % 50 == 0:
+                with session_scope() as session:
+                    add_mnemonic(session, window.current_word.id, 'general', f'浸泡测试 {n}')
+                window.load_mnemonics()
+            if window.mnemonic_model.rowCount():
+                window.on_upvote_clicked(0)
+        app.processEvents()
+        if n % args.report == 0:
+            report(n, time.perf_counter() - start)
+
+    if legacy is not None:
+        legacy.close()
+    window.close()
+    app.processEvents()
+    engine.dispose()
+    os.chdir(os.path.dirname(tmp.name))
+    tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
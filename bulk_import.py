@@ -0,0 +1,198 @@
+# bulk_import.py
+"""
+批量导入单词表（无界面）
+
+用法:
+    python bulk_import.py words.txt --workers 4 --interval 1.5 --batch-size 100 --processes 4
+
+单词表每行一个单词，空行和以 # 开头的行会被忽略。
+已处理的单词会记录到进度文件（默认 <单词表>.progress），
+中途崩溃后重新运行会从断点继续，不会从头开始。
+限流、网络错误等暂时性失败在退避重试用尽后写入重试队列（默认 retry_queue.db），
+使用 --retry-due 可以只重新抓取队列中已到期的单词。
+"""
+import argparse
+import os
+import sys
+import time
+
+from database import Session, initialize_db, load_existing_words, save_words
+from spider import OnlineDictionarySpider, CrawlPipeline
+from spider_cache import SpiderCache
+from retry_queue import RetryQueue
+from backends import open_backend
+
+# 重试也不会成功的错误，记录到进度文件后不再抓取
+PERMANENT_ERRORS = ("单词不存在", "解析失败")
+
+
+def read_word_list(path):
+    """
+    读取单词表，统一小写并去重（保持原有顺序）
+    :param path: 单词表文件路径
+    :return: 单词列表
+    """
+    seen = set()
+    words = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            word = line.strip().lower()
+            if not word or word.startswith('#') or word in seen:
+                continue
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def load_progress(path):
+    """
+    读取进度文件中已处理过的单词
+    :param path: 进度文件路径
+    :return: 已处理单词集合
+    """
+    done = set()
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                word = line.split('\t', 1)[0].strip()
+                if word:
+                    done.add(word)
+    return done
+
+
+class ProgressLog:
+    """ 追加写入的进度文件，每行格式为 单词<TAB>状态 """
+
+    def __init__(self, path):
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def record(self, entries):
+        """
+        记录一批已处理的单词并立即落盘
+        :param entries: (单词, 状态) 序列
+        """
+        for word, status in entries:
+            self.file.write(f"{word}\t{status}\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+
+def run_import(words, progress_path, workers=4, interval=1.5, batch_size=100, cache=None,
+               processes=0, retry_queue=None, backends=None, offline=False):
+    """
+    并发抓取并分批写入数据库
+    :param words: 待导入的单词列表
+    :param progress_path: 进度文件路径
+    :param workers: 并发抓取线程数
+    :param interval: 全局请求间隔(秒)，所有线程共享该速率预算
+    :param batch_size: 每个事务写入的单词数
+    :param cache: 可选的 SpiderCache，已缓存的页面不再联网
+    :param processes: 解析进程数，0 表示在抓取线程中解析
+    :param retry_queue: 可选的 RetryQueue，暂时性失败的单词写入该队列
+    :param backends: 本地词典数据源列表，查到的单词不再联网
+    :param offline: 为 True 时只使用本地词典
+    :return: 统计信息字典
+    """
+    stats = {"total": len(words), "skipped": 0, "saved": 0, "failed": 0}
+
+    session = Session()
+    progress = ProgressLog(progress_path)
+    try:
+        # 一次集合查询过滤掉数据库中已有的单词，再过滤掉上次已处理过的单词
+        existing = load_existing_words(session)
+        done = load_progress(progress_path)
+        todo = [w for w in words if w not in existing and w not in done]
+        stats["skipped"] = len(words) - len(todo)
+        print(f"共 {len(words)} 个单词，跳过 {stats['skipped']} 个，待抓取 {len(todo)} 个")
+
+        start = time.time()
+
+        def write_batch(batch):
+            """ 写库回调：只在流水线的写库线程中执行，一个批次一个事务 """
+            ok = [(w, r) for w, r in batch if "error" not in r]
+            # 只记录确定性的失败；网络类错误不记录，下次运行时会重试
+            failures = [(w, r["error"]) for w, r in batch
+                        if "error" in r and r["error"] in PERMANENT_ERRORS]
+            stats["failed"] += len(batch) - len(ok)
+            if ok:
+                stats["saved"] += save_words(session, ok)
+                progress.record((w, "ok") for w, _ in ok)
+            if failures:
+                progress.record(failures)
+
+            processed = stats["saved"] + stats["failed"]
+            elapsed = time.time() - start
+            rate = processed / elapsed if elapsed > 0 else 0
+            hosts = spider.metrics()["hosts"].values()
+            effective = sum(h["effective_rps"] for h in hosts)
+            limit = sum(h["rate"] for h in hosts)
+            print(f"进度: {processed}/{len(todo)}  成功 {stats['saved']}  "
+                  f"失败 {stats['failed']}  {rate:.2f} 词/秒  "
+                  f"请求 {effective:.2f}/秒（限速 {limit:.2f}/秒，重试 {spider.retry_policy.retries} 次）")
+
+        # 所有线程共用一个爬虫实例，速率限制是全局的
+        spider = OnlineDictionarySpider(request_interval=interval, cache=cache, retry_queue=retry_queue,
+                                        backends=backends, offline=offline)
+        pipeline = CrawlPipeline(
+            spider,
+            write_batch,
+            fetchers=workers,
+            processes=processes,
+            queue_size=max(batch_size, workers * 2),
+            batch_size=batch_size
+        )
+        pipeline.run(todo)
+        return stats
+    finally:
+        progress.close()
+        session.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量导入单词表")
+    parser.add_argument('wordlist', help="单词表文件，每行一个单词")
+    parser.add_argument('--workers', type=int, default=4, help="并发抓取线程数")
+    parser.add_argument('--interval', type=float, default=1.5, help="全局请求间隔(秒)")
+    parser.add_argument('--batch-size', type=int, default=100, help="每个事务写入的单词数")
+    parser.add_argument('--processes', type=int, default=0,
+                        help="解析进程数（0 表示在抓取线程中解析，大批量时建议设为CPU核数）")
+    parser.add_argument('--progress', help="进度文件路径（默认 <单词表>.progress）")
+    parser.add_argument('--cache', default='spider_cache.db', help="爬虫缓存文件路径")
+    parser.add_argument('--no-cache', action='store_true', help="不使用爬虫缓存")
+    parser.add_argument('--retry-queue', default='retry_queue.db', help="重试队列文件路径")
+    parser.add_argument('--retry-due', action='store_true', help="只抓取重试队列中已到期的单词")
+    parser.add_argument('--local-dict', action='append', default=[],
+                        help="本地词典文件（ECDICT .csv 或 StarDict .ifo），可指定多次")
+    parser.add_argument('--offline', action='store_true', help="只使用本地词典，不联网")
+    args = parser.parse_args(argv)
+
+    initialize_db()
+    retry_queue = RetryQueue(args.retry_queue)
+    words = retry_queue.due() if args.retry_due else read_word_list(args.wordlist)
+    progress_path = args.progress or args.wordlist + '.progress'
+    cache = None if args.no_cache else SpiderCache(args.cache)
+    stats = run_import(
+        words,
+        progress_path,
+        workers=args.workers,
+        interval=args.interval,
+        batch_size=args.batch_size,
+        cache=cache,
+        processes=args.processes,
+        retry_queue=retry_queue,
+        backends=[open_backend(path) for path in args.local_dict],
+        offline=args.offline
+    )
+    if cache is not None:
+        cache.close()
+    print(f"导入完成: 新增 {stats['saved']}，失败 {stats['failed']}，跳过 {stats['skipped']}，"
+          f"重试队列中还有 {len(retry_queue)} 个单词")
+    retry_queue.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
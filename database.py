@@ -1,6 +1,16 @@
 # database.py
-from sqlalchemy import create_engine, Column, Integer, String, Text, ForeignKey
+import os
+import re
+import threading
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, text, update, Column, Integer, String, Text, ForeignKey, Index, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import declarative_base, sessionmaker, relationship
+from sqlalchemy.pool import QueuePool, StaticPool
+from word_index import PrefixIndex, FuzzyIndex
 
 # 声明性基类
 Base = declarative_base()
@@ -18,7 +28,7 @@ class Word(Base):
         'Mnemonic', 
         backref='word', 
         cascade='all, delete-orphan',
-        order_by="desc(Mnemonic.votes)"
+        order_by="[desc(Mnemonic.votes), Mnemonic.id]"
     )
 
 class Mnemonic(Base):
@@ -45,12 +55,79 @@ class Mnemonic(Base):
         comment="点赞数量"
     )
 
-# 数据库连接配置
-engine = create_engine(
-    'sqlite:///dictionary.db', 
-    echo=False,  # 设为True可查看SQL日志
-    connect_args={'check_same_thread': False}  # 允许多线程
-)
+    # 按单词取排行榜时直接顺序读取索引，无需全表扫描和排序
+    __table_args__ = (
+        Index('ix_mnemonics_word_votes', word_id, votes.desc(), id),
+    )
+
+# 数据库连接配置（可用环境变量覆盖）
+DATABASE_URL = os.environ.get('DICTIONARY_DB_URL', 'sqlite:///dictionary.db')
+DATABASE_PROFILE = os.environ.get('DICTIONARY_DB_PROFILE', 'performance')
+
+# SQLite 连接参数配置，每个新连接建立时通过 PRAGMA 设置
+SQLITE_PROFILES = {
+    # SQLite 默认设置（回滚日志，synchronous=FULL）
+    'default': {},
+    # 读多写少的多线程场景：WAL 允许读写并发，NORMAL 在 WAL 下仍保证数据库不损坏
+    'performance': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,  # 内存映射读取，减少系统调用和拷贝
+        'cache_size': -64 * 1024,  # 每个连接 64MB 页缓存（负数单位为KB）
+        'busy_timeout': 5000,  # 写锁被占用时最多等待5秒，而不是立即报 database is locked
+        'temp_store': 'MEMORY'
+    }
+}
+
+def _apply_pragmas(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    return on_connect
+
+# 全文检索分词：在每个中日韩字符两侧加空格，unicode61 分词器就会把每个字作为一个词元，
+# 查询时按短语匹配相邻的字，等价于中文子串匹配；英文仍按单词分词。
+# 注意：修改分词规则后需要升级 SCHEMA_VERSION 重建全文索引，已有的索引项才会按新规则分词
+_CJK_RANGES = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff'
+_CJK_CHAR = re.compile(f'([{_CJK_RANGES}])')
+
+def segment_text(value):
+    """ 全文检索的预分词函数（在写入全文索引和构造查询时调用） """
+    if value is None:
+        return None
+    return _CJK_CHAR.sub(r' \1 ', value)
+
+def create_db_engine(url=DATABASE_URL, profile=DATABASE_PROFILE, pool_size=8, echo=False):
+    """
+    创建数据库引擎
+    :param url: 数据库地址
+    :param profile: SQLITE_PROFILES 中的配置名
+    :param pool_size: 连接池大小（多个读线程各自持有连接，写操作由 SQLite 串行化）
+    :param echo: 设为True可查看SQL日志
+    :return: Engine
+    """
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"未知的数据库配置: {profile}，可选: {', '.join(SQLITE_PROFILES)}")
+
+    kwargs = {
+        'echo': echo,
+        'connect_args': {'check_same_thread': False}  # 允许多线程
+    }
+    database = make_url(url).database
+    if not database or database == ':memory:':
+        # 内存数据库只能共享同一个连接
+        kwargs['poolclass'] = StaticPool
+    else:
+        # 文件数据库：连接池复用连接，每个线程取用独立连接并发读
+        kwargs.update(poolclass=QueuePool, pool_size=pool_size, max_overflow=pool_size)
+
+    new_engine = create_engine(url, **kwargs)
+    event.listen(new_engine, 'connect', _apply_pragmas(SQLITE_PROFILES[profile]))
+    return new_engine
+
+engine = create_db_engine()
 
 # 会话工厂
 Session = sessionmaker(
@@ -59,9 +136,538 @@ Session = sessionmaker(
     autocommit=False
 )
 
-def initialize_db():
-    """ 初始化数据库表结构 """
-    Base.metadata.create_all(engine)
+@contextmanager
+def session_scope(readonly=False):
+    """
+    工作单元：with 块就是一个会话的完整生命周期
+    正常结束时提交（readonly=True 时不提交），发生异常时回滚，最后关闭会话、归还连接，
+    SQLite 的读快照随之结束，不会长期阻止 WAL 检查点。会话中的 ORM 对象不应带出 with 块，
+    需要交给界面的数据先转换成下面的只读快照
+    :param readonly: 只读操作，结束时不提交
+    """
+    session = Session()
+    try:
+        yield session
+        if not readonly:
+            session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+# 提供给界面使用的只读快照（与 Session 无关，可跨线程共享）
+WordSnapshot = namedtuple('WordSnapshot', ['id', 'word', 'definition', 'mnemonics'])
+MnemonicSnapshot = namedtuple('MnemonicSnapshot', ['id', 'word_id', 'method_type', 'content', 'votes'])
+
+def normalize_word(word_str):
+    """ 统一单词格式：去掉首尾空白并转为小写 """
+    return word_str.strip().lower()
+
+# 单词快照中包含的记忆方法条数（排行榜第一页），更多的通过 top_mnemonics 分页读取
+SNAPSHOT_MNEMONICS = 50
+
+def snapshot_mnemonic(m):
+    return MnemonicSnapshot(m.id, m.word_id, m.method_type, m.content, m.votes)
+
+def top_mnemonics(session, word_id, limit=SNAPSHOT_MNEMONICS, offset=0, after=None):
+    """
+    按点赞数降序读取单词的记忆方法（直接走 ix_mnemonics_word_votes 索引）
+    :param session: 数据库会话
+    :param word_id: 单词ID
+    :param limit: 每页条数
+    :param offset: 跳过的条数（页数不多时使用）
+    :param after: 上一页最后一条 MnemonicSnapshot，按键集翻页，深度翻页时不需要扫描前面的行
+    :return: MnemonicSnapshot 元组
+    """
+    query = session.query(Mnemonic).filter(Mnemonic.word_id == word_id)
+    if after is not None:
+        query = query.filter(
+            (Mnemonic.votes < after.votes)
+            | ((Mnemonic.votes == after.votes) & (Mnemonic.id > after.id))
+        )
+    query = query.order_by(Mnemonic.votes.desc(), Mnemonic.id).offset(offset).limit(limit)
+    return tuple(snapshot_mnemonic(m) for m in query)
+
+def count_mnemonics(session, word_id):
+    """ 单词的记忆方法总数 """
+    return session.query(func.count(Mnemonic.id)).filter(Mnemonic.word_id == word_id).scalar()
+
+def snapshot_word(word, session):
+    """ 把 Word 对象及其排行榜第一页记忆方法转换为只读快照 """
+    return WordSnapshot(
+        id=word.id,
+        word=word.word,
+        definition=word.definition,
+        mnemonics=top_mnemonics(session, word.id)
+    )
+
+class WordCache:
+    """ 热词LRU缓存：单词 -> WordSnapshot，写操作后按单词或单词ID失效 """
+
+    def __init__(self, capacity=2048):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._keys_by_id = {}  # 单词ID -> 缓存键，用于记忆方法写入后的失效
+        self._generation = 0  # 每次失效递增，防止加载期间的旧数据被写回缓存
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            snapshot = self._data.get(key)
+            if snapshot is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return snapshot
+
+    def generation(self):
+        with self._lock:
+            return self._generation
+
+    def put(self, key, snapshot, generation=None):
+        """
+        写入缓存
+        :param generation: 开始加载前取得的 generation()；期间发生过失效则放弃写入
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = snapshot
+            self._data.move_to_end(key)
+            self._keys_by_id[snapshot.id] = key
+            while len(self._data) > self.capacity:
+                _, evicted = self._data.popitem(last=False)
+                self._keys_by_id.pop(evicted.id, None)
+
+    def invalidate(self, key):
+        """ 按单词失效 """
+        with self._lock:
+            self._generation += 1
+            snapshot = self._data.pop(key, None)
+            if snapshot is not None:
+                self._keys_by_id.pop(snapshot.id, None)
+
+    def invalidate_word_id(self, word_id):
+        """ 按单词ID失效（记忆方法新增或点赞后调用） """
+        with self._lock:
+            self._generation += 1
+            key = self._keys_by_id.pop(word_id, None)
+            if key is not None:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+            self._keys_by_id.clear()
+
+    def stats(self):
+        """ 命中统计，用于评估缓存容量 """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0
+            }
+
+# 全局热词缓存
+word_cache = WordCache()
+
+def get_word_snapshot(word_str):
+    """
+    读穿缓存查询单词
+    :param word_str: 单词
+    :return: WordSnapshot，不存在时返回 None
+    """
+    key = normalize_word(word_str)
+    snapshot = word_cache.get(key)
+    if snapshot is not None:
+        return snapshot
+
+    generation = word_cache.generation()
+    # 使用短生命周期的会话，保证读到的是数据库中的最新数据
+    with session_scope(readonly=True) as session:
+        word = session.query(Word).filter_by(word=key).first()
+        if word is None:
+            return None
+        snapshot = snapshot_word(word, session)
+    word_cache.put(key, snapshot, generation)
+    return snapshot
+
+def get_word_id(word_str):
+    """
+    按单词文本查询数据库中的单词ID（只读主键，不加载释义和记忆方法）
+    :param word_str: 单词
+    :return: 单词ID，不存在时返回 None
+    """
+    key = normalize_word(word_str)
+    snapshot = word_cache.get(key)
+    if snapshot is not None:
+        return snapshot.id
+    with session_scope(readonly=True) as session:
+        return session.query(Word.id).filter_by(word=key).scalar()
+
+# 批量查询时每条 IN 语句的参数个数（远低于 SQLite 的绑定参数上限）
+LOOKUP_CHUNK = 500
+
+def _chunks(items, size=LOOKUP_CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def top_mnemonics_many(session, word_ids, limit=SNAPSHOT_MNEMONICS):
+    """
+    一条查询读取多个单词各自排行榜的前 limit 条记忆方法
+    （窗口函数按单词分组编号，每个单词只取前 limit 条，不会加载全部记忆方法）
+    :param session: 数据库会话
+    :param word_ids: 单词ID序列
+    :return: {单词ID: MnemonicSnapshot 元组}
+    """
+    result = {}
+    word_ids = list(word_ids)
+    if not word_ids:
+        return result
+    rank = func.row_number().over(
+        partition_by=Mnemonic.word_id,
+        order_by=(Mnemonic.votes.desc(), Mnemonic.id)
+    ).label('rank')
+    ranked = (
+        session.query(Mnemonic.id, Mnemonic.word_id, Mnemonic.method_type, Mnemonic.content, Mnemonic.votes, rank)
+        .filter(Mnemonic.word_id.in_(word_ids))
+        .subquery()
+    )
+    rows = (
+        session.query(ranked.c.id, ranked.c.word_id, ranked.c.method_type, ranked.c.content, ranked.c.votes)
+        .filter(ranked.c.rank <= limit)
+        .order_by(ranked.c.word_id, ranked.c.rank)
+    )
+    for row in rows:
+        result.setdefault(row.word_id, []).append(MnemonicSnapshot(*row))
+    return {word_id: tuple(items) for word_id, items in result.items()}
+
+def lookup_many(words, cached=None):
+    """
+    批量读穿缓存查询单词：缓存未命中的单词按块 IN 查询，各单词的排行榜第一页同样按块一次读取，
+    查询次数与单词数无关（每 LOOKUP_CHUNK 个单词两条语句）
+    :param words: 单词序列（会统一格式并去重）
+    :param cached: 调用方已经查过的缓存结果（规范化单词 -> WordSnapshot 或 None），
+                   传入时不再查缓存，命中率只统计一次
+    :return: (found, missing)：found 为 规范化单词 -> WordSnapshot，
+             missing 为未收录的单词列表（保持输入顺序），可直接交给爬虫
+    """
+    keys = list(dict.fromkeys(k for k in map(normalize_word, words) if k))
+    found = {}
+    misses = []
+    for key in keys:
+        snapshot = cached.get(key) if cached is not None else word_cache.get(key)
+        if snapshot is None:
+            misses.append(key)
+        else:
+            found[key] = snapshot
+
+    if misses:
+        generation = word_cache.generation()
+        with session_scope(readonly=True) as session:
+            for chunk in _chunks(misses):
+                rows = session.query(Word.id, Word.word, Word.definition).filter(Word.word.in_(chunk)).all()
+                mnemonics = top_mnemonics_many(session, [row.id for row in rows])
+                for row in rows:
+                    snapshot = WordSnapshot(row.id, row.word, row.definition, mnemonics.get(row.id, ()))
+                    found[row.word] = snapshot
+                    word_cache.put(row.word, snapshot, generation)
+
+    return found, [key for key in keys if key not in found]
+
+def _load_all_words():
+    with session_scope(readonly=True) as session:
+        return [w for (w,) in session.query(Word.word)]
+
+# 自动补全用的前缀索引（首次补全时才加载）
+prefix_index = PrefixIndex(_load_all_words)
+
+def complete_word(prefix, limit=10):
+    """
+    单词自动补全
+    :param prefix: 用户已输入的前缀
+    :param limit: 最多返回的候选数量
+    :return: 候选单词列表
+    """
+    return prefix_index.complete(normalize_word(prefix), limit)
+
+def _words_fingerprint():
+    """ 单词表的指纹（数量和最大ID），用于判断磁盘上的纠错索引是否过期 """
+    with session_scope(readonly=True) as session:
+        count, max_id = session.query(func.count(Word.id), func.max(Word.id)).one()
+        return count, max_id
+
+def _fuzzy_index_path(url=DATABASE_URL):
+    """ 纠错索引文件放在数据库文件旁边（dictionary.db -> dictionary.fuzzy.json），内存数据库不持久化 """
+    database = make_url(url).database
+    if not database or database == ':memory:':
+        return None
+    return os.path.splitext(database)[0] + '.fuzzy.json'
+
+# 拼写纠错索引（首次使用时从磁盘加载或重建）
+fuzzy_index = FuzzyIndex(_load_all_words, path=_fuzzy_index_path(), fingerprint=_words_fingerprint)
+
+def suggest_words(word_str, limit=5, wait=True):
+    """
+    本地拼写纠错：返回与输入相近的已收录单词
+    :param word_str: 用户输入的单词
+    :param limit: 最多返回的候选数量
+    :param wait: 为 False 时不等待索引加载（界面线程使用），索引就绪前返回空列表
+    :return: 按编辑距离排序的候选单词列表
+    """
+    return fuzzy_index.suggest(normalize_word(word_str), limit, wait=wait)
+
+def reset_caches():
+    """ 绕过 save_word/save_words 批量写入后，丢弃热词缓存和内存中的单词索引 """
+    word_cache.clear()
+    prefix_index.reset()
+    fuzzy_index.reset()
+
+# 反查结果：每个单词一条，field 为 'definition' 或 'mnemonic'，text 为最相关的那段原文
+SearchHit = namedtuple('SearchHit', ['word_id', 'word', 'field', 'text', 'score'])
+
+_FULLTEXT_QUERY = """
+    SELECT word_id, word, field, body, min(score) AS score FROM (
+        SELECT w.id AS word_id, w.word AS word, 'definition' AS field, w.definition AS body,
+               bm25(words_fts) AS score
+        FROM words_fts JOIN words w ON w.id = words_fts.rowid
+        WHERE words_fts MATCH :query
+        UNION ALL
+        SELECT w.id, w.word, 'mnemonic', m.content, bm25(mnemonics_fts)
+        FROM mnemonics_fts
+        JOIN mnemonics m ON m.id = mnemonics_fts.rowid
+        JOIN words w ON w.id = m.word_id
+        WHERE mnemonics_fts MATCH :query
+    )
+    GROUP BY word_id
+"""
+
+def build_match_query(query):
+    """
+    把用户输入转换为 FTS5 查询表达式：按空白拆分，每个词作为一个短语，多个词之间为 AND
+    :return: 查询表达式，输入中没有可检索的字符时返回 None
+    """
+    phrases = []
+    for term in query.split():
+        if not re.search(r'\w', term):
+            continue  # 纯标点在分词后为空
+        quoted = term.replace('"', '""')
+        phrase = '"' + segment_text(quoted) + '"'
+        if _CJK_CHAR.search(term):
+            # 其他客户端经触发器写入的是未分词的原文（整段中文是一个词元），
+            # 在 repair_schema 重新分词之前用原文前缀匹配兜底
+            phrase = f'({phrase} OR "{quoted}"*)'
+        phrases.append(phrase)
+    return " AND ".join(phrases) or None
+
+def search_fulltext(session, query, limit=20, offset=0):
+    """
+    按释义和记忆方法内容反查单词（bm25 相关度排序，分页）
+    :param session: 数据库会话
+    :param query: 检索词，例如 "雄心" 或 "ambition 抱负"
+    :param limit: 每页条数
+    :param offset: 跳过的条数
+    :return: SearchHit 列表，按相关度从高到低
+    """
+    match = build_match_query(query)
+    if match is None:
+        return []
+    rows = session.execute(
+        text(_FULLTEXT_QUERY + " ORDER BY score, word_id LIMIT :limit OFFSET :offset"),
+        {"query": match, "limit": limit, "offset": offset}
+    )
+    return [SearchHit(*row) for row in rows]
+
+def count_fulltext(session, query):
+    """ 反查结果的单词总数（用于分页） """
+    match = build_match_query(query)
+    if match is None:
+        return 0
+    return session.execute(
+        text(f"SELECT count(*) FROM ({_FULLTEXT_QUERY})"), {"query": match}
+    ).scalar()
+
+# 数据库结构版本（保存在 PRAGMA user_version 中）
+SCHEMA_VERSION = 4
+
+# 二级索引（批量导入期间会暂时删除，initialize_db 每次启动时补建缺失的索引）
+SECONDARY_INDEXES = {
+    'ix_mnemonics_word_votes': "CREATE INDEX IF NOT EXISTS ix_mnemonics_word_votes "
+                               "ON mnemonics (word_id, votes DESC, id)"
+}
+
+# 全文索引：FTS5 表保存被索引的文本，rowid 与原表主键一致；
+# fulltext_pending 记录由触发器写入了未分词原文的行（原表名, ID）
+FTS_TABLES = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS words_fts USING fts5(definition)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS mnemonics_fts USING fts5(content)",
+    "CREATE TABLE IF NOT EXISTS fulltext_pending (source TEXT NOT NULL, id INTEGER NOT NULL, "
+    "PRIMARY KEY (source, id)) WITHOUT ROWID"
+]
+
+# 由触发器同步全文索引（点赞只更新 votes 列，不会触发）。
+# 触发器只使用 SQLite 内置的 SQL，任何客户端写入都能维护索引：写入的是未分词的原文，
+# 英文可以按单词检索，中文只能按整段的前缀匹配，所以含中日韩字符的行同时记入 fulltext_pending。
+# 本程序的写入路径随后用 refresh_fulltext 换成预分词的文本并清除记录，
+# 其他客户端写入的行由 repair_schema 在下次启动时重新分词
+_CJK_GLOB = f"'*[{_CJK_RANGES}]*'"
+FTS_INSERT_TRIGGERS = {
+    'words_fts_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS words_fts_ai AFTER INSERT ON words BEGIN
+            INSERT INTO words_fts(rowid, definition)
+            SELECT new.id, new.definition WHERE new.definition IS NOT NULL;
+            INSERT OR IGNORE INTO fulltext_pending(source, id)
+            SELECT 'words', new.id WHERE new.definition GLOB {_CJK_GLOB};
+        END""",
+    'mnemonics_fts_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS mnemonics_fts_ai AFTER INSERT ON mnemonics BEGIN
+            INSERT INTO mnemonics_fts(rowid, content) VALUES (new.id, new.content);
+            INSERT OR IGNORE INTO fulltext_pending(source, id)
+            SELECT 'mnemonics', new.id WHERE new.content GLOB {_CJK_GLOB};
+        END"""
+}
+FTS_TRIGGERS = {
+    **FTS_INSERT_TRIGGERS,
+    'words_fts_ad': """
+        CREATE TRIGGER IF NOT EXISTS words_fts_ad AFTER DELETE ON words BEGIN
+            DELETE FROM words_fts WHERE rowid = old.id;
+            DELETE FROM fulltext_pending WHERE source = 'words' AND id = old.id;
+        END""",
+    'words_fts_au': f"""
+        CREATE TRIGGER IF NOT EXISTS words_fts_au AFTER UPDATE OF definition ON words BEGIN
+            DELETE FROM words_fts WHERE rowid = old.id;
+            INSERT INTO words_fts(rowid, definition)
+            SELECT new.id, new.definition WHERE new.definition IS NOT NULL;
+            INSERT OR IGNORE INTO fulltext_pending(source, id)
+            SELECT 'words', new.id WHERE new.definition GLOB {_CJK_GLOB};
+        END""",
+    'mnemonics_fts_ad': """
+        CREATE TRIGGER IF NOT EXISTS mnemonics_fts_ad AFTER DELETE ON mnemonics BEGIN
+            DELETE FROM mnemonics_fts WHERE rowid = old.id;
+            DELETE FROM fulltext_pending WHERE source = 'mnemonics' AND id = old.id;
+        END""",
+    'mnemonics_fts_au': f"""
+        CREATE TRIGGER IF NOT EXISTS mnemonics_fts_au AFTER UPDATE OF content ON mnemonics BEGIN
+            DELETE FROM mnemonics_fts WHERE rowid = old.id;
+            INSERT INTO mnemonics_fts(rowid, content) VALUES (new.id, new.content);
+            INSERT OR IGNORE INTO fulltext_pending(source, id)
+            SELECT 'mnemonics', new.id WHERE new.content GLOB {_CJK_GLOB};
+        END"""
+}
+
+# (全文索引表, 索引列, 原表)
+_FTS_SOURCES = [('words_fts', 'definition', 'words'), ('mnemonics_fts', 'content', 'mnemonics')]
+
+def refresh_fulltext(conn, words=(), mnemonics=()):
+    """
+    把触发器写入的原文换成预分词后的文本，并清除 fulltext_pending 中的记录
+    （不含中日韩字符的文本两者相同，触发器也不会记录，直接跳过）
+    :param conn: 数据库连接或会话（在调用方的事务中执行）
+    :param words: (单词ID, 释义) 序列
+    :param mnemonics: (记忆方法ID, 内容) 序列
+    """
+    for (table, column, source), items in zip(_FTS_SOURCES, (words, mnemonics)):
+        rows = []
+        for row_id, body in items:
+            segmented = segment_text(body)
+            if segmented != body:
+                rows.append({"id": row_id, "body": segmented, "source": source})
+        if rows:
+            conn.execute(text(f"DELETE FROM {table} WHERE rowid = :id"), rows)
+            conn.execute(text(f"INSERT INTO {table}(rowid, {column}) VALUES (:id, :body)"), rows)
+            conn.execute(text("DELETE FROM fulltext_pending WHERE source = :source AND id = :id"), rows)
+
+def resegment_fulltext(conn):
+    """
+    把 fulltext_pending 中记录的行（其他 SQLite 客户端写入、由触发器索引的原文）重新分词
+    :param conn: 数据库连接（在调用方的事务中执行）
+    :return: 重新分词的行数
+    """
+    words, mnemonics = [
+        conn.execute(text(
+            f"SELECT s.id, s.{column} FROM fulltext_pending p JOIN {source} s ON s.id = p.id "
+            f"WHERE p.source = '{source}'"
+        )).all()
+        for _, column, source in _FTS_SOURCES
+    ]
+    refresh_fulltext(conn, words, mnemonics)
+    return len(words) + len(mnemonics)
+
+def index_fulltext(conn, min_word_id=0, min_mnemonic_id=0, chunk_size=5000):
+    """
+    把ID大于给定值的单词和记忆方法写入全文索引（迁移或批量导入后补建索引，分词在 Python 中完成）
+    :param conn: 数据库连接（在调用方的事务中执行）
+    """
+    for (table, column, source), last_id in zip(_FTS_SOURCES, (min_word_id, min_mnemonic_id)):
+        while True:
+            rows = conn.execute(text(
+                f"SELECT id, {column} FROM {source} WHERE id > :last_id AND {column} IS NOT NULL "
+                f"ORDER BY id LIMIT :limit"
+            ), {"last_id": last_id, "limit": chunk_size}).all()
+            if not rows:
+                break
+            conn.execute(text(f"INSERT INTO {table}(rowid, {column}) VALUES (:id, :body)"), [
+                {"id": row_id, "body": segment_text(body)} for row_id, body in rows
+            ])
+            last_id = rows[-1][0]
+
+def migrate_db(bind=None):
+    """
+    把已有的 dictionary.db 升级到当前结构版本
+    :param bind: 引擎，默认使用全局 engine
+    """
+    bind = bind or engine
+    with bind.begin() as conn:
+        version = conn.execute(text("PRAGMA user_version")).scalar()
+        if version < 1:
+            # v1: 记忆方法排行榜的复合索引
+            conn.execute(text(SECONDARY_INDEXES['ix_mnemonics_word_votes']))
+        if version < 4:
+            # v2: 释义和记忆方法的全文索引；
+            # v3: 触发器不再调用 Python 注册的 fts_segment（其他 SQLite 客户端写入时会报错）；
+            # v4: 触发器把未分词的行记入 fulltext_pending。每次升级都重建全文索引
+            for name in FTS_TRIGGERS:
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+            for table, _, _ in _FTS_SOURCES:
+                conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+            for sql in FTS_TABLES + list(FTS_TRIGGERS.values()):
+                conn.execute(text(sql))
+            index_fulltext(conn)
+            conn.execute(text("DELETE FROM fulltext_pending"))
+        if version < SCHEMA_VERSION:
+            conn.execute(text(f"PRAGMA user_version={SCHEMA_VERSION}"))
+
+def initialize_db(bind=None):
+    """ 初始化数据库表结构，并执行必要的迁移 """
+    bind = bind or engine
+    with bind.connect() as conn:
+        # 结构版本已是最新时跳过 create_all 的逐表检查（启动更快）
+        if conn.execute(text("PRAGMA user_version")).scalar() >= SCHEMA_VERSION:
+            repair_schema(conn)
+            conn.commit()
+            return
+    Base.metadata.create_all(bind)
+    migrate_db(bind)
+
+def repair_schema(conn):
+    """
+    补建缺失的二级索引、全文索引表和触发器（例如批量导入中途崩溃后留下的），
+    并把 fulltext_pending 中记录的未分词索引项重新分词。
+    语句都带 IF NOT EXISTS，对象已存在时不做任何事，每次启动都可以执行
+    :param conn: 数据库连接
+    """
+    for sql in list(SECONDARY_INDEXES.values()) + FTS_TABLES + list(FTS_TRIGGERS.values()):
+        conn.execute(text(sql))
+    resegment_fulltext(conn)
 
 def save_word(session, word_str, definition_data):
     """
@@ -92,13 +698,268 @@ def save_word(session, word_str, definition_data):
         #     new_word.mnemonics.append(new_mnemonic)
 
         session.add(new_word)
+        session.flush()
+        refresh_fulltext(session, words=[(new_word.id, new_word.definition)])
         session.commit()
+        word_cache.invalidate(normalize_word(word_str))
+        prefix_index.add(new_word.word)
+        fuzzy_index.add(new_word.word)
         return new_word
 
+    except IntegrityError:
+        # 其他线程或进程在检查之后抢先插入了同一个单词，直接使用已有的记录
+        session.rollback()
+        existing_word = session.query(Word).filter_by(word=word_str).first()
+        if existing_word is None:
+            raise RuntimeError(f"保存单词失败: {word_str} 违反唯一约束")
+        return existing_word
+
     except Exception as e:
         session.rollback()
         raise RuntimeError(f"保存单词失败: {str(e)}")
 
+def load_existing_words(session):
+    """
+    一次性读取数据库中已有的全部单词（集合查询，避免逐词 filter_by）
+    :param session: 数据库会话
+    :return: 单词文本集合
+    """
+    return {w for (w,) in session.query(Word.word)}
+
+def find_existing_words(session, words):
+    """
+    按块 IN 查询找出已收录的单词
+    :param session: 数据库会话
+    :param words: 单词序列
+    :return: 其中已存在的单词集合
+    """
+    existing = set()
+    for chunk in _chunks(list(words)):
+        existing.update(w for (w,) in session.query(Word.word).filter(Word.word.in_(chunk)))
+    return existing
+
+def save_words(session, items):
+    """
+    在同一个事务中批量保存单词
+    :param session: 数据库会话
+    :param items: (单词, 释义字典) 序列
+    :return: 实际新插入的单词数量
+    """
+    try:
+        pending = {}
+        for word_str, definition_data in items:
+            pending.setdefault(word_str, definition_data)
+        if not pending:
+            return 0
+
+        # 同一批次内只做一次存在性检查
+        existing = find_existing_words(session, pending)
+        rows = [
+            {"word": w, "definition": "\n".join(d.get('definitions', []))}
+            for w, d in pending.items() if w not in existing
+        ]
+        if not rows:
+            return 0
+        # 检查之后其他写入者可能插入了同样的单词：冲突的行直接跳过，RETURNING 只返回实际插入的单词
+        stmt = (
+            sqlite_insert(Word).values(rows)
+            .on_conflict_do_nothing(index_elements=[Word.word])
+            .returning(Word.id, Word.word, Word.definition)
+        )
+        inserted = session.execute(stmt).all()
+        refresh_fulltext(session, words=[(i, d) for i, _, d in inserted])
+        session.commit()
+        for _, w, _ in inserted:
+            word_cache.invalidate(normalize_word(w))
+            prefix_index.add(w)
+            fuzzy_index.add(w)
+        return len(inserted)
+
+    except Exception as e:
+        session.rollback()
+        raise RuntimeError(f"批量保存单词失败: {str(e)}")
+
+def add_mnemonic(session, word_id, method_type, content):
+    """
+    为单词添加记忆方法
+    :param session: 数据库会话
+    :param word_id: 单词ID
+    :param method_type: 记忆法类型
+    :param content: 具体内容
+    :return: 新记忆方法的 MnemonicSnapshot（会话关闭后仍可使用）
+    """
+    try:
+        new_mnemonic = Mnemonic(
+            word_id=word_id,
+            method_type=method_type,
+            content=content
+        )
+        session.add(new_mnemonic)
+        session.flush()
+        refresh_fulltext(session, mnemonics=[(new_mnemonic.id, new_mnemonic.content)])
+        session.commit()
+        word_cache.invalidate_word_id(word_id)
+        return snapshot_mnemonic(new_mnemonic)
+    except Exception as e:
+        session.rollback()
+        raise RuntimeError(f"保存记忆方法失败: {str(e)}")
+
+def _increment_votes(session, mnemonic_id, count):
+    """ 单条原子更新语句：UPDATE ... SET votes = votes + :count RETURNING word_id, votes """
+    stmt = (
+        update(Mnemonic)
+        .where(Mnemonic.id == mnemonic_id)
+        .values(votes=Mnemonic.votes + count)
+        .returning(Mnemonic.word_id, Mnemonic.votes)
+        .execution_options(synchronize_session=False)
+    )
+    return session.execute(stmt).first()
+
+def upvote_mnemonic(session, mnemonic_id, count=1):
+    """
+    记忆方法点赞（原子自增，多个写入者同时点赞也不会丢失更新）
+    :param session: 数据库会话
+    :param mnemonic_id: 记忆方法ID
+    :param count: 增加的点赞数
+    :return: 更新后的点赞数
+    """
+    try:
+        row = _increment_votes(session, mnemonic_id, count)
+        if row is None:
+            raise ValueError(f"记忆方法不存在: {mnemonic_id}")
+        session.commit()
+        word_cache.invalidate_word_id(row.word_id)
+        return row.votes
+    except Exception as e:
+        session.rollback()
+        raise RuntimeError(f"点赞失败: {str(e)}")
+
+class VoteService:
+    """
+    点赞合并写入服务
+    短时间内的多次点赞先在内存中按记忆方法合并计数，再由后台线程在一个事务中批量写入
+    """
+
+    def __init__(self, flush_interval=0.05, max_batch=500, on_flushed=None, on_error=None, on_retry=None,
+                 max_retries=5):
+        """
+        :param flush_interval: 合并窗口(秒)，窗口内的点赞合并为一次写入
+        :param max_batch: 待写入的点赞数达到该值时立即写入
+        :param on_flushed: 写入完成回调，参数为 {记忆方法ID: 最新点赞数}（在后台线程中调用）
+        :param on_error: 点赞被丢弃时的回调（连续失败超过 max_retries 次），参数为异常对象（在后台线程中调用）
+        :param on_retry: 写入失败、批次已放回队列等待重试时的回调，参数为异常对象（在后台线程中调用）
+        :param max_retries: 写入失败的批次放回队列重试的次数上限，连续失败超过该次数时丢弃待写入的点赞
+        """
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.on_flushed = on_flushed
+        self.on_error = on_error
+        self.on_retry = on_retry
+        self.max_retries = max_retries
+        self._pending = {}  # 记忆方法ID -> 待写入的点赞数
+        self._pending_total = 0
+        self._failures = 0  # 连续写入失败的次数
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # 保证同一时间只有一个批次在写入
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = None
+
+    def vote(self, mnemonic_id, count=1):
+        """ 提交一次点赞，立即返回 """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("点赞服务已关闭")
+            self._pending[mnemonic_id] = self._pending.get(mnemonic_id, 0) + count
+            self._pending_total += count
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            if self._pending_total >= self.max_batch:
+                self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                pass  # 已通过 on_retry / on_error 通知调用方
+            with self._lock:
+                if self._closed and not self._pending:
+                    return
+
+    def flush(self):
+        """
+        立即写入所有待处理的点赞
+        :return: {记忆方法ID: 最新点赞数}
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._pending_total = 0
+            if not pending:
+                return {}
+
+            session = Session()
+            try:
+                results = {}
+                word_ids = set()
+                for mnemonic_id, count in pending.items():
+                    row = _increment_votes(session, mnemonic_id, count)
+                    if row is not None:
+                        results[mnemonic_id] = row.votes
+                        word_ids.add(row.word_id)
+                session.commit()  # 整批一次提交
+            except Exception as e:
+                session.rollback()
+                if self._requeue(pending):
+                    error = RuntimeError(f"点赞失败: {str(e)}（第 {self._failures} 次失败，稍后重试）")
+                    callback = self.on_retry
+                else:
+                    error = RuntimeError(f"点赞失败: {str(e)}（已连续失败 {self.max_retries + 1} 次，"
+                                         f"丢弃 {sum(pending.values())} 个点赞）")
+                    callback = self.on_error
+                if callback:
+                    callback(error)
+                raise error from e
+            finally:
+                session.close()
+
+            self._failures = 0
+
+            for word_id in word_ids:
+                word_cache.invalidate_word_id(word_id)
+            if self.on_flushed:
+                self.on_flushed(results)
+            return results
+
+    def _requeue(self, pending):
+        """
+        把写入失败的批次合并回待写入队列，下一个合并窗口重试；连续失败次数超过上限时丢弃
+        :return: 放回队列时返回 True，丢弃时返回 False
+        """
+        self._failures += 1
+        if self._failures > self.max_retries:
+            self._failures = 0
+            return False
+        with self._lock:
+            for mnemonic_id, count in pending.items():
+                self._pending[mnemonic_id] = self._pending.get(mnemonic_id, 0) + count
+                self._pending_total += count
+        return True
+
+    def close(self):
+        """ 写入剩余的点赞并停止后台线程 """
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        self._wakeup.set()
+        if thread is not None:
+            thread.join()
+        self.flush()
+
 if __name__ == '__main__':
     # 初始化数据库（仅首次运行）
     print("正在初始化数据库...")
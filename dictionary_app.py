@@ -1,95 +1,105 @@
 # dictionary_app.py
 import sys
 import os
+import html
+import threading
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLineEdit, QTextBrowser, QPushButton, QListWidget, QListWidgetItem,
-    QLabel, QDialog, QComboBox, QTextEdit, QMessageBox
+    QLineEdit, QTextBrowser, QPushButton, QListView,
+    QLabel, QDialog, QComboBox, QTextEdit, QMessageBox, QCompleter, QFileDialog
 )
-from PyQt5.QtCore import Qt, pyqtSignal, QTextCodec
-from database import Session, Word, Mnemonic, save_word
-from spider import OnlineDictionarySpider
+from PyQt5.QtCore import (
+    Qt, pyqtSignal, QTextCodec, QObject, QRunnable, QThreadPool, QStringListModel
+)
+from database import (
+    session_scope, initialize_db, add_mnemonic, VoteService, WordSnapshot, get_word_snapshot, get_word_id,
+    complete_word, suggest_words, fuzzy_index, search_fulltext, count_fulltext
+)
+from mnemonic_view import MnemonicListModel, MnemonicDelegate
+from prefetch import Prefetcher
+from lookup import fetch_and_store
+from offline_dict import open_offline_dict
+# 爬虫、网络库和页面解析器在首次在线查询时才导入（见 DictionaryApp.get_spider），不拖慢启动
 
 # 设置中文编码支持
 QTextCodec.setCodecForLocale(QTextCodec.codecForName("UTF-8"))
 
-class MnemonicItem(QWidget):
-    """自定义记忆方法条目组件，包含点赞功能和内容显示"""
-    vote_updated = pyqtSignal()  # 点赞更新信号，用于触发列表刷新
-
-    def __init__(self, mnemonic, parent=None):
+MODE_WORD = "查单词"
+MODE_REVERSE = "反查释义"
+FULLTEXT_PAGE_SIZE = 20  # 反查结果每页条数
+
+
+def make_excerpt(text, terms, width=30):
+    """
+    截取包含检索词的一段原文，并加粗检索词
+    :param text: 释义或记忆方法原文
+    :param terms: 检索词列表
+    :param width: 命中位置前后保留的字符数
+    :return: HTML 片段
+    """
+    lower = text.lower()
+    positions = [lower.find(t.lower()) for t in terms]
+    positions = [p for p in positions if p >= 0]
+    start = max(0, min(positions) - width) if positions else 0
+    end = min(len(text), start + 2 * width + max(map(len, terms), default=0))
+    excerpt = html.escape(text[start:end].replace("\n", " "))
+    for term in sorted(terms, key=len, reverse=True):
+        escaped = html.escape(term)
+        excerpt = excerpt.replace(escaped, f"<b style='color: #d6336c;'>{escaped}</b>")
+    return ("…" if start > 0 else "") + excerpt + ("…" if end < len(text) else "")
+
+
+class LookupSignals(QObject):
+    """在线查询任务的信号载体（QRunnable 本身不能发射信号）"""
+    finished = pyqtSignal(int, str, object)  # 查询序号, 单词, LookupResult
+    failed = pyqtSignal(int, str, str)  # 查询序号, 单词, 错误信息
+
+
+class LookupTask(QRunnable):
+    """在后台线程中执行在线抓取、解析和保存，结果快照通过信号回传到GUI线程"""
+
+    def __init__(self, seq, word, get_spider, prefetcher=None):
         """
-        初始化记忆方法条目
-        :param mnemonic: Mnemonic 数据库对象
-        :param parent: 父组件
+        初始化查询任务
+        :param seq: 查询序号，用于丢弃过期结果
+        :param word: 要查询的单词
+        :param get_spider: 返回共享的 OnlineDictionarySpider 实例的函数（首次调用时创建爬虫）
+        :param prefetcher: 共享同一爬虫的预取器，查询期间暂停预取
         """
-        super().__init__(parent)
-        self.mnemonic = mnemonic
-        self.initUI()
+        super().__init__()
+        self.seq = seq
+        self.word = word
+        self.get_spider = get_spider
+        self.prefetcher = prefetcher
+        self.signals = LookupSignals()
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        取消任务：未开始的任务直接跳过；进行中的任务在下一次等待令牌或重试前中止
+        （让出线程池中的线程），结果不再回传
+        """
+        self.cancelled = True
 
-    def initUI(self):
-        """初始化界面布局和样式"""
-        layout = QHBoxLayout()
-        layout.setContentsMargins(10, 5, 10, 5)  # 设置边距
-        
-        # 左侧投票区域布局
-        vote_layout = QVBoxLayout()
-        # 点赞按钮设置
-        self.upvote_btn = QPushButton("▲")
-        self.upvote_btn.setFixedSize(30, 30)
-        self.upvote_btn.setStyleSheet("""
-            QPushButton {
-                background: #e9ecef;
-                border-radius: 5px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background: #dee2e6;
-            }
-        """)
-        self.upvote_btn.clicked.connect(self.upvote)
-        
-        # 点赞数显示标签
-        self.vote_label = QLabel(str(self.mnemonic.votes))
-        self.vote_label.setAlignment(Qt.AlignCenter)
-        self.vote_label.setStyleSheet("color: #495057;")
-        
-        vote_layout.addWidget(self.upvote_btn)
-        vote_layout.addWidget(self.vote_label)
-        layout.addLayout(vote_layout)
-
-        # 右侧内容区域布局
-        content_layout = QVBoxLayout()
-        # 记忆法类型标签
-        self.method_label = QLabel(
-            f"[{self.mnemonic.method_type}]",
-            styleSheet="color: #6c757d; font-size: 12px;"  # 灰色小字样式
-        )
-        # 具体内容标签
-        self.content_label = QLabel(self.mnemonic.content)
-        self.content_label.setWordWrap(True)  # 启用自动换行
-        self.content_label.setStyleSheet("font-size: 14px; color: #212529;")
-        
-        content_layout.addWidget(self.method_label)
-        content_layout.addWidget(self.content_label)
-        layout.addLayout(content_layout)
-        
-        self.setLayout(layout)
-        self.setStyleSheet("background: #fff; border-radius: 8px;")  # 白色圆角背景
+    def is_cancelled(self):
+        return self.cancelled
 
-    def upvote(self):
-        """处理点赞操作，更新数据库并刷新显示"""
+    def run(self):
+        if self.cancelled:
+            return
         try:
-            session = Session()
-            session.add(self.mnemonic)
-            self.mnemonic.votes += 1  # 点赞数+1
-            session.commit()  # 提交到数据库
-            self.vote_label.setText(str(self.mnemonic.votes))  # 更新显示
-            self.vote_updated.emit()  # 发送刷新信号
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"更新失败: {str(e)}")
-        finally:
-            session.close()  # 确保关闭会话
+            spider = self.get_spider()
+            if self.prefetcher is not None:
+                with self.prefetcher.foreground():
+                    outcome = fetch_and_store(spider, self.word, cancelled=self.is_cancelled)
+            else:
+                outcome = fetch_and_store(spider, self.word, cancelled=self.is_cancelled)
+        except Exception as e:  # 包括被取消时的 FetchCancelled
+            if not self.cancelled:
+                self.signals.failed.emit(self.seq, self.word, str(e))
+            return
+        if not self.cancelled:
+            self.signals.finished.emit(self.seq, self.word, outcome)
 
 class AddMnemonicDialog(QDialog):
     """添加记忆方法对话框，包含类型选择和内容输入"""
@@ -184,12 +194,32 @@ class AddMnemonicDialog(QDialog):
 
 class DictionaryApp(QMainWindow):
     """主应用程序窗口，包含核心功能逻辑"""
+    votes_flushed = pyqtSignal(dict)  # 点赞写入完成（从点赞服务线程转到GUI线程）
+    votes_failed = pyqtSignal(str)  # 点赞写入失败并被丢弃
+    votes_retrying = pyqtSignal(str)  # 点赞写入失败，稍后重试
+
     def __init__(self):
         super().__init__()
-        # 初始化数据库会话和爬虫
-        self.session = Session()
-        self.spider = OnlineDictionarySpider()
+        # 爬虫在首次在线查询时才创建（数据库会话按操作通过 session_scope 创建，窗口不持有长期会话）
+        self._spider = None
+        self._spider_lock = threading.Lock()
         self.current_word = None  # 当前显示的单词对象
+        # 在线查询线程池：抓取在后台进行，避免阻塞界面
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(2)
+        self.search_seq = 0  # 每次搜索递增，只接受最新一次查询的结果
+        self.pending_task = None  # 正在进行的在线查询任务
+        self.fulltext_query = ""  # 当前反查的检索词
+        # 只读的离线基础词库（内存映射文件），查询时最先使用
+        self.offline_dict = open_offline_dict()
+        # 按单词表学习时，在后台预取接下来的单词（与前台共享爬虫和限速）
+        self.prefetcher = Prefetcher(self.get_spider)
+        # 点赞合并写入，完成后只更新受影响的条目
+        self.vote_service = VoteService(
+            on_flushed=self.votes_flushed.emit,
+            on_error=lambda e: self.votes_failed.emit(str(e)),
+            on_retry=lambda e: self.votes_retrying.emit(str(e))
+        )
         
         # 初始化界面和功能
         self.initUI()
@@ -211,6 +241,10 @@ class DictionaryApp(QMainWindow):
 
         # 搜索区域布局
         search_layout = QHBoxLayout()
+        # 查询模式：按单词查释义，或按释义/记忆方法内容反查单词
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems([MODE_WORD, MODE_REVERSE])
+        self.mode_combo.setStyleSheet("padding: 8px; font-size: 14px;")
         # 搜索输入框
         self.search_box = QLineEdit()
         self.search_box.setPlaceholderText("输入要查询的单词...")
@@ -222,6 +256,12 @@ class DictionaryApp(QMainWindow):
                 font-size: 16px;
             }
         """)
+        # 自动补全：候选词由内存前缀索引实时提供
+        self.completion_model = QStringListModel(self)
+        self.completer = QCompleter(self.completion_model, self)
+        self.completer.setCaseSensitivity(Qt.CaseInsensitive)
+        self.completer.setMaxVisibleItems(10)
+        self.search_box.setCompleter(self.completer)
         # 搜索按钮
         self.search_btn = QPushButton("搜索")
         self.search_btn.setStyleSheet("""
@@ -236,10 +276,23 @@ class DictionaryApp(QMainWindow):
                 background: #0069d9;
             }
         """)
+        search_layout.addWidget(self.mode_combo)
         search_layout.addWidget(self.search_box, 4)  # 4:1 的比例分配空间
         search_layout.addWidget(self.search_btn, 1)
         main_layout.addLayout(search_layout)
 
+        # 单词表区域：按顺序学习，后台预取后续单词
+        word_list_layout = QHBoxLayout()
+        self.load_list_btn = QPushButton("📚 加载单词表")
+        self.prev_btn = QPushButton("◀ 上一个")
+        self.next_btn = QPushButton("下一个 ▶")
+        self.word_list_label = QLabel("未加载单词表")
+        for btn in (self.load_list_btn, self.prev_btn, self.next_btn):
+            btn.setStyleSheet("padding: 6px 12px;")
+            word_list_layout.addWidget(btn)
+        word_list_layout.addWidget(self.word_list_label, 1)
+        main_layout.addLayout(word_list_layout)
+
         # 单词释义显示区域
         self.definition_display = QTextBrowser()
         self.definition_display.setStyleSheet("""
@@ -252,6 +305,7 @@ class DictionaryApp(QMainWindow):
                 line-height: 1.6;
             }
         """)
+        self.definition_display.setOpenLinks(False)  # 链接由 on_link_clicked 处理
         main_layout.addWidget(self.definition_display)
 
         # 记忆方法区域
@@ -259,16 +313,23 @@ class DictionaryApp(QMainWindow):
         mnemonics_layout.addWidget(QLabel("🏅 记忆方法排行榜"))  # 装饰性标题
         
         # 记忆方法列表
-        self.mnemonic_list = QListWidget()
+        # 模型/视图：只绘制可见的行，滚动到底部时再从数据库分页加载
+        self.mnemonic_model = MnemonicListModel(self)
+        self.mnemonic_delegate = MnemonicDelegate(self)
+        self.mnemonic_list = QListView()
+        self.mnemonic_list.setModel(self.mnemonic_model)
+        self.mnemonic_list.setItemDelegate(self.mnemonic_delegate)
+        self.mnemonic_list.setResizeMode(QListView.Adjust)  # 宽度变化时重新计算换行高度
+        self.mnemonic_list.setLayoutMode(QListView.Batched)  # 大量条目时分批布局，不阻塞界面
+        self.mnemonic_list.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.mnemonic_list.setSelectionMode(QListView.NoSelection)
+        self.mnemonic_list.setMouseTracking(True)  # 悬停时高亮点赞按钮
         self.mnemonic_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 background: white;
                 border: 1px solid #dee2e6;
                 border-radius: 6px;
             }
-            QListWidget::item { 
-                margin: 5px;
-            }
         """)
         mnemonics_layout.addWidget(self.mnemonic_list)
         
@@ -294,7 +355,18 @@ class DictionaryApp(QMainWindow):
         """连接所有信号与槽函数"""
         self.search_btn.clicked.connect(self.on_search)
         self.search_box.returnPressed.connect(self.on_search)  # 回车触发搜索
+        self.search_box.textEdited.connect(self.update_completions)  # 输入时更新补全候选
+        self.completer.activated.connect(self.on_search)  # 选中候选词后直接搜索
+        self.mode_combo.currentTextChanged.connect(self.on_mode_changed)
+        self.definition_display.anchorClicked.connect(self.on_link_clicked)
+        self.mnemonic_delegate.upvote_clicked.connect(self.on_upvote_clicked)
+        self.votes_flushed.connect(self.on_votes_flushed)
+        self.votes_failed.connect(self.on_votes_failed)
+        self.votes_retrying.connect(self.on_votes_retrying)
         self.upload_btn.clicked.connect(self.show_add_mnemonic_dialog)
+        self.load_list_btn.clicked.connect(self.load_word_list)
+        self.prev_btn.clicked.connect(lambda: self.step_word_list(-1))
+        self.next_btn.clicked.connect(lambda: self.step_word_list(1))
 
     def load_style(self):
         """加载全局样式表"""
@@ -308,39 +380,257 @@ class DictionaryApp(QMainWindow):
             }
         """)
 
+    def update_completions(self, text):
+        """根据当前输入更新自动补全候选（反查模式下不补全）"""
+        if self.mode_combo.currentText() == MODE_REVERSE or not text.strip():
+            self.completion_model.setStringList([])
+            return
+        self.completion_model.setStringList(complete_word(text))
+
+    def on_mode_changed(self, mode):
+        """切换查询模式时更新输入提示"""
+        self.completion_model.setStringList([])
+        if mode == MODE_REVERSE:
+            self.search_box.setPlaceholderText("输入释义或记忆方法中的内容，例如：雄心")
+        else:
+            self.search_box.setPlaceholderText("输入要查询的单词...")
+
     def on_search(self):
         """处理搜索功能的核心逻辑"""
+        if self.mode_combo.currentText() == MODE_REVERSE:
+            self.search_fulltext(self.search_box.text().strip())
+            return
         word = self.search_box.text().strip().lower()
         if not word:
             return
+        self.search_word(word)
 
-        # 显示加载状态
-        self.definition_display.setText("⏳ 正在查询，请稍候...")
-        QApplication.processEvents()  # 强制刷新UI
+    def search_fulltext(self, query, page=0):
+        """
+        按释义和记忆方法内容反查单词，结果按相关度排序并分页显示
+        :param query: 检索词
+        :param page: 页码（从0开始）
+        """
+        if not query:
+            return
+        # 反查期间之前的在线查询结果不再显示
+        self.search_seq += 1
+        self.cancel_pending_lookup()
+        self.fulltext_query = query
+        self.current_word = None
+        self.load_mnemonics()
+        try:
+            with session_scope(readonly=True) as session:
+                total = count_fulltext(session, query)
+                hits = search_fulltext(session, query, limit=FULLTEXT_PAGE_SIZE,
+                                       offset=page * FULLTEXT_PAGE_SIZE)
+        except Exception as e:
+            self.definition_display.setText(f"❌ 发生错误: {str(e)}")
+            return
+
+        if not hits:
+            self.definition_display.setHtml(f"<p>🔍 没有找到释义或记忆方法中包含 <b>{html.escape(query)}</b> 的单词</p>")
+            return
+
+        terms = query.split()
+        items = []
+        for hit in hits:
+            source = "释义" if hit.field == "definition" else "记忆方法"
+            items.append(
+                f"<p><a href=\"word:{hit.word}\" style='font-size: 16px;'>{hit.word}</a>"
+                f" <span style='color: #6c757d;'>[{source}]</span><br>"
+                f"{make_excerpt(hit.text, terms)}</p>"
+            )
+        pages = (total + FULLTEXT_PAGE_SIZE - 1) // FULLTEXT_PAGE_SIZE
+        nav = []
+        if page > 0:
+            nav.append(f'<a href="fulltext:{page - 1}">上一页</a>')
+        nav.append(f"第 {page + 1}/{pages} 页")
+        if page + 1 < pages:
+            nav.append(f'<a href="fulltext:{page + 1}">下一页</a>')
+        self.definition_display.setHtml(
+            f"<p>🔎 共有 {total} 个单词的释义或记忆方法包含 <b>{html.escape(query)}</b>：</p>"
+            + "".join(items) + "<p>" + " | ".join(nav) + "</p>"
+        )
+
+    def search_word(self, word, allow_fuzzy=True):
+        """
+        查询单词：本地词库 -> 本地拼写纠错 -> 在线查询
+        :param word: 规范化后的单词
+        :param allow_fuzzy: 本地未收录时是否先给出拼写建议
+        """
+        # 新的查询使之前未完成的在线查询失效
+        self.search_seq += 1
+        self.cancel_pending_lookup()
+        self.prefetcher.on_lookup(word)
+        self.update_word_list_label(word)
 
         try:
-            # 优先查询本地数据库
-            local_word = self.session.query(Word).filter_by(word=word).first()
+            # 优先查询本地（离线词库 -> 热词缓存 -> 数据库）
+            local_word = self.lookup_offline(word) or get_word_snapshot(word)
             if local_word:
                 self.current_word = local_word
                 self.display_word(local_word)
+                self.load_mnemonics()
                 return
 
-            # 在线查询（本地不存在时）
-            result = self.spider.fetch_definition(word)
-            if "error" in result:
-                self.definition_display.setText(f"⚠️ {result['error']}")
-                return
-
-            # 保存新单词到数据库
-            new_word = save_word(self.session, word, result)
-            self.current_word = new_word
-            self.display_word(new_word, examples=result.get("examples", []))
-            
+            # 本地有相近单词时先给出建议，避免拼写错误白白发起网络请求；
+            # 纠错索引在后台加载，就绪之前不给建议，界面不等待
+            suggestions = suggest_words(word, wait=False) if allow_fuzzy else []
         except Exception as e:
             self.definition_display.setText(f"❌ 发生错误: {str(e)}")
-        finally:
-            self.load_mnemonics()  # 无论结果如何都加载记忆方法
+            return
+
+        if suggestions:
+            self.current_word = None
+            self.load_mnemonics()
+            self.show_suggestions(word, suggestions)
+            return
+
+        # 在线查询（本地不存在时）在后台线程中进行
+        self.current_word = None
+        self.load_mnemonics()
+        self.definition_display.setText("⏳ 正在查询，请稍候...")
+        task = LookupTask(self.search_seq, word, self.get_spider, self.prefetcher)
+        task.signals.finished.connect(self.on_lookup_finished)
+        task.signals.failed.connect(self.on_lookup_failed)
+        self.pending_task = task
+        self.thread_pool.start(task)
+
+    def get_spider(self):
+        """
+        取得共享的爬虫，首次调用时才导入网络库和页面解析器并创建（在查询线程中调用，不阻塞界面）
+        配置了本地词典（DICTIONARY_LOCAL_DICTS）时优先查本地，DICTIONARY_OFFLINE=1 时完全离线
+        """
+        with self._spider_lock:
+            if self._spider is None:
+                from spider import OnlineDictionarySpider
+                from backends import backends_from_env
+                from spider_cache import SpiderCache
+                self._spider = OnlineDictionarySpider(
+                    cache=SpiderCache(),
+                    backends=backends_from_env(),
+                    offline=os.environ.get('DICTIONARY_OFFLINE') == '1'
+                )
+            return self._spider
+
+    def lookup_offline(self, word):
+        """
+        在离线词库中查询单词（不经过数据库）
+        :return: 单词ID和记忆方法待加载（id、mnemonics 为 None）的 WordSnapshot，未收录时返回 None
+        """
+        if self.offline_dict is None:
+            return None
+        entry = self.offline_dict.get(word)
+        if entry is None:
+            return None
+        # 离线词库中的ID在数据库重建或导入之后可能已经过期，不使用，需要时再按单词查询
+        return WordSnapshot(None, entry.word, entry.definition, None)
+
+    def current_word_id(self):
+        """
+        当前单词在数据库中的ID（来自离线词库的单词第一次使用时按单词文本查询）
+        :return: 单词ID，没有当前单词或单词只在离线词库中时返回 None
+        """
+        if self.current_word is None:
+            return None
+        if self.current_word.id is None:
+            word_id = get_word_id(self.current_word.word)
+            if word_id is None:
+                return None
+            self.current_word = self.current_word._replace(id=word_id)
+        return self.current_word.id
+
+    def load_word_list(self):
+        """从文本文件加载单词表（每行一个单词），并跳到第一个单词"""
+        path, _ = QFileDialog.getOpenFileName(self, "选择单词表", "", "文本文件 (*.txt);;所有文件 (*)")
+        if not path:
+            return
+        from bulk_import import read_word_list
+        try:
+            words = read_word_list(path)
+        except (OSError, UnicodeDecodeError) as e:
+            QMessageBox.critical(self, "错误", f"读取单词表失败: {str(e)}")
+            return
+        self.prefetcher.set_word_list(words)
+        if self.prefetcher.words:
+            self.mode_combo.setCurrentText(MODE_WORD)
+            self.search_box.setText(self.prefetcher.words[0])
+            self.search_word(self.prefetcher.words[0])
+
+    def step_word_list(self, step):
+        """在单词表中前进或后退一个单词"""
+        words = self.prefetcher.words
+        if not words:
+            return
+        current = self.current_word.word if self.current_word else self.search_box.text()
+        i = self.prefetcher.position(current)
+        i = 0 if i is None else min(max(i + step, 0), len(words) - 1)
+        self.mode_combo.setCurrentText(MODE_WORD)
+        self.search_box.setText(words[i])
+        self.search_word(words[i])
+
+    def update_word_list_label(self, word):
+        """显示单词表进度和预取命中率"""
+        words = self.prefetcher.words
+        if not words:
+            return
+        i = self.prefetcher.position(word)
+        progress = f"{i + 1}/{len(words)}" if i is not None else f"-/{len(words)}"
+        self.word_list_label.setText(
+            f"单词表 {progress} · 预取命中率 {self.prefetcher.hit_ratio():.0%}"
+            f"（已预取 {self.prefetcher.stats['prefetched']} 个）"
+        )
+
+    def show_suggestions(self, word, suggestions):
+        """显示“你是不是要找”候选，点击候选词或在线查询链接继续搜索"""
+        links = "、".join(f'<a href="word:{s}">{s}</a>' for s in suggestions)
+        self.definition_display.setHtml(
+            f"<p>🔍 本地词库中没有找到 <b>{word}</b>，你是不是要找：</p>"
+            f"<p style='font-size: 16px;'>{links}</p>"
+            f"<p><a href=\"online:{word}\">🌐 仍然在线查询 {word}</a></p>"
+        )
+
+    def on_link_clicked(self, url):
+        """处理释义区域中的链接点击"""
+        word = url.path()
+        if url.scheme() == "word":
+            self.mode_combo.setCurrentText(MODE_WORD)
+            self.search_box.setText(word)
+            self.search_word(word)
+        elif url.scheme() == "online":
+            self.search_word(word, allow_fuzzy=False)
+        elif url.scheme() == "fulltext":
+            self.search_fulltext(self.fulltext_query, int(word))
+
+    def cancel_pending_lookup(self):
+        """取消尚未返回的在线查询"""
+        if self.pending_task is not None:
+            self.pending_task.cancel()
+            self.thread_pool.tryTake(self.pending_task)  # 尚未开始的任务直接移出队列
+            self.pending_task = None
+
+    def on_lookup_finished(self, seq, word, outcome):
+        """接收后台查询结果（在GUI线程中执行，单词已在后台保存）"""
+        if seq != self.search_seq:
+            return  # 过期结果，不能覆盖更新的查询
+        self.pending_task = None
+
+        if outcome.snapshot is None:
+            self.definition_display.setText(f"⚠️ {outcome.result['error']}")
+        else:
+            self.current_word = outcome.snapshot
+            examples = outcome.result.get("examples", []) if outcome.result else None
+            self.display_word(self.current_word, examples=examples)
+        self.load_mnemonics()
+
+    def on_lookup_failed(self, seq, word, message):
+        """后台查询或保存失败"""
+        if seq != self.search_seq:
+            return
+        self.pending_task = None
+        self.definition_display.setText(f"❌ 发生错误: {message}")
+        self.load_mnemonics()
 
     def display_word(self, word, examples=None):
         """格式化显示单词信息"""
@@ -364,49 +654,64 @@ class DictionaryApp(QMainWindow):
 
     def save_mnemonic(self, data):
         """保存记忆方法到数据库"""
+        word_id = self.current_word_id()
+        if word_id is None:
+            QMessageBox.warning(self, "提示", "该单词只在离线词库中，数据库里还没有，暂时不能添加记忆方法。")
+            return
         try:
-            session = Session()
-            new_mnemonic = Mnemonic(
-                word_id=self.current_word.id,
-                method_type=data["method_type"],
-                content=data["content"]
-            )
-            session.add(new_mnemonic)
-            session.commit()
-            self.load_mnemonics()  # 刷新列表
-            QMessageBox.information(self, "成功", "记忆方法已添加！")
+            with session_scope() as session:
+                add_mnemonic(session, word_id, data["method_type"], data["content"])
         except Exception as e:
-            session.rollback()  # 回滚事务
             QMessageBox.critical(self, "错误", f"保存失败: {str(e)}")
-        finally:
-            session.close()
+            return
+        self.load_mnemonics()  # 刷新列表
+        QMessageBox.information(self, "成功", "记忆方法已添加！")
 
     def load_mnemonics(self):
         """加载并显示当前单词的记忆方法"""
-        self.mnemonic_list.clear()
         if not self.current_word:
+            self.mnemonic_model.set_word(None)
             return
+        if self.current_word.mnemonics is None:
+            # 来自离线词库：查出数据库中的单词ID后只分页读取记忆方法，不加载单词本身；
+            # 数据库中没有这个单词时不显示记忆方法
+            if self.current_word_id() is None:
+                self.mnemonic_model.set_word(None)
+            else:
+                self.mnemonic_model.set_word(self.current_word)
+            return
+        # 热词缓存在写入后会自动失效，这里读到的总是最新排名
+        self.mnemonic_model.set_word(get_word_snapshot(self.current_word.word))
 
-        session = Session()
-        try:
-            # 获取最新数据（避免缓存问题）
-            word = session.query(Word).get(self.current_word.id)
-            # 按点赞数降序排序
-            mnemonics = sorted(word.mnemonics, key=lambda x: x.votes, reverse=True)
-            
-            for m in mnemonics:
-                item = QListWidgetItem()
-                widget = MnemonicItem(m)
-                widget.vote_updated.connect(self.load_mnemonics)  # 绑定刷新信号
-                self.mnemonic_list.addItem(item)
-                self.mnemonic_list.setItemWidget(item, widget)
-                item.setSizeHint(widget.sizeHint())  # 设置合适的高度
-        finally:
-            session.close()
+    def on_upvote_clicked(self, row):
+        """处理点赞：先原地更新该行显示，再交给点赞服务合并写入数据库"""
+        mnemonic = self.mnemonic_model.mnemonic_at(row)
+        self.mnemonic_model.set_votes(mnemonic.id, mnemonic.votes + 1)
+        self.vote_service.vote(mnemonic.id)
+
+    def on_votes_flushed(self, results):
+        """点赞写入数据库后，用数据库中的最新点赞数原地更新对应行（不重建列表）"""
+        self.mnemonic_model.update_votes(results)
+
+    def on_votes_failed(self, message):
+        """点赞被丢弃时提示并重新加载列表（撤销界面上乐观更新的点赞数）"""
+        QMessageBox.critical(self, "错误", f"更新失败: {message}")
+        self.load_mnemonics()
+
+    def on_votes_retrying(self, message):
+        """点赞写入失败但仍会重试：只在状态栏提示，保留界面上的点赞数"""
+        self.statusBar().showMessage(message, 5000)
 
     def closeEvent(self, event):
         """处理窗口关闭事件"""
-        self.session.close()  # 关闭数据库会话
+        self.cancel_pending_lookup()
+        self.thread_pool.clear()
+        self.prefetcher.close()
+        if self.offline_dict is not None:
+            self.offline_dict.close()
+        self.vote_service.close()  # 写入尚未提交的点赞
+        # 在后台线程保存本次会话中新增单词的纠错索引（非守护线程，进程退出前会等它写完）
+        threading.Thread(target=fuzzy_index.save, name='fuzzy-index-save').start()
         super().closeEvent(event)
 
 if __name__ == '__main__':
@@ -414,6 +719,7 @@ if __name__ == '__main__':
     os.environ["QT_QPA_PLATFORM_PLUGIN_PATH"] = os.path.dirname(sys.argv[0])
     
     app = QApplication(sys.argv)
+    initialize_db()  # 创建缺失的表并升级旧版本数据库
     window = DictionaryApp()
     window.show()
     sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,261 @@
+# dictionary_io.py
+"""
+词典数据导入/导出工具
+
+用法:
+    python dictionary_io.py export words.jsonl
+    python dictionary_io.py export words.csv --format csv
+    python dictionary_io.py import words.jsonl --chunk-size 5000
+
+JSONL 格式每行一个单词:
+    {"word": "ambition", "definition": "...", "mnemonics": [{"method_type": "...", "content": "...", "votes": 5}]}
+CSV 格式每行一条记忆方法（同一单词的行相邻，没有记忆方法的单词占一行且记忆方法列为空）:
+    word,definition,method_type,content,votes
+
+导入和导出都按块流式处理，内存占用与文件大小无关。
+导入时已存在的单词（连同其记忆方法）会被跳过。
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+
+from sqlalchemy import func, insert, select, text
+
+from database import (
+    engine, initialize_db, reset_caches, index_fulltext, FTS_INSERT_TRIGGERS, SECONDARY_INDEXES,
+    Word, Mnemonic
+)
+
+CSV_FIELDS = ['word', 'definition', 'method_type', 'content', 'votes']
+
+# 导入期间暂时删除、导入完成后重建的索引（逐行维护索引比最后一次性建索引慢得多）。
+# 导入中途崩溃时，下次启动的 initialize_db 会补建这些索引
+DEFERRED_INDEXES = SECONDARY_INDEXES
+
+
+class RateReporter:
+    """ 统计并打印处理速度 """
+
+    def __init__(self, label):
+        self.label = label
+        self.words = 0
+        self.mnemonics = 0
+        self.skipped = 0
+        self.start = time.time()
+
+    def report(self, final=False):
+        elapsed = time.time() - self.start
+        rows = self.words + self.mnemonics
+        rate = rows / elapsed if elapsed > 0 else 0
+        prefix = "完成" if final else "进度"
+        skipped = f"，跳过 {self.skipped} 个已存在单词" if self.skipped else ""
+        print(f"{prefix}: {self.label} {self.words} 个单词、{self.mnemonics} 条记忆方法{skipped}，"
+              f"用时 {elapsed:.1f} 秒，{rate:.0f} 行/秒")
+
+
+def _detect_format(path, fmt):
+    if fmt != 'auto':
+        return fmt
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+# ---------- 导出 ----------
+
+def iter_entries(conn, chunk_size=5000):
+    """
+    按单词ID顺序流式读取单词及其记忆方法
+    :return: 生成器，每项为 (单词, 释义, [记忆方法字典, ...])
+    """
+    stmt = (
+        select(Word.id, Word.word, Word.definition, Mnemonic.method_type, Mnemonic.content, Mnemonic.votes)
+        .outerjoin(Mnemonic, Mnemonic.word_id == Word.id)
+        .order_by(Word.id, Mnemonic.votes.desc(), Mnemonic.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    rows = conn.execute(stmt)
+    for (_, word, definition), group in itertools.groupby(rows, key=lambda r: (r[0], r[1], r[2])):
+        mnemonics = [
+            {"method_type": r.method_type, "content": r.content, "votes": r.votes}
+            for r in group if r.content is not None
+        ]
+        yield word, definition, mnemonics
+
+
+def export_dictionary(path, fmt='auto', chunk_size=5000):
+    """
+    导出整个词典
+    :param path: 输出文件路径
+    :param fmt: 'jsonl' / 'csv' / 'auto'（按扩展名判断）
+    :param chunk_size: 每次从数据库读取的行数
+    """
+    fmt = _detect_format(path, fmt)
+    reporter = RateReporter("导出")
+    with engine.connect() as conn, open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS) if fmt == 'csv' else None
+        if writer:
+            writer.writeheader()
+        for word, definition, mnemonics in iter_entries(conn, chunk_size):
+            if writer:
+                base = {"word": word, "definition": definition or ""}
+                for m in mnemonics or [{"method_type": "", "content": "", "votes": ""}]:
+                    writer.writerow({**base, **m})
+            else:
+                f.write(json.dumps(
+                    {"word": word, "definition": definition, "mnemonics": mnemonics},
+                    ensure_ascii=False
+                ) + '\n')
+            reporter.words += 1
+            reporter.mnemonics += len(mnemonics)
+            if reporter.words % (chunk_size * 10) == 0:
+                reporter.report()
+    reporter.report(final=True)
+    return reporter
+
+
+# ---------- 导入 ----------
+
+def read_jsonl(f):
+    for line_no, line in enumerate(f, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"第 {line_no} 行不是合法的JSON: {e}")
+        yield record
+
+
+def read_csv(f):
+    """ 把相邻的同一单词的行合并为一条记录 """
+    reader = csv.DictReader(f)
+    for word, rows in itertools.groupby(reader, key=lambda r: r['word']):
+        rows = list(rows)
+        yield {
+            "word": word,
+            "definition": rows[0].get('definition') or None,
+            "mnemonics": [
+                {
+                    "method_type": r.get('method_type') or 'general',
+                    "content": r['content'],
+                    "votes": int(r.get('votes') or 0)
+                }
+                for r in rows if r.get('content')
+            ]
+        }
+
+
+def _import_chunk(conn, records, reporter):
+    """ 在当前事务中导入一块记录（Core executemany，不经过ORM） """
+    by_word = {}
+    for record in records:
+        word = record['word'].strip().lower()
+        if word and word not in by_word:
+            by_word[word] = record
+
+    existing = set(conn.execute(select(Word.word).where(Word.word.in_(list(by_word)))).scalars())
+    new_words = [w for w in by_word if w not in existing]
+    reporter.skipped += len(by_word) - len(new_words)
+    if not new_words:
+        return
+
+    conn.execute(insert(Word.__table__), [
+        {"word": w, "definition": by_word[w].get('definition')} for w in new_words
+    ])
+    ids = dict(conn.execute(select(Word.word, Word.id).where(Word.word.in_(new_words))).all())
+    mnemonic_rows = [
+        {
+            "word_id": ids[w],
+            "method_type": m.get('method_type') or 'general',
+            "content": m['content'],
+            "votes": int(m.get('votes') or 0)
+        }
+        for w in new_words for m in by_word[w].get('mnemonics') or []
+    ]
+    if mnemonic_rows:
+        conn.execute(insert(Mnemonic.__table__), mnemonic_rows)
+
+    reporter.words += len(new_words)
+    reporter.mnemonics += len(mnemonic_rows)
+
+
+def _import_batch(conn, batch, reporter):
+    """
+    在一个事务中导入多块记录。全文索引的插入触发器在事务内删除、提交前重建，
+    新行的索引在 Python 中分词后一次性写入：进程中途退出时整个事务回滚，触发器不会丢失
+    """
+    # pysqlite 不会在 DDL 之前自动开始事务，显式开始；IMMEDIATE 立即取得写锁，事务内的 ID 范围不会被其他写入者插入
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+    max_word_id = conn.execute(select(func.coalesce(func.max(Word.id), 0))).scalar()
+    max_mnemonic_id = conn.execute(select(func.coalesce(func.max(Mnemonic.id), 0))).scalar()
+    for name in FTS_INSERT_TRIGGERS:
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+    for chunk in batch:
+        _import_chunk(conn, chunk, reporter)
+    index_fulltext(conn, max_word_id, max_mnemonic_id)
+    for sql in FTS_INSERT_TRIGGERS.values():
+        conn.execute(text(sql))
+
+
+def import_dictionary(path, fmt='auto', chunk_size=5000, chunks_per_transaction=10):
+    """
+    导入词典文件
+    :param path: 输入文件路径
+    :param fmt: 'jsonl' / 'csv' / 'auto'（按扩展名判断）
+    :param chunk_size: 每次 executemany 的单词数
+    :param chunks_per_transaction: 每个事务包含的块数
+    """
+    fmt = _detect_format(path, fmt)
+    initialize_db()
+    reporter = RateReporter("导入")
+
+    with engine.connect() as conn:
+        # 导入期间删除二级索引，结束后一次性重建
+        for name in DEFERRED_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        conn.commit()
+        try:
+            with open(path, encoding='utf-8', newline='') as f:
+                records = read_csv(f) if fmt == 'csv' else read_jsonl(f)
+                chunks = iter(lambda: list(itertools.islice(records, chunk_size)), [])
+                while True:
+                    batch = list(itertools.islice(chunks, chunks_per_transaction))
+                    if not batch:
+                        break
+                    with conn.begin():  # 一个大事务包含多个块
+                        _import_batch(conn, batch, reporter)
+                    reporter.report()
+        finally:
+            print("正在重建索引...")
+            for sql in DEFERRED_INDEXES.values():
+                conn.execute(text(sql))
+            conn.commit()
+
+    reset_caches()
+    reporter.report(final=True)
+    return reporter
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="词典数据导入/导出")
+    parser.add_argument('command', choices=['import', 'export'])
+    parser.add_argument('path', help="JSONL 或 CSV 文件")
+    parser.add_argument('--format', choices=['auto', 'jsonl', 'csv'], default='auto')
+    parser.add_argument('--chunk-size', type=int, default=5000, help="每块的单词数")
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        export_dictionary(args.path, args.format, args.chunk_size)
+    else:
+        if not os.path.exists(args.path):
+            parser.error(f"文件不存在: {args.path}")
+        import_dictionary(args.path, args.format, args.chunk_size)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+# lookup.py
+import threading
+from collections import namedtuple
+
+from database import get_word_snapshot, normalize_word, save_word, session_scope
+
+# 查询结果：snapshot 为保存后的 WordSnapshot（出错时为 None）；
+# result 为爬虫结果（本地已收录时为 None）；delay > 0 表示非阻塞查询需要稍后重试：
+# result 为 None 时是没有空闲令牌，否则是这一次下载失败（result 为错误结果）
+LookupResult = namedtuple('LookupResult', ['word', 'snapshot', 'result', 'delay'])
+
+
+class _Call:
+    """ 一次进行中的调用 """
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    请求合并：同一个键同时只执行一次，期间到达的其他调用方等待并共享同一个结果（或异常）
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.stats = {"executed": 0, "shared": 0}
+
+    def do(self, key, fn):
+        """
+        执行 fn()，或等待同一键上正在进行的调用完成
+        :param key: 合并的键
+        :param fn: 无参函数
+        :return: fn 的返回值
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats["executed"] += 1
+            else:
+                self.stats["shared"] += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except Exception as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.event.set()
+        else:
+            call.event.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+
+# 全局的查询合并器：界面查询、预取等所有查询路径共用
+lookup_flight = SingleFlight()
+
+
+def _fetch_and_store(spider, word, blocking, attempt, cancelled):
+    snapshot = get_word_snapshot(word)
+    if snapshot is not None:
+        return LookupResult(word, snapshot, None, 0.0)
+
+    delay = 0.0
+    if blocking:
+        result = spider.fetch_definition(word, cancelled)
+    else:
+        result, delay = spider.try_fetch_definition(word, attempt)
+        if result is None:
+            return LookupResult(word, None, None, delay)
+    if "error" in result:
+        return LookupResult(word, None, result, delay)
+
+    with session_scope() as session:
+        save_word(session, word, result)
+    return LookupResult(word, get_word_snapshot(word), result, 0.0)
+
+
+def fetch_and_store(spider, word, blocking=True, attempt=0, cancelled=None):
+    """
+    查询单词：本地已收录时直接返回，否则在线抓取并保存
+    同一单词的并发查询只抓取和写入一次，所有调用方得到同一个结果
+    :param spider: OnlineDictionarySpider 实例
+    :param word: 单词
+    :param blocking: False 时只使用空闲令牌且只下载一次（预取用），
+                     没有令牌或下载失败但可以重试时返回 delay > 0 的结果
+    :param attempt: 非阻塞查询时该单词此前已失败的次数
+    :param cancelled: 可选的无参函数，返回 True 时在等待令牌或重试前中止抓取
+    :return: LookupResult
+    :raises RuntimeError: 保存失败
+    :raises spider.FetchCancelled: 被取消
+    """
+    key = normalize_word(word)
+    while True:
+        try:
+            outcome = lookup_flight.do(key, lambda: _fetch_and_store(spider, key, blocking, attempt, cancelled))
+        except Exception as e:
+            from spider import FetchCancelled  # 能抛出该异常时爬虫模块已经加载（启动时不导入爬虫）
+            if not isinstance(e, FetchCancelled) or (cancelled is not None and cancelled()):
+                raise
+            continue  # 搭上了另一个调用方被取消的查询，自己重新查询
+        # 搭上了一次没拿到令牌的非阻塞查询，阻塞调用方需要自己重新查询
+        if outcome.delay > 0 and blocking:
+            continue
+        return outcome
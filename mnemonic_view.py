@@ -0,0 +1,208 @@
+# mnemonic_view.py
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, QEvent, pyqtSignal
+from PyQt5.QtGui import QColor, QCursor, QFont, QFontMetrics, QPainterPath
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle
+
+from database import session_scope, top_mnemonics
+
+MnemonicRole = Qt.UserRole + 1  # 返回 MnemonicSnapshot
+PAGE_SIZE = 50  # 滚动到底部时每次加载的条数
+
+
+class MnemonicListModel(QAbstractListModel):
+    """
+    记忆方法排行榜模型
+    只保存 MnemonicSnapshot 数据，不为每一行创建控件；滚动到底部时按页从数据库增量加载
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.word_id = None
+        self._rows = []
+        self._row_by_id = {}  # 记忆方法ID -> 行号，用于点赞后的原地更新
+        self._exhausted = True  # 数据库中是否已没有更多行
+
+    def set_word(self, word):
+        """
+        显示单词的记忆方法
+        :param word: WordSnapshot（包含排行榜第一页；来自离线词典时 mnemonics 为 None，
+                     立即从数据库读取第一页），为 None 时清空
+        """
+        if word is None:
+            self.set_mnemonics(None, [], exhausted=True)
+        elif word.mnemonics is None:
+            self.set_mnemonics(word.id, [], exhausted=False)
+            self.fetchMore()
+        else:
+            self.set_mnemonics(word.id, word.mnemonics, exhausted=len(word.mnemonics) < PAGE_SIZE)
+
+    def set_mnemonics(self, word_id, mnemonics, exhausted=True):
+        """ 重置模型数据 """
+        self.beginResetModel()
+        self.word_id = word_id
+        self._rows = list(mnemonics)
+        self._row_by_id = {m.id: i for i, m in enumerate(self._rows)}
+        self._exhausted = exhausted
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        mnemonic = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return mnemonic.content
+        if role == MnemonicRole:
+            return mnemonic
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted and self.word_id is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        """ 按键集翻页读取下一页（从上一页最后一条之后继续） """
+        if not self.canFetchMore(parent):
+            return
+        with session_scope(readonly=True) as session:
+            page = top_mnemonics(
+                session, self.word_id, limit=PAGE_SIZE,
+                after=self._rows[-1] if self._rows else None
+            )
+        self._exhausted = len(page) < PAGE_SIZE
+        page = [m for m in page if m.id not in self._row_by_id]
+        if not page:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        for i, m in enumerate(page, start=first):
+            self._rows.append(m)
+            self._row_by_id[m.id] = i
+        self.endInsertRows()
+
+    def mnemonic_at(self, row):
+        return self._rows[row]
+
+    def set_votes(self, mnemonic_id, votes):
+        """ 原地更新某一行的点赞数，只重绘该行 """
+        row = self._row_by_id.get(mnemonic_id)
+        if row is None:
+            return
+        self._rows[row] = self._rows[row]._replace(votes=votes)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [MnemonicRole])
+
+    def update_votes(self, results):
+        """
+        批量原地更新点赞数
+        :param results: {记忆方法ID: 最新点赞数}
+        """
+        for mnemonic_id, votes in results.items():
+            self.set_votes(mnemonic_id, votes)
+
+
+class MnemonicDelegate(QStyledItemDelegate):
+    """ 绘制记忆方法条目：左侧点赞按钮和点赞数，右侧类型和内容 """
+    upvote_clicked = pyqtSignal(int)  # 点赞按钮被点击，参数为行号
+
+    MARGIN = 5  # 条目外边距
+    PADDING = 10  # 条目内边距
+    BUTTON_SIZE = 30
+    VOTE_COLUMN = 40  # 左侧投票区宽度
+    SPACING = 4  # 类型和内容之间的间距
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.type_font = QFont()
+        self.type_font.setPixelSize(12)
+        self.content_font = QFont()
+        self.content_font.setPixelSize(14)
+        self.vote_font = QFont()
+        self.vote_font.setPixelSize(13)
+        self.button_font = QFont()
+        self.button_font.setBold(True)
+
+    def _card_rect(self, option):
+        m = self.MARGIN
+        return option.rect.adjusted(m, m, -m, -m)
+
+    def _button_rect(self, card):
+        p = self.PADDING
+        return QRect(card.left() + p, card.top() + p, self.BUTTON_SIZE, self.BUTTON_SIZE)
+
+    def _row_width(self, option):
+        # sizeHint 收到的 option.rect 不一定有宽度，以视图可见宽度为准
+        view = option.widget
+        return view.viewport().width() if view is not None else option.rect.width()
+
+    def _text_width(self, row_width):
+        return max(50, row_width - 2 * self.MARGIN - 2 * self.PADDING - self.VOTE_COLUMN - self.PADDING)
+
+    def paint(self, painter, option, index):
+        mnemonic = index.data(MnemonicRole)
+        if mnemonic is None:
+            return
+        painter.save()
+        painter.setRenderHint(painter.Antialiasing)
+
+        # 白色圆角背景
+        card = self._card_rect(option)
+        path = QPainterPath()
+        path.addRoundedRect(card.x(), card.y(), card.width(), card.height(), 8, 8)
+        painter.fillPath(path, QColor('#fff'))
+
+        # 点赞按钮
+        button = self._button_rect(card)
+        hovered = (option.state & QStyle.State_MouseOver and option.widget is not None
+                   and button.contains(option.widget.viewport().mapFromGlobal(QCursor.pos())))
+        path = QPainterPath()
+        path.addRoundedRect(button.x(), button.y(), button.width(), button.height(), 5, 5)
+        painter.fillPath(path, QColor('#dee2e6' if hovered else '#e9ecef'))
+        painter.setFont(self.button_font)
+        painter.setPen(QColor('#212529'))
+        painter.drawText(button, Qt.AlignCenter, "▲")
+
+        # 点赞数
+        painter.setFont(self.vote_font)
+        painter.setPen(QColor('#495057'))
+        votes_rect = QRect(button.left(), button.bottom() + 2, button.width(), 20)
+        painter.drawText(votes_rect, Qt.AlignHCenter | Qt.AlignTop, str(mnemonic.votes))
+
+        # 记忆法类型和内容
+        left = card.left() + self.PADDING + self.VOTE_COLUMN + self.PADDING
+        width = self._text_width(option.rect.width())
+        painter.setFont(self.type_font)
+        painter.setPen(QColor('#6c757d'))
+        type_height = QFontMetrics(self.type_font).height()
+        painter.drawText(QRect(left, card.top() + self.PADDING, width, type_height),
+                         Qt.AlignLeft | Qt.AlignVCenter, f"[{mnemonic.method_type}]")
+
+        painter.setFont(self.content_font)
+        painter.setPen(QColor('#212529'))
+        content_top = card.top() + self.PADDING + type_height + self.SPACING
+        painter.drawText(QRect(left, content_top, width, card.bottom() - content_top),
+                         Qt.AlignLeft | Qt.AlignTop | Qt.TextWordWrap, mnemonic.content)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        mnemonic = index.data(MnemonicRole)
+        if mnemonic is None:
+            return QSize(0, 0)
+        row_width = self._row_width(option)
+        width = self._text_width(row_width)
+        content = QFontMetrics(self.content_font).boundingRect(
+            QRect(0, 0, width, 100000), Qt.AlignLeft | Qt.TextWordWrap, mnemonic.content
+        )
+        text_height = QFontMetrics(self.type_font).height() + self.SPACING + content.height()
+        vote_height = self.BUTTON_SIZE + 22
+        height = max(text_height, vote_height) + 2 * self.PADDING + 2 * self.MARGIN
+        return QSize(row_width, height)
+
+    def editorEvent(self, event, model, option, index):
+        """ 点击点赞按钮区域时发出 upvote_clicked 信号 """
+        if (event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton
+                and self._button_rect(self._card_rect(option)).contains(event.pos())):
+            self.upvote_clicked.emit(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
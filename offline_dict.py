@@ -0,0 +1,205 @@
+# offline_dict.py
+"""
+只读离线词典文件（内存映射）
+
+用法:
+    python offline_dict.py build dictionary.wdict          # 从 words 表导出
+    python offline_dict.py lookup dictionary.wdict ambition
+
+文件格式（小端序）:
+    文件头   魔数 b'WDICT\\x00\\x00\\x01'，单词数，各区块的偏移和长度
+    数据区   每个单词的释义单独用 zlib 压缩（共享预置字典，短文本也有不错的压缩率）
+    单词区   按 UTF-8 字节序排列的单词，依次紧密排列
+    索引区   每个单词一条定长记录: 单词偏移 u32, 单词长度 u32, 单词ID u64, 数据偏移 u64, 数据长度 u32
+    字典区   zlib 预置字典
+
+读取时整个文件通过 mmap 映射，查询只在索引区二分查找，只有被访问到的页才会读入内存。
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import zlib
+from collections import namedtuple
+
+MAGIC = b'WDICT\x00\x00\x01'
+HEADER = struct.Struct('<8sIIQQQQQI')  # 魔数, 单词数, 保留, 数据区偏移, 单词区偏移, 索引区偏移, 字典区偏移, 字典区长度, 保留
+RECORD = struct.Struct('<IIQQI')  # 单词偏移, 单词长度, 单词ID, 数据偏移, 数据长度
+ZDICT_SIZE = 32 * 1024  # zlib 预置字典最多使用 32KB
+
+# id 是构建时数据库中的单词ID，数据库重建或导入之后可能过期，访问数据库前应按单词重新查询
+OfflineEntry = namedtuple('OfflineEntry', ['id', 'word', 'definition'])
+
+
+def _train_zdict(samples):
+    """ 用释义样本拼成预置字典（越常见的内容越靠后，zlib 优先匹配距离近的内容） """
+    data = b"\n".join(s.encode('utf-8') for s in samples if s)
+    return data[-ZDICT_SIZE:]
+
+
+def build_offline_dict(path, entries, samples=(), level=9):
+    """
+    生成离线词典文件
+    :param path: 输出文件路径
+    :param entries: (单词ID, 单词, 释义) 的可迭代对象，必须按单词的 UTF-8 字节序升序排列且不重复
+    :param samples: 用于生成压缩预置字典的释义样本
+    :param level: zlib 压缩级别
+    :return: 写入的单词数
+    """
+    zdict = _train_zdict(samples)
+    records = []
+    keys = bytearray()
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(b'\0' * HEADER.size)
+        data_offset = f.tell()
+        position = 0
+        previous = None
+        for word_id, word, definition in entries:
+            key = word.encode('utf-8')
+            if previous is not None and key <= previous:
+                raise ValueError(f"单词未按字节序排列或重复: {word}")
+            previous = key
+            compressor = zlib.compressobj(level, zdict=zdict) if zdict else zlib.compressobj(level)
+            blob = compressor.compress((definition or "").encode('utf-8')) + compressor.flush()
+            f.write(blob)
+            records.append(RECORD.pack(len(keys), len(key), word_id, position, len(blob)))
+            keys += key
+            position += len(blob)
+
+        keys_offset = f.tell()
+        f.write(keys)
+        index_offset = f.tell()
+        for record in records:
+            f.write(record)
+        zdict_offset = f.tell()
+        f.write(zdict)
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, len(records), 0, data_offset, keys_offset, index_offset,
+                            zdict_offset, len(zdict), 0))
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+class OfflineDictionary:
+    """ 离线词典读取器：mmap + 索引二分查找，查询不经过数据库 """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.count, _, self._data_offset, self._keys_offset, self._index_offset,
+         zdict_offset, zdict_size, _) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"不是离线词典文件: {path}")
+        self._view = memoryview(self._mm)
+        self._zdict = bytes(self._view[zdict_offset:zdict_offset + zdict_size])
+
+    def _record(self, i):
+        return RECORD.unpack_from(self._mm, self._index_offset + i * RECORD.size)
+
+    def _key(self, record):
+        start = self._keys_offset + record[0]
+        return self._mm[start:start + record[1]]
+
+    def _find(self, key):
+        """ 二分查找，返回索引记录，不存在时返回 None """
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record = self._record(mid)
+            current = self._key(record)
+            if current < key:
+                lo = mid + 1
+            elif current > key:
+                hi = mid
+            else:
+                return record
+        return None
+
+    def _definition(self, record):
+        start = self._data_offset + record[3]
+        blob = self._view[start:start + record[4]]  # 直接在映射内存上解压，不复制压缩数据
+        decompressor = zlib.decompressobj(zdict=self._zdict) if self._zdict else zlib.decompressobj()
+        return (decompressor.decompress(blob) + decompressor.flush()).decode('utf-8')
+
+    def get(self, word):
+        """
+        查询单词
+        :param word: 规范化后的单词
+        :return: OfflineEntry，不存在时返回 None
+        """
+        record = self._find(word.encode('utf-8'))
+        if record is None:
+            return None
+        return OfflineEntry(record[2], word, self._definition(record))
+
+    def __contains__(self, word):
+        return self._find(word.encode('utf-8')) is not None
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self._view.release()
+        self._mm.close()
+
+
+def open_offline_dict(path=None):
+    """
+    打开离线词典（路径默认取环境变量 DICTIONARY_OFFLINE_DICT，否则为 dictionary.wdict）
+    :return: OfflineDictionary，文件不存在时返回 None
+    """
+    path = path or os.environ.get('DICTIONARY_OFFLINE_DICT', 'dictionary.wdict')
+    if not os.path.exists(path):
+        return None
+    return OfflineDictionary(path)
+
+
+def export_from_database(path, chunk_size=5000, level=9):
+    """
+    把 words 表导出为离线词典文件
+    :return: 写入的单词数
+    """
+    from sqlalchemy import func, select
+    from database import engine, Word
+
+    with engine.connect() as conn:
+        samples = conn.execute(
+            select(Word.definition).where(Word.definition.isnot(None)).order_by(func.random()).limit(2000)
+        ).scalars().all()
+        # SQLite 默认的 BINARY 排序即按 UTF-8 字节序，与读取时的二分查找一致
+        rows = conn.execute(
+            select(Word.id, Word.word, Word.definition).order_by(Word.word)
+            .execution_options(yield_per=chunk_size)
+        )
+        return build_offline_dict(path, rows, samples, level)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="离线词典文件")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help="从数据库的 words 表生成离线词典")
+    build.add_argument('path')
+    build.add_argument('--level', type=int, default=9, help="zlib 压缩级别")
+    lookup = sub.add_parser('lookup', help="查询单词")
+    lookup.add_argument('path')
+    lookup.add_argument('word')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        count = export_from_database(args.path, level=args.level)
+        print(f"已写入 {count} 个单词，文件大小 {os.path.getsize(args.path) / 1024:.1f} KB")
+    else:
+        dictionary = OfflineDictionary(args.path)
+        entry = dictionary.get(args.word.strip().lower())
+        print(entry.definition if entry else "单词不存在")
+        dictionary.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+# parsers.py
+"""
+剑桥词典页面解析器
+
+三种解析模式输出完全相同的 {"definitions", "examples"} 结果：
+    bs4      - BeautifulSoup 完整建树 + CSS 选择器（参考实现）
+    strainer - BeautifulSoup + SoupStrainer，只为释义/例句子树建树
+    lxml     - 直接使用 lxml.etree + 预编译 XPath，速度最快
+
+BeautifulSoup 只在使用 bs4 / strainer 模式时才导入，默认的 lxml 模式不需要加载它
+"""
+from lxml import etree
+
+MAX_DEFINITIONS = 3  # 取前3个释义
+MAX_EXAMPLES = 2  # 取前2个例句
+
+
+def _build_result(definition_pairs, example_pairs):
+    result = {
+        "definitions": [f"{definition}\n{translation}" for definition, translation in definition_pairs],
+        "examples": [f"• {english}\n  {chinese}" for english, chinese in example_pairs]
+    }
+    if not result["definitions"]:
+        return {"error": "解析失败"}
+    return result
+
+
+def _soup_pairs(soup):
+    """ 在 BeautifulSoup 树上提取 (释义, 翻译) 和 (例句, 翻译) """
+    definitions = []
+    for block in soup.select('.def-block')[:MAX_DEFINITIONS]:
+        definition = block.select_one('.def').text.strip()
+        translation = block.select_one('.trans').text.strip()
+        definitions.append((definition, translation))
+
+    examples = []
+    for ex in soup.select('.examp')[:MAX_EXAMPLES]:
+        english = ex.select_one('.eg').text.strip()
+        chinese = ex.select_one('.trans').text.strip()
+        examples.append((english, chinese))
+    return definitions, examples
+
+
+def parse_bs4(html):
+    """ 参考实现：完整解析整个页面 """
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'lxml')
+    return _build_result(*_soup_pairs(soup))
+
+
+_STRAINED_CLASSES = frozenset(['def-block', 'examp'])
+
+
+def _wanted_class(value):
+    # 建树前 class 属性可能还是未拆分的字符串
+    if not value:
+        return False
+    values = value.split() if isinstance(value, str) else value
+    return not _STRAINED_CLASSES.isdisjoint(values)
+
+
+_STRAINER = None
+
+
+def parse_strainer(html):
+    """ 使用 SoupStrainer 只解析相关子树 """
+    global _STRAINER
+    from bs4 import BeautifulSoup, SoupStrainer
+    if _STRAINER is None:
+        # 只保留释义块和例句块（及其子树），页面其余部分不建树
+        _STRAINER = SoupStrainer(class_=_wanted_class)
+    soup = BeautifulSoup(html, 'lxml', parse_only=_STRAINER)
+    return _build_result(*_soup_pairs(soup))
+
+
+def _class_xpath(prefix, cls):
+    return etree.XPath(
+        f"{prefix}*[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]"
+    )
+
+
+_DEF_BLOCKS = _class_xpath('//', 'def-block')
+_EXAMPLES = _class_xpath('//', 'examp')
+_FIRST = {
+    cls: etree.XPath(
+        f"(.//*[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')])[1]"
+    )
+    for cls in ('def', 'trans', 'eg')
+}
+
+# BeautifulSoup 的 .text 不包含这些标签内的文字（脚本、样式、模板、注音）
+_SKIP_TEXT_TAGS = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+
+
+def _collect_text(el, parts, skip):
+    for child in el:
+        if isinstance(child.tag, str):
+            child_skip = skip or child.tag in _SKIP_TEXT_TAGS
+            if child.text and not child_skip:
+                parts.append(child.text)
+            _collect_text(child, parts, child_skip)
+        # 注释的内容不计入文本，但其后的 tail 属于父元素
+        if child.tail and not skip:
+            parts.append(child.tail)
+
+
+def _text(el):
+    """ 与 BeautifulSoup 的 Tag.text 等价的文本提取 """
+    parts = [el.text] if el.text else []
+    _collect_text(el, parts, False)
+    return ''.join(parts)
+
+
+def _first_text(el, cls):
+    found = _FIRST[cls](el)
+    if not found:
+        # 与 bs4 实现在缺少节点时的行为保持一致
+        raise AttributeError("'NoneType' object has no attribute 'text'")
+    return _text(found[0]).strip()
+
+
+def parse_lxml(html):
+    """ 直接使用 lxml.etree + XPath 解析 """
+    if isinstance(html, str):
+        html = html.encode('utf-8')
+    root = etree.fromstring(html, etree.HTMLParser(encoding='utf-8'))
+    if root is None:
+        return _build_result([], [])
+
+    definitions = [
+        (_first_text(block, 'def'), _first_text(block, 'trans'))
+        for block in _DEF_BLOCKS(root)[:MAX_DEFINITIONS]
+    ]
+    examples = [
+        (_first_text(ex, 'eg'), _first_text(ex, 'trans'))
+        for ex in _EXAMPLES(root)[:MAX_EXAMPLES]
+    ]
+    return _build_result(definitions, examples)
+
+
+PARSERS = {
+    'bs4': parse_bs4,
+    'strainer': parse_strainer,
+    'lxml': parse_lxml
+}
+
+DEFAULT_PARSER = 'lxml'
+
+
+def get_parser(mode):
+    """
+    按名称取得解析函数
+    :param mode: 'bs4' / 'strainer' / 'lxml'
+    """
+    try:
+        return PARSERS[mode]
+    except KeyError:
+        raise ValueError(f"未知的解析模式: {mode}，可选: {', '.join(PARSERS)}")
+
+
+def parse_page(html, mode=DEFAULT_PARSER):
+    """ 按指定模式解析页面（模块级函数，可在子进程中使用） """
+    return get_parser(mode)(html)
@@ -0,0 +1,175 @@
+# prefetch.py
+import sys
+import threading
+from contextlib import contextmanager
+
+from database import normalize_word
+from lookup import fetch_and_store
+
+
+class Prefetcher:
+    """
+    单词表预取器
+    用户按单词表顺序学习时，在阅读当前单词期间于后台抓取并保存接下来的几个单词。
+    与前台查询共享同一个爬虫（同一组令牌桶），只使用空闲令牌，前台查询进行时暂停
+    """
+
+    def __init__(self, spider, lookahead=5, on_error=None):
+        """
+        :param spider: OnlineDictionarySpider 实例（与前台查询共享），
+                       或返回该实例的无参函数（第一次预取时才调用，延迟创建爬虫）
+        :param lookahead: 预取当前单词之后的单词数
+        :param on_error: 预取失败回调，参数为 (单词, 错误信息)（在后台线程中调用）
+        """
+        self._spider = spider
+        self.lookahead = lookahead
+        self.on_error = on_error
+        self.words = []
+        self._positions = {}  # 单词 -> 在单词表中的位置
+        self._pending = []  # 待预取的单词（按顺序）
+        self._prefetched = set()  # 已预取、尚未被查询的单词
+        self._local = set()  # 预取时发现本来就已收录的单词（不计入命中率）
+        self._attempts = {}  # 单词 -> 已失败的下载次数（可重试的失败后留在队首，稍后重试）
+        self._foreground = 0  # 正在进行的前台查询数
+        self._closed = False
+        self._cond = threading.Condition()
+        self.stats = {"lookups": 0, "hits": 0, "prefetched": 0, "failed": 0}
+        self._thread = threading.Thread(target=self._run, name="prefetcher", daemon=True)
+        self._thread.start()
+
+    @property
+    def spider(self):
+        if callable(self._spider):
+            self._spider = self._spider()
+        return self._spider
+
+    def set_word_list(self, words):
+        """
+        设置当前的单词表（清空尚未执行的预取）。
+        已预取 / 本来就已收录的记录只保留新表中的单词：集合大小不超过单词表，
+        旧表留下的记录也不会影响新表的命中率
+        """
+        words = [normalize_word(w) for w in words if w.strip()]
+        with self._cond:
+            self.words = words
+            self._positions = {}
+            for i, w in enumerate(words):
+                self._positions.setdefault(w, i)
+            self._pending = []
+            self._attempts = {}
+            self._prefetched &= self._positions.keys()
+            self._local &= self._positions.keys()
+
+    def position(self, word):
+        """ 单词在单词表中的位置，不在表中时返回 None """
+        return self._positions.get(normalize_word(word))
+
+    def on_lookup(self, word):
+        """
+        前台查询了一个单词：统计命中，并把单词表中其后的单词加入预取队列
+        命中率 = 由预取直接命中的查询 / 单词表中原本需要在线查询的单词的查询
+        :param word: 查询的单词
+        """
+        word = normalize_word(word)
+        with self._cond:
+            i = self._positions.get(word)
+            if i is None:
+                return
+            if word not in self._local:
+                self.stats["lookups"] += 1
+                if word in self._prefetched:
+                    self._prefetched.discard(word)
+                    self.stats["hits"] += 1
+            self._pending = self.words[i + 1:i + 1 + self.lookahead]
+            self._cond.notify()
+
+    @contextmanager
+    def foreground(self):
+        """ 前台查询期间暂停预取，让出令牌 """
+        with self._cond:
+            self._foreground += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._foreground -= 1
+                self._cond.notify()
+
+    def hit_ratio(self):
+        """ 单词表中的查询由预取结果直接命中的比例 """
+        with self._cond:
+            lookups = self.stats["lookups"]
+            return self.stats["hits"] / lookups if lookups else 0.0
+
+    def _next_word(self):
+        """ 等待下一个需要预取的单词，已关闭时返回 None """
+        with self._cond:
+            while not self._closed and (not self._pending or self._foreground):
+                self._cond.wait()
+            if self._closed:
+                return None
+            return self._pending[0]
+
+    def _done(self, word):
+        with self._cond:
+            self._attempts.pop(word, None)
+            if self._pending and self._pending[0] == word:
+                self._pending.pop(0)
+
+    def _wait(self, seconds):
+        """ 等待令牌补足（可被关闭或新的预取队列提前唤醒） """
+        with self._cond:
+            if not self._closed:
+                self._cond.wait(seconds)
+
+    def _run(self):
+        while True:
+            word = self._next_word()
+            if word is None:
+                return
+            try:
+                self._prefetch(word)
+            except Exception as e:
+                # 任何一个单词出错（数据库错误、爬虫创建失败等）都只跳过该单词，预取线程继续运行
+                self._done(word)
+                self._report(word, str(e) if isinstance(e, RuntimeError) else f"{type(e).__name__}: {e}")
+
+    def _prefetch(self, word):
+        """
+        预取一个单词。令牌不足或下载失败但可以重试时，等待后留在队首下次重试：
+        等待期间可被前台查询和新的预取队列打断，重试同样只使用空闲令牌
+        """
+        with self._cond:
+            attempt = self._attempts.get(word, 0)
+        outcome = fetch_and_store(self.spider, word, blocking=False, attempt=attempt)
+        if outcome.delay > 0:
+            if outcome.result is not None:
+                with self._cond:
+                    self._attempts[word] = attempt + 1
+            self._wait(outcome.delay)
+            return
+        self._done(word)
+        with self._cond:
+            if outcome.result is None:
+                if word not in self._prefetched:
+                    self._local.add(word)
+            elif outcome.snapshot is not None:
+                self._prefetched.add(word)
+                self.stats["prefetched"] += 1
+        if outcome.snapshot is None:
+            self._report(word, outcome.result["error"])
+
+    def _report(self, word, message):
+        with self._cond:
+            self.stats["failed"] += 1
+        if self.on_error is not None:
+            self.on_error(word, message)
+        else:
+            print(f"预取 {word} 失败: {message}", file=sys.stderr, flush=True)
+
+    def close(self, timeout=2):
+        """ 停止后台线程（正在进行的下载最多等待 timeout 秒） """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
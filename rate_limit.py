@@ -0,0 +1,365 @@
+# rate_limit.py
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}  # 可以重试的HTTP状态码
+THROTTLE_STATUS = {429, 503}  # 表示服务器要求降速的状态码
+
+
+class TokenBucket:
+    """ 令牌桶限速器，同时支持线程阻塞等待和 asyncio 等待 """
+
+    def __init__(self, rate, capacity=1):
+        """
+        :param rate: 每秒补充的令牌数（即长期平均请求速率）
+        :param capacity: 桶容量（允许的最大突发请求数）
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def set_rate(self, rate):
+        """ 修改补充速率（先按旧速率结算已累积的令牌） """
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def reserve(self, tokens=1):
+        """
+        预约令牌，令牌不足时允许透支，调用方按返回的时间等待即可
+        :return: 需要等待的秒数
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def refund(self, tokens=1):
+        """ 归还预约后没有使用的令牌（等待期间被取消），不推迟之后的预约 """
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + tokens)
+
+    def try_acquire(self, tokens=1):
+        """
+        不透支地尝试取令牌（低优先级任务使用，不会推迟其他调用方的预约）
+        :return: 取到令牌返回 0；否则不扣令牌，返回令牌补足还需等待的秒数
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def wait_time(self, tokens=1):
+        """ 不取令牌，只返回令牌补足还需等待的秒数（现在就有令牌时为 0） """
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, (tokens - self.tokens) / self.rate)
+
+    def acquire(self, tokens=1):
+        """ 阻塞当前线程直到拿到令牌 """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens=1):
+        """ 在事件循环中等待令牌，不阻塞其他协程 """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """
+    AIMD 自适应令牌桶：每次成功把速率加性提高 increase，被限流时乘性降低为 decrease 倍，
+    速率保持在 [min_rate, max_rate] 之间；同时统计最近一段时间的实际请求速率
+    """
+
+    def __init__(self, rate, capacity=1, min_rate=None, max_rate=None, increase=0.01, decrease=0.5,
+                 window=60):
+        """
+        :param rate: 初始速率（每秒请求数）
+        :param min_rate: 速率下限，默认为初始速率的 1/10
+        :param max_rate: 速率上限，默认为初始速率的 2 倍
+        :param increase: 每次成功增加的速率
+        :param decrease: 被限流时速率乘以的系数
+        :param window: 统计实际速率的时间窗口(秒)
+        """
+        super().__init__(rate, capacity)
+        self.min_rate = min_rate if min_rate is not None else rate / 10
+        self.max_rate = max_rate if max_rate is not None else rate * 2
+        # 上下限相对于配置速率（而不是自适应调整后的当前速率）的比例，set_rate 时按新的配置速率换算
+        self._min_ratio = self.min_rate / rate
+        self._max_ratio = self.max_rate / rate
+        self.increase = increase
+        self.decrease = decrease
+        self.window = window
+        self.counts = {"requests": 0, "succeeded": 0, "throttled": 0, "failed": 0}
+        self._completed = deque()  # 最近成功请求的时间
+        self._last_decrease = 0.0
+
+    def set_rate(self, rate):
+        """ 重新设置配置速率，上下限按与配置速率的固定比例换算（与之前自适应调整到的速率无关） """
+        with self._lock:
+            self._refill(time.monotonic())
+            self.min_rate = rate * self._min_ratio
+            self.max_rate = rate * self._max_ratio
+            self.rate = rate
+
+    def reserve(self, tokens=1):
+        delay = super().reserve(tokens)
+        with self._lock:
+            self.counts["requests"] += 1
+        return delay
+
+    def refund(self, tokens=1):
+        super().refund(tokens)
+        with self._lock:
+            self.counts["requests"] -= 1
+
+    def try_acquire(self, tokens=1):
+        delay = super().try_acquire(tokens)
+        if delay == 0:
+            with self._lock:
+                self.counts["requests"] += 1
+        return delay
+
+    def on_success(self):
+        """ 请求成功：加性提高速率 """
+        now = time.monotonic()
+        with self._lock:
+            self._refill(now)
+            self.rate = min(self.max_rate, self.rate + self.increase)
+            self.counts["succeeded"] += 1
+            self._completed.append(now)
+            self._trim(now)
+
+    def on_throttle(self, retry_after=None):
+        """
+        被限流（429/503/超时）：乘性降低速率；同一批在途请求连续失败时只降低一次
+        :param retry_after: 服务器要求的等待时间(秒)，期间不再发放令牌
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._refill(now)
+            self.counts["throttled"] += 1
+            if now - self._last_decrease >= 1 / self.rate:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._last_decrease = now
+            if retry_after:
+                self.tokens = min(self.tokens, -retry_after * self.rate)
+
+    def on_failure(self):
+        """ 其他失败（不影响速率，只计数） """
+        with self._lock:
+            self.counts["failed"] += 1
+
+    def _trim(self, now):
+        while self._completed and now - self._completed[0] > self.window:
+            self._completed.popleft()
+
+    def metrics(self):
+        """ 当前速率、时间窗口内的实际成功请求速率和累计计数 """
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            span = min(self.window, now - self._completed[0]) if self._completed else 0
+            effective = len(self._completed) / span if span > 0 else 0.0
+            return dict(self.counts, rate=self.rate, effective_rps=effective)
+
+
+class HostRateLimiter:
+    """ 按主机分别限速，每个主机一个令牌桶 """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _make_bucket(self):
+        return TokenBucket(self.rate, self.capacity)
+
+    def bucket(self, url):
+        """ 取得URL所属主机的令牌桶（不存在时创建） """
+        host = urlsplit(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = self._make_bucket()
+            return bucket
+
+    def set_rate(self, rate):
+        """ 修改所有主机的速率 """
+        with self._lock:
+            self.rate = rate
+            buckets = list(self._buckets.values())
+        for bucket in buckets:
+            bucket.set_rate(rate)
+
+    def acquire(self, url):
+        self.bucket(url).acquire()
+
+    def reserve(self, url):
+        """ 预约令牌（允许透支），返回需要等待的秒数，由调用方自己等待 """
+        return self.bucket(url).reserve()
+
+    def refund(self, url):
+        self.bucket(url).refund()
+
+    def try_acquire(self, url):
+        return self.bucket(url).try_acquire()
+
+    def wait_time(self, url):
+        return self.bucket(url).wait_time()
+
+    async def acquire_async(self, url):
+        await self.bucket(url).acquire_async()
+
+
+class AdaptiveRateLimiter(HostRateLimiter):
+    """ 按主机的 AIMD 自适应限速 """
+
+    def __init__(self, rate, capacity=1, **options):
+        """
+        :param rate: 每个主机的初始速率
+        :param options: 传给 AdaptiveTokenBucket 的参数（min_rate / max_rate / increase / decrease / window）
+        """
+        super().__init__(rate, capacity)
+        self.options = options
+
+    def _make_bucket(self):
+        return AdaptiveTokenBucket(self.rate, self.capacity, **self.options)
+
+    def on_success(self, url):
+        self.bucket(url).on_success()
+
+    def on_throttle(self, url, retry_after=None):
+        self.bucket(url).on_throttle(retry_after)
+
+    def on_failure(self, url):
+        self.bucket(url).on_failure()
+
+    def metrics(self):
+        """ 每个主机的限速指标 {主机: {...}} """
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {host: bucket.metrics() for host, bucket in buckets.items()}
+
+
+_shared_limiters = {}
+_shared_lock = threading.Lock()
+
+
+def shared_limiter(name='default', rate=1 / 1.5, **options):
+    """
+    取得进程内共享的自适应限速器，名称和初始速率都相同的调用方（多个爬虫实例、多个线程）共用同一组令牌桶；
+    配置了不同速率的调用方各自得到独立的限速器，不会被先创建的限速器的速率覆盖
+    :param name: 限速器名称
+    :param rate: 初始速率（已存在时保留已学习到的速率）
+    """
+    key = (name, rate)
+    with _shared_lock:
+        limiter = _shared_limiters.get(key)
+        if limiter is None:
+            limiter = _shared_limiters[key] = AdaptiveRateLimiter(rate, **options)
+        return limiter
+
+
+def parse_retry_after(value):
+    """
+    解析 Retry-After 响应头（秒数或HTTP日期）
+    :return: 需要等待的秒数，无法解析时返回 None
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryBudget:
+    """
+    重试预算：每个新请求存入 ratio 个令牌，每次重试消耗 1 个，
+    使重试量不超过正常请求量的 ratio 倍，避免服务器故障时重试放大流量
+    """
+
+    def __init__(self, ratio=0.2, reserve=10):
+        """
+        :param ratio: 重试占正常请求的比例上限
+        :param reserve: 最多可累积的重试次数（初始为满）
+        """
+        self.ratio = ratio
+        self.reserve = reserve
+        self.tokens = float(reserve)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.reserve, self.tokens + self.ratio)
+
+    def withdraw(self):
+        """ 取一次重试机会，预算不足时返回 False """
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class RetryPolicy:
+    """ 带随机抖动的指数退避重试策略（full jitter），遵守 Retry-After，受重试预算限制 """
+
+    def __init__(self, max_attempts=4, base_delay=1.0, max_delay=60.0, budget=None):
+        """
+        :param max_attempts: 每个请求最多尝试的次数（包括第一次）
+        :param base_delay: 第一次重试的最大等待时间(秒)，之后每次翻倍
+        :param max_delay: 单次等待时间上限(秒)
+        :param budget: RetryBudget，默认新建一个
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget if budget is not None else RetryBudget()
+        self.retries = 0  # 累计重试次数（多个线程共用同一个策略，加锁计数）
+        self._lock = threading.Lock()
+
+    def on_request(self):
+        """ 发起一个新请求（不包括重试） """
+        self.budget.deposit()
+
+    def next_delay(self, attempt, retry_after=None):
+        """
+        计算第 attempt 次失败后的等待时间
+        :param attempt: 已失败的次数（从1开始）
+        :param retry_after: 服务器要求的等待时间(秒)
+        :return: 等待秒数；次数用尽或预算不足时返回 None
+        """
+        if attempt >= self.max_attempts or not self.budget.withdraw():
+            return None
+        with self._lock:
+            self.retries += 1
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
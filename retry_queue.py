@@ -0,0 +1,137 @@
+# retry_queue.py
+"""
+抓取失败单词的持久化重试队列
+
+用法:
+    python retry_queue.py list
+    python retry_queue.py clear
+"""
+import argparse
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+
+RetryItem = namedtuple('RetryItem', ['word', 'attempts', 'last_error', 'next_attempt_at'])
+
+
+class RetryQueue:
+    """
+    重试队列（SQLite 文件）
+    网络错误、限流等暂时性失败的单词在重试用尽后写入队列，按指数退避安排下一次尝试时间，
+    进程重启后仍然保留；成功抓取后从队列中删除
+    """
+
+    def __init__(self, path='retry_queue.db', base_delay=60, max_delay=86400, max_attempts=10):
+        """
+        :param path: 队列文件路径
+        :param base_delay: 第一次重新排队的等待时间(秒)，之后每次翻倍
+        :param max_delay: 等待时间上限(秒)
+        :param max_attempts: 超过该次数后不再安排重试（保留在队列中供人工查看）
+        """
+        self.path = path
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS retries (
+                word TEXT PRIMARY KEY,
+                attempts INTEGER NOT NULL,
+                last_error TEXT,
+                next_attempt_at REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_retries_next ON retries (next_attempt_at)")
+        self._conn.commit()
+
+    def push(self, word, error):
+        """
+        记录一次失败，并安排下一次重试时间
+        :param word: 单词
+        :param error: 错误信息
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT attempts FROM retries WHERE word = ?", (word,)).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            if attempts >= self.max_attempts:
+                next_attempt_at = None  # 放弃自动重试
+            else:
+                next_attempt_at = time.time() + min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO retries (word, attempts, last_error, next_attempt_at) VALUES (?, ?, ?, ?)",
+                (word, attempts, error, next_attempt_at)
+            )
+            self._conn.commit()
+
+    def remove(self, word):
+        """ 抓取成功（或确定不存在）后移出队列 """
+        with self._lock:
+            self._conn.execute("DELETE FROM retries WHERE word = ?", (word,))
+            self._conn.commit()
+
+    def due(self, limit=None):
+        """
+        到期需要重试的单词
+        :param limit: 最多返回的数量
+        :return: 单词列表，按到期时间排序
+        """
+        sql = "SELECT word FROM retries WHERE next_attempt_at <= ? ORDER BY next_attempt_at"
+        params = (time.time(),)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        with self._lock:
+            return [w for (w,) in self._conn.execute(sql, params)]
+
+    def items(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT word, attempts, last_error, next_attempt_at FROM retries ORDER BY next_attempt_at"
+            ).fetchall()
+        return [RetryItem(*row) for row in rows]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM retries")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM retries").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="抓取重试队列管理")
+    parser.add_argument('command', choices=['list', 'clear'])
+    parser.add_argument('--path', default='retry_queue.db', help="队列文件路径")
+    args = parser.parse_args(argv)
+
+    retry_queue = RetryQueue(args.path)
+    try:
+        if args.command == 'list':
+            now = time.time()
+            for item in retry_queue.items():
+                if item.next_attempt_at is None:
+                    when = "已放弃"
+                else:
+                    when = f"{max(0, item.next_attempt_at - now):.0f} 秒后"
+                print(f"{item.word}\t尝试 {item.attempts} 次\t{when}\t{item.last_error}")
+            print(f"共 {len(retry_queue)} 个单词")
+        else:
+            retry_queue.clear()
+            print("已清空重试队列")
+    finally:
+        retry_queue.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,528 @@
+# service.py
+"""
+无界面的 HTTP/JSON 查询服务，多个客户端共享同一个词典数据库
+
+用法:
+    python service.py --host 127.0.0.1 --port 8080 --workers 8 --fetch-workers 4
+
+接口:
+    GET  /words/<单词>                  查询单词（本地未收录时在线抓取；?local=1 只查本地）
+    POST /words/batch                  批量查询，请求体 {"words": [...], "fetch": false}
+    GET  /words/<单词>/mnemonics        记忆方法排行榜，参数 limit（默认 20）、offset
+    POST /mnemonics/<ID>/vote          点赞，请求体 {"count": 1}（可省略），合并后异步写入
+    GET  /health, GET /metrics
+
+基于 asyncio 的 HTTP/1.1 服务（支持长连接），事件循环只负责收发和缓存命中：
+数据库查询在有界的线程池中执行（线程数不超过连接池大小），在线抓取使用单独的线程池，
+慢速抓取不会占满数据库线程；排队的请求过多时直接返回 503。
+GET 响应带 ETag，客户端携带 If-None-Match 且内容未变化时返回 304。
+在线抓取失败时：确认不存在的单词返回 404，上游限流返回 503（带 Retry-After），其他上游错误返回 502。
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+import signal
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from database import (
+    engine, initialize_db, normalize_word, get_word_snapshot, lookup_many, session_scope, top_mnemonics,
+    word_cache, VoteService, SNAPSHOT_MNEMONICS
+)
+from lookup import fetch_and_store, lookup_flight
+from spider import OnlineDictionarySpider
+from backends import backends_from_env, NOT_FOUND
+from rate_limit import THROTTLE_STATUS
+
+MAX_BODY = 1024 * 1024  # 请求体上限
+MAX_HEADERS = 100
+MAX_BATCH = 100  # 批量查询一次最多的单词数
+MAX_VOTE = 100  # 一次请求最多的点赞数
+MAX_PAGE = 100  # 记忆方法每页最多条数
+UPSTREAM_STATUS = re.compile(r'HTTP错误: (\d{3})')  # 爬虫错误信息中的上游状态码
+
+REASONS = {
+    200: "OK", 202: "Accepted", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error",
+    501: "Not Implemented", 502: "Bad Gateway", 503: "Service Unavailable", 504: "Gateway Timeout"
+}
+
+
+class HttpError(Exception):
+    """ 以指定状态码返回给客户端的错误 """
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class Request:
+    __slots__ = ('method', 'path', 'query', 'headers', 'body', 'version')
+
+    def __init__(self, method, target, version, headers, body):
+        parts = urlsplit(target)
+        self.method = method
+        self.path = unquote(parts.path)
+        self.query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        self.version = version
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        if not self.body:
+            return {}
+        try:
+            return json.loads(self.body)
+        except ValueError:
+            raise HttpError(400, "请求体不是有效的JSON")
+
+    @property
+    def keep_alive(self):
+        connection = self.headers.get('connection', '').lower()
+        if self.version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+
+def encode_json(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def make_etag(body):
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(request, etag):
+    """ If-None-Match 是否包含该 ETag（忽略弱校验前缀 W/） """
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return etag in (tag.strip().removeprefix('W/') for tag in header.split(','))
+
+
+def word_payload(snapshot, mnemonics=None):
+    """ WordSnapshot -> JSON 对象 """
+    if mnemonics is None:
+        mnemonics = snapshot.mnemonics
+    return {
+        "id": snapshot.id,
+        "word": snapshot.word,
+        "definition": snapshot.definition,
+        "mnemonics": [
+            {"id": m.id, "method_type": m.method_type, "content": m.content, "votes": m.votes}
+            for m in mnemonics
+        ]
+    }
+
+
+class ResponseCache:
+    """
+    序列化后的响应缓存：键 -> (来源快照, 响应体, ETag)
+    只有来源快照仍是热词缓存中的同一个对象时才命中，写操作使热词缓存失效后自动过期
+    """
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self._data = OrderedDict()
+
+    def get(self, key, source):
+        entry = self._data.get(key)
+        if entry is None or entry[0] is not source:
+            return None
+        self._data.move_to_end(key)
+        return entry[1], entry[2]
+
+    def put(self, key, source, body):
+        etag = make_etag(body)
+        self._data[key] = (source, body, etag)
+        self._data.move_to_end(key)
+        while len(self._data) > self.capacity:
+            self._data.popitem(last=False)
+        return body, etag
+
+
+class DictionaryService:
+    """ 查询服务：路由、线程池调度、响应缓存 """
+
+    def __init__(self, spider, workers=8, fetch_workers=4, max_pending=256, fetch_timeout=30.0):
+        """
+        :param spider: OnlineDictionarySpider 实例（所有请求共享限速和连接池）
+        :param workers: 数据库线程数（每个线程同时最多占用一个池化连接）
+        :param fetch_workers: 在线抓取线程数
+        :param max_pending: 线程池中排队和执行中的任务上限，超过时返回 503
+        :param fetch_timeout: 在线抓取的等待上限(秒)，超时返回 504（抓取仍在后台完成并保存）
+        """
+        self.spider = spider
+        self.max_pending = max_pending
+        self.fetch_timeout = fetch_timeout
+        self.db_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='db')
+        self.fetch_executor = ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix='fetch')
+        self.vote_service = VoteService(on_error=self._vote_failed, on_retry=self._vote_retrying)
+        self.responses = ResponseCache()
+        self.pending = 0
+        self.stats = {"requests": 0, "not_modified": 0, "rejected": 0, "vote_errors": 0, "vote_retries": 0,
+                      "status": {}}
+        self.routes = [
+            ('GET', re.compile(r'/health'), self.handle_health),
+            ('GET', re.compile(r'/metrics'), self.handle_metrics),
+            ('POST', re.compile(r'/words/batch'), self.handle_batch),
+            ('GET', re.compile(r'/words/(?P<word>[^/]+)/mnemonics'), self.handle_mnemonics),
+            ('GET', re.compile(r'/words/(?P<word>[^/]+)'), self.handle_word),
+            ('POST', re.compile(r'/mnemonics/(?P<mnemonic_id>\d+)/vote'), self.handle_vote),
+        ]
+
+    async def run_blocking(self, executor, fn, *args, timeout=None):
+        """ 在线程池中执行阻塞调用；排队任务过多时拒绝 """
+        if self.pending >= self.max_pending:
+            self.stats["rejected"] += 1
+            raise HttpError(503, "服务繁忙，请稍后重试", {'Retry-After': '1'})
+        self.pending += 1
+        future = asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        # 任务真正结束时才释放名额（等待超时的抓取仍占用线程）
+        future.add_done_callback(self._task_done)
+        if timeout is None:
+            return await future
+        try:
+            # shield: 超时只是不再等待，抓取和保存继续在后台完成
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            raise HttpError(504, "在线查询超时，请稍后重试")
+
+    def _task_done(self, future):
+        self.pending -= 1
+
+    def _vote_failed(self, error):
+        """ 点赞批量写入多次失败后被丢弃（在点赞服务的后台线程中调用）：计入指标并输出到标准错误 """
+        self.stats["vote_errors"] += 1
+        print(f"[vote] {error}", file=sys.stderr, flush=True)
+
+    def _vote_retrying(self, error):
+        """ 点赞批量写入失败，已放回队列重试（在点赞服务的后台线程中调用） """
+        self.stats["vote_retries"] += 1
+        print(f"[vote] {error}", file=sys.stderr, flush=True)
+
+    @property
+    def can_fetch(self):
+        """ 本地未收录的单词能否继续查询（联网或查本地词典） """
+        return not self.spider.offline or bool(self.spider.local_backends)
+
+    async def snapshot(self, word):
+        """ 查询本地单词：热词缓存直接在事件循环中读取，未命中时交给数据库线程 """
+        snapshot = word_cache.get(word)
+        if snapshot is None:
+            snapshot = await self.run_blocking(self.db_executor, get_word_snapshot, word)
+        return snapshot
+
+    async def fetch(self, word):
+        """ 在线抓取并保存（同一单词的并发请求只抓取一次） """
+        try:
+            outcome = await self.run_blocking(self.fetch_executor, fetch_and_store, self.spider, word,
+                                              timeout=self.fetch_timeout)
+        except RuntimeError as e:
+            raise HttpError(500, str(e))
+        if outcome.snapshot is None:
+            raise self.fetch_error(word, (outcome.result or NOT_FOUND)["error"])
+        return outcome.snapshot
+
+    def fetch_error(self, word, error):
+        """
+        把抓取失败转换为 HttpError：只有确认不存在的单词返回 404；
+        上游限流（429/503）返回 503，并按限速器的等待时间给出 Retry-After；其他上游错误（网络、解析）返回 502
+        """
+        if error == NOT_FOUND["error"]:
+            return HttpError(404, error)
+        match = UPSTREAM_STATUS.match(error)
+        if match and int(match.group(1)) in THROTTLE_STATUS:
+            wait = self.spider.limiter.wait_time(self.spider._build_url(word))
+            return HttpError(503, error, {'Retry-After': str(max(1, math.ceil(wait)))})
+        return HttpError(502, error)
+
+    def cached_response(self, key, snapshot, build):
+        cached = self.responses.get(key, snapshot)
+        if cached is None:
+            cached = self.responses.put(key, snapshot, encode_json(build()))
+        return cached
+
+    async def handle_health(self, request):
+        return 200, {"status": "ok"}
+
+    async def handle_metrics(self, request):
+        return 200, {
+            "requests": self.stats["requests"],
+            "not_modified": self.stats["not_modified"],
+            "rejected": self.stats["rejected"],
+            "vote_errors": self.stats["vote_errors"],
+            "vote_retries": self.stats["vote_retries"],
+            "status": self.stats["status"],
+            "pending": self.pending,
+            "word_cache": word_cache.stats(),
+            "lookup_flight": dict(lookup_flight.stats),
+            "db_pool": engine.pool.status(),
+            "spider": self.spider.metrics()
+        }
+
+    async def handle_word(self, request, word):
+        word = normalize_word(word)
+        if not word:
+            raise HttpError(400, "单词不能为空")
+        snapshot = await self.snapshot(word)
+        if snapshot is None:
+            if request.query.get('local') == '1' or not self.can_fetch:
+                raise HttpError(404, "单词未收录")
+            snapshot = await self.fetch(word)
+        return self.cached_response(('word', snapshot.word), snapshot, lambda: word_payload(snapshot))
+
+    async def handle_mnemonics(self, request, word):
+        try:
+            limit = min(MAX_PAGE, max(1, int(request.query.get('limit', 20))))
+            offset = max(0, int(request.query.get('offset', 0)))
+        except ValueError:
+            raise HttpError(400, "limit 和 offset 必须是整数")
+        snapshot = await self.snapshot(normalize_word(word))
+        if snapshot is None:
+            raise HttpError(404, "单词未收录")
+
+        if offset + limit <= SNAPSHOT_MNEMONICS:
+            # 第一页范围内直接从快照切片
+            key = ('mnemonics', snapshot.word, limit, offset)
+            return self.cached_response(key, snapshot, lambda: word_payload(
+                snapshot, snapshot.mnemonics[offset:offset + limit])["mnemonics"])
+
+        def load():
+            with session_scope(readonly=True) as session:
+                return top_mnemonics(session, snapshot.id, limit=limit, offset=offset)
+        mnemonics = await self.run_blocking(self.db_executor, load)
+        return 200, word_payload(snapshot, mnemonics)["mnemonics"]
+
+    async def handle_batch(self, request):
+        data = request.json()
+        words = data.get("words") if isinstance(data, dict) else None
+        if not isinstance(words, list) or not all(isinstance(w, str) for w in words):
+            raise HttpError(400, "请求体需要包含单词列表 words")
+        if len(words) > MAX_BATCH:
+            raise HttpError(413, f"一次最多查询 {MAX_BATCH} 个单词")
+        words = list(dict.fromkeys(w for w in map(normalize_word, words) if w))
+
+        # 全部命中热词缓存时不进入线程池，否则未命中的单词用批量 IN 查询一次读出（不再重复查缓存）
+        found = {w: word_cache.get(w) for w in words}
+        if None in found.values():
+            found, missing = await self.run_blocking(self.db_executor, lookup_many, words, found)
+        else:
+            missing = []
+        if missing and data.get("fetch") and self.can_fetch:
+            results = await asyncio.gather(*(self.fetch(w) for w in missing), return_exceptions=True)
+            for result in results:
+                if isinstance(result, HttpError) and result.status == 503:
+                    raise result
+                if not isinstance(result, Exception):
+                    found[result.word] = result
+            missing = [w for w in words if w not in found]
+        return 200, {
+            "words": {w: word_payload(found[w]) for w in words if w in found},
+            "missing": missing
+        }
+
+    async def handle_vote(self, request, mnemonic_id):
+        data = request.json()
+        count = data.get("count", 1) if isinstance(data, dict) else None
+        if not isinstance(count, int) or not 1 <= count <= MAX_VOTE:
+            raise HttpError(400, f"count 必须是 1 到 {MAX_VOTE} 之间的整数")
+        # 合并写入：短时间内的点赞在后台线程中批量提交，立即返回
+        self.vote_service.vote(int(mnemonic_id), count)
+        return 202, {"mnemonic_id": int(mnemonic_id), "queued": count}
+
+    async def dispatch(self, request):
+        """ :return: (状态码, 响应体 bytes, 额外的响应头) """
+        allowed = []
+        for method, pattern, handler in self.routes:
+            match = pattern.fullmatch(request.path)
+            if match is None:
+                continue
+            if method != request.method:
+                allowed.append(method)
+                continue
+            result = await handler(request, **match.groupdict())
+            if isinstance(result[0], bytes):
+                # 已序列化并计算好 ETag 的缓存响应
+                body, etag = result
+                if etag_matches(request, etag):
+                    self.stats["not_modified"] += 1
+                    return 304, b'', {'ETag': etag}
+                return 200, body, {'ETag': etag}
+            status, data = result
+            body = encode_json(data)
+            if request.method == 'GET' and status == 200:
+                etag = make_etag(body)
+                if etag_matches(request, etag):
+                    self.stats["not_modified"] += 1
+                    return 304, b'', {'ETag': etag}
+                return status, body, {'ETag': etag}
+            return status, body, {}
+        if allowed:
+            raise HttpError(405, "不支持的请求方法", {'Allow': ', '.join(allowed)})
+        raise HttpError(404, "接口不存在")
+
+    async def respond(self, request):
+        try:
+            status, body, headers = await self.dispatch(request)
+        except HttpError as e:
+            status, body, headers = e.status, encode_json({"error": e.message}), e.headers
+        except Exception as e:
+            status, body, headers = 500, encode_json({"error": f"服务器内部错误: {e}"}), {}
+        self.stats["requests"] += 1
+        self.stats["status"][status] = self.stats["status"].get(status, 0) + 1
+        return status, body, headers
+
+    async def handle_connection(self, reader, writer):
+        """ 处理一个客户端连接（HTTP/1.1 长连接上的多个请求依次处理） """
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HttpError as e:
+                    await write_response(writer, e.status, encode_json({"error": e.message}), {}, False)
+                    break
+                if request is None:
+                    break
+                status, body, headers = await self.respond(request)
+                await write_response(writer, status, body, headers, request.keep_alive)
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            # 请求解析或写响应中的意外错误：尽量回复 500 后关闭连接，不让异常逃出连接回调
+            print(f"连接处理失败: {e!r}", file=sys.stderr)
+            try:
+                await write_response(writer, 500, encode_json({"error": "服务器内部错误"}), {}, False)
+            except Exception:
+                pass
+        finally:
+            writer.close()
+
+    def close(self):
+        self.vote_service.close()  # 写入尚未提交的点赞
+        self.fetch_executor.shutdown(wait=False, cancel_futures=True)
+        self.db_executor.shutdown(wait=True)
+
+
+async def read_request(reader):
+    """
+    读取一个请求
+    :return: Request，连接已关闭时返回 None
+    :raises HttpError: 请求格式错误
+    """
+    try:
+        line = await reader.readline()
+    except ValueError:
+        raise HttpError(400, "请求行过长")
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode('latin-1').split()
+    except ValueError:
+        raise HttpError(400, "无效的请求行")
+
+    headers = {}
+    while True:
+        try:
+            line = await reader.readline()
+        except ValueError:  # 超过 StreamReader 的行长度上限（LimitOverrunError）
+            raise HttpError(400, "请求头过长")
+        if line in (b'\r\n', b'\n', b''):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise HttpError(400, "请求头过多")
+        name, sep, value = line.decode('latin-1').partition(':')
+        if not sep:
+            raise HttpError(400, "无效的请求头")
+        headers[name.strip().lower()] = value.strip()
+
+    if 'transfer-encoding' in headers:
+        raise HttpError(501, "不支持分块传输的请求体")
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise HttpError(400, "无效的 Content-Length")
+    if length < 0:
+        raise HttpError(400, "无效的 Content-Length")
+    if length > MAX_BODY:
+        raise HttpError(413, "请求体过大")
+    body = await reader.readexactly(length) if length else b''
+    return Request(method.upper(), target, version, headers, body)
+
+
+async def write_response(writer, status, body, headers, keep_alive):
+    lines = [
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+        f"Content-Length: {len(body)}",
+        "Connection: " + ("keep-alive" if keep_alive else "close"),
+    ]
+    if body:
+        lines.append("Content-Type: application/json; charset=utf-8")
+    if 'ETag' in headers:
+        lines.append("Cache-Control: no-cache")  # 可以缓存，但每次使用前用 ETag 验证
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+    await writer.drain()
+
+
+async def serve(host, port, service):
+    server = await asyncio.start_server(service.handle_connection, host, port, limit=64 * 1024)
+    addresses = ', '.join(str(sock.getsockname()) for sock in server.sockets)
+    print(f"查询服务已启动: {addresses}", flush=True)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows 上由 KeyboardInterrupt 结束
+    async with server:
+        await stop.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="词典 HTTP 查询服务")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=8, help="数据库线程数（不超过连接池大小）")
+    parser.add_argument('--fetch-workers', type=int, default=4, help="在线抓取线程数")
+    parser.add_argument('--max-pending', type=int, default=256, help="排队任务上限，超过时返回 503")
+    parser.add_argument('--fetch-timeout', type=float, default=30.0, help="在线抓取的等待上限(秒)")
+    parser.add_argument('--offline', action='store_true', help="只查询本地数据，不联网")
+    args = parser.parse_args(argv)
+
+    initialize_db()
+    # 与桌面端相同：DICTIONARY_LOCAL_DICTS 配置本地词典，DICTIONARY_OFFLINE=1 时完全离线
+    spider = OnlineDictionarySpider(
+        backends=backends_from_env(),
+        offline=args.offline or os.environ.get('DICTIONARY_OFFLINE') == '1'
+    )
+    service = DictionaryService(spider, workers=args.workers, fetch_workers=args.fetch_workers,
+                                max_pending=args.max_pending, fetch_timeout=args.fetch_timeout)
+    started = time.time()
+    try:
+        asyncio.run(serve(args.host, args.port, service))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+        print(f"查询服务已停止，运行 {time.time() - started:.0f} 秒，处理 {service.stats['requests']} 个请求")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,15 +1,85 @@
 # spider.py
+import asyncio
+import os
+import queue
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, ProcessPoolExecutor, wait
 import requests
-from bs4 import BeautifulSoup
-from fake_useragent import UserAgent
-from urllib.parse import quote
+from requests.adapters import HTTPAdapter
+from rate_limit import RETRYABLE_STATUS, THROTTLE_STATUS, RetryPolicy, parse_retry_after, shared_limiter
+from parsers import DEFAULT_PARSER, parse_page
+from backends import NOT_FOUND, HtmlBackend
+from spider_cache import STATUS_OK, STATUS_MISSING, STATUS_PARSE_ERROR
+
+DEFAULT_BASE_URL = "https://dictionary.cambridge.org/dictionary/english-chinese-simplified/"
+CANCEL_POLL_INTERVAL = 0.05  # 可取消的等待中检查取消标志的间隔(秒)
+
+
+class FetchCancelled(Exception):
+    """ 抓取在等待令牌或重试前被调用方取消（例如界面查询已被新的输入取代） """
 
 class OnlineDictionarySpider:
-    def __init__(self):
-        self.ua = UserAgent()
-        self.last_request_time = 0
-        self.request_interval = 1.5  # 请求间隔(秒)
+    def __init__(self, base_url=DEFAULT_BASE_URL, request_interval=1.5, pool_size=10, cache=None,
+                 parser=DEFAULT_PARSER, limiter=None, retry_policy=None, retry_queue=None,
+                 backends=None, hedge_delay=0.0, offline=False):
+        """
+        :param base_url: 词典页面地址前缀（测试时可指向本地HTTP服务）
+        :param request_interval: 同一主机的初始平均请求间隔(秒)，之后按服务器的响应自适应调整
+        :param pool_size: 保持的长连接数量
+        :param cache: 可选的 SpiderCache，命中时不再联网
+        :param parser: 解析模式 'lxml' / 'strainer' / 'bs4'，输出完全相同
+        :param limiter: AdaptiveRateLimiter，默认使用进程内共享的限速器（所有爬虫实例共用令牌桶）
+        :param retry_policy: RetryPolicy，对 429/5xx 和网络错误退避重试
+        :param retry_queue: 可选的 RetryQueue，重试用尽的单词写入该队列
+        :param backends: 额外的数据源（见 backends.py）：本地词典最先查询；
+                         在线数据源与 base_url 指向的主数据源并行对冲，取最先返回的有效结果
+        :param hedge_delay: 主数据源超过该时间(秒)仍未返回时才启动其他在线数据源，0 表示同时启动
+        :param offline: 为 True 时只查询本地词典，不联网
+        """
+        self._ua = None  # 首次联网时才创建（加载浏览器数据文件较慢，离线查询用不到）
+        self._ua_lock = threading.Lock()
+        self.base_url = base_url
+        self.cache = cache
+        self.parser = parser
+        self.primary = HtmlBackend('cambridge', base_url, parser)
+        self._parse = self.primary.parse
+        backends = list(backends or [])
+        self.local_backends = [b for b in backends if b.local]
+        self.remote_backends = [b for b in backends if not b.local]
+        self.hedge_delay = hedge_delay
+        self.offline = offline
+        self._hedge_executor = None
+        self._request_interval = request_interval
+        # 按主机的自适应令牌桶限速，多线程/协程/爬虫实例共享
+        self.limiter = limiter if limiter is not None else shared_limiter(rate=1 / request_interval)
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.retry_queue = retry_queue
+
+        # 复用连接的 Session，避免每次查询都重新进行 TCP+TLS 握手
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.http.mount('http://', adapter)
+        self.http.mount('https://', adapter)
+
+    @property
+    def ua(self):
+        """ 随机 User-Agent 生成器 """
+        with self._ua_lock:
+            if self._ua is None:
+                from fake_useragent import UserAgent
+                self._ua = UserAgent()
+            return self._ua
+
+    @property
+    def request_interval(self):
+        """ 请求间隔(秒) """
+        return self._request_interval
+
+    @request_interval.setter
+    def request_interval(self, value):
+        self._request_interval = value
+        self.limiter.set_rate(1 / value)
 
     def _get_headers(self):
         return {
@@ -18,59 +88,535 @@ class OnlineDictionarySpider:
             'Referer': 'https://dictionary.cambridge.org/'
         }
 
-    def fetch_definition(self, word):
-        """ 主爬取方法 """
-        try:
-            # 遵守爬虫速率限制
-            time_since_last = time.time() - self.last_request_time
-            if time_since_last < self.request_interval:
-                time.sleep(self.request_interval - time_since_last)
-            
-            encoded_word = quote(word.lower())
-            url = f"https://dictionary.cambridge.org/dictionary/english-chinese-simplified/{encoded_word}"
-            
-            response = requests.get(
-                url,
-                headers=self._get_headers(),
-                timeout=10
-            )
-            response.raise_for_status()
-            
-            return self._parse_html(response.text)
-            
-        except requests.exceptions.HTTPError as e:
+    def _build_url(self, word):
+        return self.primary.url(word)
+
+    def _download(self, url):
+        """ 通过连接池下载页面（不做限速），失败时抛出 requests 异常 """
+        response = self.http.get(
+            url,
+            headers=self._get_headers(),
+            timeout=10
+        )
+        response.raise_for_status()
+        return response.text
+
+    def _retry_delay(self, url, e, attempt):
+        """
+        记录一次失败的下载，并按重试策略计算等待时间
+        :param attempt: 已失败的次数（从1开始）
+        :return: 重试前需要等待的秒数；不可重试时返回 None
+        """
+        if isinstance(e, requests.exceptions.HTTPError):
+            status = e.response.status_code
+            retry_after = parse_retry_after(e.response.headers.get('Retry-After'))
+            if status in THROTTLE_STATUS:
+                self.limiter.on_throttle(url, retry_after)
+            else:
+                self.limiter.on_failure(url)
+            if status not in RETRYABLE_STATUS:
+                return None
+        elif isinstance(e, requests.exceptions.Timeout):
+            retry_after = None
+            self.limiter.on_throttle(url)
+        elif isinstance(e, requests.exceptions.ConnectionError):
+            retry_after = None
+            self.limiter.on_failure(url)
+        else:
+            return None
+        return self.retry_policy.next_delay(attempt, retry_after)
+
+    def _sleep(self, seconds, cancelled=None):
+        """
+        等待指定时间；给出 cancelled 时每隔 CANCEL_POLL_INTERVAL 检查一次
+        :raises FetchCancelled: cancelled() 返回 True
+        """
+        if cancelled is None:
+            if seconds > 0:
+                time.sleep(seconds)
+            return
+        deadline = time.monotonic() + seconds
+        while True:
+            if cancelled():
+                raise FetchCancelled()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, CANCEL_POLL_INTERVAL))
+
+    def _fetch_page(self, url, cancelled=None):
+        """
+        限速下载页面，对 429/5xx、超时和连接错误按退避策略重试
+        :param cancelled: 可选的无参函数，返回 True 时在等待令牌或重试前中止
+        :return: 页面HTML，重试用尽后抛出最后一次的异常
+        :raises FetchCancelled: 被取消
+        """
+        self.retry_policy.on_request()
+        attempt = 0
+        while True:
+            try:
+                self._sleep(self.limiter.reserve(url), cancelled)
+            except FetchCancelled:
+                self.limiter.refund(url)  # 归还没有使用的预约，不推迟之后的查询
+                raise
+            try:
+                html = self._download(url)
+            except Exception as e:
+                attempt += 1
+                delay = self._retry_delay(url, e, attempt)
+                if delay is None:
+                    raise
+                self._sleep(delay, cancelled)
+                continue
+            self.limiter.on_success(url)
+            return html
+
+    def _handle_error(self, e):
+        """ 把抓取异常转换为统一的错误结果 """
+        if isinstance(e, requests.exceptions.HTTPError):
             if e.response.status_code == 404:
                 return {"error": "单词不存在"}
             return {"error": f"HTTP错误: {str(e)}"}
+        return {"error": f"抓取失败: {str(e)}"}
+
+    def _cached_result(self, word):
+        """ 查询缓存，未命中返回 None """
+        if self.cache is None:
+            return None
+        entry = self.cache.get(word)
+        return entry.result if entry is not None else None
+
+    def _lookup_local(self, word):
+        """ 依次查询本地词典，返回第一个有效结果，都查不到时返回 None """
+        for backend in self.local_backends:
+            try:
+                result = backend.lookup(word.strip().lower())
+            except Exception:
+                continue  # 本地词典文件损坏时继续查询其他数据源
+            if "error" not in result:
+                return result
+        return None
+
+    def _store_page(self, word, html):
+        """ 解析下载的页面，并把原始HTML和解析结果写入缓存 """
+        try:
+            result = self._parse_html(html)
         except Exception as e:
-            return {"error": f"抓取失败: {str(e)}"}
+            result = self._handle_error(e)
+        return self._store_result(word, result, html)
 
-    def _parse_html(self, html):
-        """ 解析HTML的核心方法 """
-        soup = BeautifulSoup(html, 'lxml')
-        result = {
-            "definitions": [],
-            "examples": []
-        }
+    def _store_result(self, word, result, html=None):
+        """ 把解析结果（和主数据源的原始HTML）写入缓存 """
+        if self.cache is not None:
+            status = STATUS_PARSE_ERROR if "error" in result else STATUS_OK
+            self.cache.put(word, status, result, html=html)
+        if self.retry_queue is not None:
+            self.retry_queue.remove(word)
+        return result
 
-        # 解析释义
-        definition_blocks = soup.select('.def-block')
-        for block in definition_blocks[:3]:  # 取前3个释义
-            definition = block.select_one('.def').text.strip()
-            translation = block.select_one('.trans').text.strip()
-            result["definitions"].append(f"{definition}\n{translation}")
-
-        # 解析例句
-        example_blocks = soup.select('.examp')
-        for ex in example_blocks[:2]:  # 取前2个例句
-            english = ex.select_one('.eg').text.strip()
-            chinese = ex.select_one('.trans').text.strip()
-            result["examples"].append(f"• {english}\n  {chinese}")
-
-        if not result["definitions"]:
-            return {"error": "解析失败"}
+    def _store_error(self, word, e):
+        """ 转换抓取异常；404 作为负缓存记录，其他错误（重试已用尽）写入重试队列 """
+        result = self._handle_error(e)
+        missing = isinstance(e, requests.exceptions.HTTPError) and e.response.status_code == 404
+        if missing and self.cache is not None:
+            self.cache.put(word, STATUS_MISSING, result)
+        if self.retry_queue is not None:
+            if missing:
+                self.retry_queue.remove(word)
+            else:
+                self.retry_queue.push(word, result["error"])
         return result
 
+    def fetch_definition(self, word, cancelled=None):
+        """
+        主爬取方法：本地词典 -> 缓存 -> 在线数据源
+        :param cancelled: 可选的无参函数，返回 True 时在等待令牌或重试前中止（界面查询被取代时）
+        :raises FetchCancelled: 被取消（不写缓存和重试队列）
+        """
+        local = self._lookup_local(word)
+        if local is not None:
+            return local
+        cached = self._cached_result(word)
+        if cached is not None:
+            return cached
+        if self.offline:
+            return dict(NOT_FOUND)
+        if self.remote_backends:
+            return self._fetch_hedged(word, cancelled)
+
+        try:
+            html = self._fetch_page(self._build_url(word), cancelled)
+        except FetchCancelled:
+            raise
+        except Exception as e:
+            return self._store_error(word, e)
+        return self._store_page(word, html)
+
+    def try_fetch_definition(self, word, attempt=0):
+        """
+        低优先级抓取：缓存未命中且当前没有空闲令牌时不等待；每次调用最多下载一次，
+        可重试的失败不在这里等待重试（不预支令牌、不阻塞调用线程），由调用方稍后重新调用
+        :param attempt: 该单词此前已失败的次数（由调用方记录，重新调用时传入）
+        :return: (结果, 0)；没有令牌时返回 (None, 需要等待的秒数)；
+                 可重试的失败返回 (错误结果, 重试前需要等待的秒数)
+        """
+        local = self._lookup_local(word)
+        if local is not None:
+            return local, 0.0
+        cached = self._cached_result(word)
+        if cached is not None:
+            return cached, 0.0
+        if self.offline:
+            return dict(NOT_FOUND), 0.0
+
+        url = self._build_url(word)
+        try:
+            delay = self.limiter.try_acquire(url)
+            if delay > 0:
+                return None, delay
+            if not attempt:
+                self.retry_policy.on_request()
+            html = self._download(url)
+        except Exception as e:
+            retry_delay = self._retry_delay(url, e, attempt + 1)
+            if retry_delay is not None:
+                return self._handle_error(e), max(retry_delay, 0.001)  # 大于 0 才表示稍后重试
+            return self._store_error(word, e), 0.0
+        self.limiter.on_success(url)
+        return self._store_page(word, html), 0.0
+
+    def _fetch_remote(self, backend, word, cancelled=None):
+        """ 从一个在线数据源下载并解析（不写缓存） """
+        html = self._fetch_page(backend.url(word), cancelled)
+        return backend.parse(html), html
+
+    def _fetch_hedged(self, word, cancelled=None):
+        """
+        对冲请求：主数据源和其他在线数据源并行抓取，返回最先得到的有效结果
+        （各数据源按主机分别限速；落后的请求在后台完成后丢弃）
+        """
+        if self._hedge_executor is None:
+            self._hedge_executor = ThreadPoolExecutor(max_workers=4 * (1 + len(self.remote_backends)))
+        waiting = [self.primary] + self.remote_backends
+        running = {}
+        primary_failure = None
+
+        def launch():
+            backend = waiting.pop(0)
+            running[self._hedge_executor.submit(self._fetch_remote, backend, word, cancelled)] = backend
+
+        launch()
+        if self.hedge_delay <= 0:
+            while waiting:
+                launch()
+
+        while running:
+            done, _ = wait(running, timeout=self.hedge_delay if waiting else None,
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                launch()  # 超过对冲延迟仍未返回，启动下一个数据源
+                continue
+            for future in done:
+                backend = running.pop(future)
+                try:
+                    result, html = future.result()
+                except FetchCancelled:
+                    raise  # 其他数据源的请求同样会在下一次等待前中止
+                except Exception as e:
+                    failure = e
+                else:
+                    if "error" not in result:
+                        # 只有主数据源的页面可以用缓存的 reparse 重新解析
+                        return self._store_result(word, result, html if backend is self.primary else None)
+                    failure = (result, html)
+                if backend is self.primary:
+                    primary_failure = failure
+            if not running and waiting:
+                launch()  # 已启动的数据源都失败了，继续尝试下一个
+
+        # 全部失败时按主数据源的结果处理（404 负缓存、重试队列等）
+        if isinstance(primary_failure, Exception):
+            return self._store_error(word, primary_failure)
+        result, html = primary_failure
+        return self._store_result(word, result, html)
+
+    def metrics(self):
+        """ 限速与重试指标：每个主机的当前速率、实际成功请求速率(effective_rps)等 """
+        return {
+            "hosts": self.limiter.metrics(),
+            "retries": self.retry_policy.retries,
+            "retry_queue": len(self.retry_queue) if self.retry_queue is not None else 0
+        }
+
+    def fetch_many(self, words, concurrency=4):
+        """
+        同步接口：并发抓取多个单词（见 ThreadedFetchEngine，每个并发请求占用一个线程）
+        :return: 与 words 顺序一致的结果列表
+        """
+        return asyncio.run(ThreadedFetchEngine(self, concurrency).fetch_many(words))
+
+    def _parse_html(self, html):
+        """ 解析HTML的核心方法（按 self.parser 选择解析引擎） """
+        return self._parse(html)
+
+class ThreadedFetchEngine:
+    """
+    由线程池执行下载、对外提供 asyncio 接口（fetch / fetch_many）的抓取引擎，与爬虫共享连接池和令牌桶。
+    这不是真正的异步 I/O：下载仍由阻塞的 requests 完成，每个进行中的请求占用执行器中的一个线程，
+    事件循环只负责限速等待、退避和并发控制，因此并发数受 concurrency（线程数）限制。
+    项目不依赖 aiohttp / httpx，需要上千个并发连接时应换用真正的异步 HTTP 客户端。
+    验证脚本见 benchmarks/bench_fetch_engine.py（本地替身服务器）
+    """
+
+    def __init__(self, spider, concurrency=4):
+        """
+        :param spider: OnlineDictionarySpider 实例
+        :param concurrency: 同时进行的请求上限
+        """
+        self.spider = spider
+        self.concurrency = concurrency
+
+    async def fetch(self, word, executor=None):
+        """ 抓取并解析单个单词 """
+        loop = asyncio.get_running_loop()
+        local = await loop.run_in_executor(executor, self.spider._lookup_local, word)
+        if local is not None:
+            return local
+        cached = await loop.run_in_executor(executor, self.spider._cached_result, word)
+        if cached is not None:
+            return cached
+        if self.spider.offline:
+            return dict(NOT_FOUND)
+
+        url = self.spider._build_url(word)
+        try:
+            html = await self._fetch_page(url, executor)
+        except Exception as e:
+            return self.spider._store_error(word, e)
+        return await loop.run_in_executor(executor, self.spider._store_page, word, html)
+
+    async def _fetch_page(self, url, executor):
+        """ 与 OnlineDictionarySpider._fetch_page 相同的重试逻辑，等待时不阻塞事件循环 """
+        loop = asyncio.get_running_loop()
+        self.spider.retry_policy.on_request()
+        attempt = 0
+        while True:
+            await self.spider.limiter.acquire_async(url)
+            try:
+                # requests 是阻塞的，放到线程中执行，连接由 Session 的连接池复用
+                html = await loop.run_in_executor(executor, self.spider._download, url)
+            except Exception as e:
+                attempt += 1
+                delay = self.spider._retry_delay(url, e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            self.spider.limiter.on_success(url)
+            return html
+
+    async def fetch_many(self, words):
+        """
+        并发抓取多个单词，并发数受 concurrency 限制
+        :return: 与 words 顺序一致的结果列表
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+
+        async def bounded(word):
+            async with semaphore:
+                return await self.fetch(word, executor)
+
+        try:
+            return await asyncio.gather(*(bounded(w) for w in words))
+        finally:
+            executor.shutdown(wait=False)
+
+def _parse_job(html, mode):
+    """ 在解析进程中执行的任务（必须是模块级函数才能被序列化） """
+    try:
+        return parse_page(html, mode)
+    except Exception as e:
+        return {"error": f"抓取失败: {str(e)}"}
+
+
+_DONE = object()  # 流水线各阶段之间的结束标记
+
+
+class CrawlPipeline:
+    """
+    批量爬取流水线：
+        抓取线程(I/O) -> 解析进程池(CPU) -> 单个写库线程
+    阶段之间使用有界队列，同时在途的单词总数不超过 queue_size，内存占用保持平稳
+    """
+
+    def __init__(self, spider, writer, fetchers=4, processes=None, queue_size=64, batch_size=100):
+        """
+        :param spider: OnlineDictionarySpider 实例（提供连接池、限速和缓存）
+        :param writer: 写库回调，接收 [(单词, 结果字典), ...]，只在写库线程中调用
+        :param fetchers: 抓取线程数
+        :param processes: 解析进程数，默认等于CPU核数；为 0 时在抓取线程中直接解析
+        :param queue_size: 同时在途（已开始抓取但尚未写库）的单词上限
+        :param batch_size: 每次调用 writer 的最大条数
+        """
+        self.spider = spider
+        self.writer = writer
+        self.fetchers = fetchers
+        self.processes = os.cpu_count() if processes is None else processes
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.stats = {"fetched": 0, "cached": 0, "parsed": 0, "failed": 0, "written": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def run(self, words):
+        """
+        运行流水线直到所有单词写库完成
+        :param words: 单词的可迭代对象（可以是生成器）
+        :return: 统计信息字典
+        """
+        # 在途配额：抓取前获取，写库后释放，保证各队列都不会无限增长
+        budget = threading.BoundedSemaphore(self.queue_size)
+        word_q = queue.Queue(maxsize=self.queue_size)
+        html_q = queue.Queue(maxsize=self.queue_size)
+        result_q = queue.Queue(maxsize=self.queue_size)
+        pool = ProcessPoolExecutor(max_workers=self.processes) if self.processes else None
+        errors = []
+        start = time.time()
+
+        def fail(word, stage, e):
+            """ 单词在某个阶段出错：记录错误，把失败结果交给写库线程（由它释放在途配额） """
+            self._count("failed")
+            errors.append((stage, e))
+            result_q.put((word, {"error": f"{stage}失败: {str(e)}"}, None))
+
+        def fetch_one(word):
+            cached = self.spider._lookup_local(word) or self.spider._cached_result(word)
+            if cached is not None:
+                self._count("cached")
+                result_q.put((word, cached, None))
+                return
+            if self.spider.offline:
+                self._count("failed")
+                result_q.put((word, dict(NOT_FOUND), None))
+                return
+            try:
+                html = self.spider._fetch_page(self.spider._build_url(word))
+            except Exception as e:
+                self._count("failed")
+                result_q.put((word, self.spider._store_error(word, e), None))
+                return
+            self._count("fetched")
+            if pool is None:
+                result_q.put((word, _parse_job(html, self.spider.parser), html))
+            else:
+                html_q.put((word, html))
+
+        def fetch_worker():
+            while True:
+                word = word_q.get()
+                if word is _DONE:
+                    return
+                try:
+                    fetch_one(word)
+                except Exception as e:
+                    fail(word, "抓取", e)
+
+        def on_parsed(future, word, html):
+            # 解析出错或进程池崩溃（BrokenProcessPool）时也要交出结果，否则在途配额永远不会释放
+            try:
+                result = future.result()
+            except Exception as e:
+                fail(word, "解析", e)
+                return
+            result_q.put((word, result, html))
+
+        def parse_dispatcher():
+            futures = []
+            while True:
+                item = html_q.get()
+                if item is _DONE:
+                    break
+                word, html = item
+                try:
+                    future = pool.submit(_parse_job, html, self.spider.parser)
+                except Exception as e:
+                    # 进程池已崩溃：之后的单词提交时同样失败，全部按失败处理
+                    fail(word, "解析", e)
+                    continue
+                # 在途配额保证 result_q 不会满，回调中的 put 不会阻塞
+                future.add_done_callback(lambda f, word=word, html=html: on_parsed(f, word, html))
+                futures.append(future)
+                futures = [f for f in futures if not f.done()]
+            for future in futures:
+                future.exception()  # 等待剩余任务完成
+
+        def write_worker():
+            batch = []
+            while True:
+                try:
+                    item = result_q.get(timeout=0.5)
+                except queue.Empty:
+                    item = None
+                if item is not None and item is not _DONE:
+                    word, result, html = item
+                    if html is not None:
+                        self._count("parsed")
+                        if self.spider.cache is not None:
+                            status = STATUS_PARSE_ERROR if "error" in result else STATUS_OK
+                            try:
+                                self.spider.cache.put(word, status, result, html=html)
+                            except Exception as e:
+                                errors.append(("写缓存", e))
+                    batch.append((word, result))
+                # 批次已满、队列暂时空闲或流水线结束时写库
+                if batch and (len(batch) >= self.batch_size or item is None or item is _DONE):
+                    try:
+                        self.writer(batch)
+                    except Exception as e:
+                        errors.append(("写库", e))
+                    finally:
+                        self._count("written", len(batch))
+                        for _ in batch:
+                            budget.release()
+                        batch = []
+                if item is _DONE:
+                    return
+
+        fetch_threads = [threading.Thread(target=fetch_worker, daemon=True) for _ in range(self.fetchers)]
+        dispatcher = threading.Thread(target=parse_dispatcher, daemon=True) if pool else None
+        writer_thread = threading.Thread(target=write_worker, daemon=True)
+        for t in fetch_threads:
+            t.start()
+        if dispatcher:
+            dispatcher.start()
+        writer_thread.start()
+
+        try:
+            for word in words:
+                budget.acquire()
+                word_q.put(word)
+        finally:
+            for _ in fetch_threads:
+                word_q.put(_DONE)
+            for t in fetch_threads:
+                t.join()
+            if dispatcher:
+                html_q.put(_DONE)
+                dispatcher.join()
+                pool.shutdown(wait=True)
+            result_q.put(_DONE)
+            writer_thread.join()
+
+        if errors:
+            stage, error = errors[0]
+            raise RuntimeError(f"{stage}失败（共 {len(errors)} 个错误）: {error}")
+        self.stats["elapsed"] = time.time() - start
+        return self.stats
+
 if __name__ == '__main__':
     # 测试用例
     spider = OnlineDictionarySpider()
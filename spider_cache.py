@@ -0,0 +1,235 @@
+# spider_cache.py
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+# 缓存状态
+STATUS_OK = 'ok'                    # 抓取并解析成功
+STATUS_MISSING = 'missing'          # 404，单词不存在
+STATUS_PARSE_ERROR = 'parse_error'  # 页面下载成功但解析失败
+
+CacheEntry = namedtuple('CacheEntry', ['word', 'status', 'html', 'result', 'fetched_at'])
+
+
+def normalize_key(word):
+    """ 缓存键：去掉首尾空白并统一小写 """
+    return word.strip().lower()
+
+
+class SpiderCache:
+    """
+    爬虫的磁盘缓存（SQLite 文件）
+    保存压缩后的原始HTML和解析结果，支持过期时间、按容量的LRU淘汰，
+    以及对 404 / 解析失败的负缓存
+    """
+
+    def __init__(self, path='spider_cache.db', ttl=30 * 86400, negative_ttl=86400,
+                 max_bytes=200 * 1024 * 1024, access_granularity=60):
+        """
+        :param path: 缓存文件路径
+        :param ttl: 成功结果的有效期(秒)
+        :param negative_ttl: 404 / 解析失败结果的有效期(秒)
+        :param max_bytes: 缓存内容（压缩后）的容量上限，超出后淘汰最久未访问的条目
+        :param access_granularity: 访问时间的精度(秒)：命中时记录的访问时间比这更旧才写回，
+                                   其余命中是只读的，不开启写事务
+        """
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_bytes = max_bytes
+        self.access_granularity = access_granularity
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                word TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                html BLOB,
+                result TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_pages_accessed ON pages (accessed_at)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM pages"
+        ).fetchone()[0]
+
+    def _expired(self, status, fetched_at, now):
+        ttl = self.ttl if status == STATUS_OK else self.negative_ttl
+        return now - fetched_at > ttl
+
+    def get(self, word):
+        """
+        读取缓存
+        :param word: 单词
+        :return: CacheEntry，未命中或已过期时返回 None
+        """
+        key = normalize_key(word)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, html, result, size, fetched_at, accessed_at FROM pages WHERE word = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            status, html, result, size, fetched_at, accessed_at = row
+            if self._expired(status, fetched_at, now):
+                self._conn.execute("DELETE FROM pages WHERE word = ?", (key,))
+                self._conn.commit()
+                self._total_bytes -= size
+                self.misses += 1
+                return None
+
+            if now - accessed_at > self.access_granularity:
+                # LRU 淘汰只需要粗略的访问时间，短时间内的重复命中不再写库
+                self._conn.execute("UPDATE pages SET accessed_at = ? WHERE word = ?", (now, key))
+                self._conn.commit()
+            self.hits += 1
+
+        return CacheEntry(
+            word=key,
+            status=status,
+            html=zlib.decompress(html).decode('utf-8') if html is not None else None,
+            result=json.loads(result),
+            fetched_at=fetched_at
+        )
+
+    def put(self, word, status, result, html=None):
+        """
+        写入缓存
+        :param word: 单词
+        :param status: STATUS_OK / STATUS_MISSING / STATUS_PARSE_ERROR
+        :param result: 返回给调用方的结果字典（成功结果或 {"error": ...}）
+        :param html: 原始HTML（可选，压缩保存以便日后重新解析）
+        """
+        key = normalize_key(word)
+        blob = zlib.compress(html.encode('utf-8')) if html is not None else None
+        result_json = json.dumps(result, ensure_ascii=False)
+        size = len(blob or b'') + len(result_json.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM pages WHERE word = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (word, status, html, result, size, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, status, blob, result_json, size, now, now)
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """ 超出容量时按最近访问时间淘汰（调用方需持有锁） """
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT word, size FROM pages ORDER BY accessed_at LIMIT 100"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            for word, size in rows:
+                self._conn.execute("DELETE FROM pages WHERE word = ?", (word,))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    def purge_expired(self):
+        """ 删除所有过期条目，返回删除数量 """
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM pages WHERE (status = ? AND fetched_at < ?) "
+                "OR (status != ? AND fetched_at < ?)",
+                (STATUS_OK, now - self.ttl, STATUS_OK, now - self.negative_ttl)
+            )
+            self._conn.commit()
+            self._total_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM pages"
+            ).fetchone()[0]
+            return cur.rowcount
+
+    def reparse(self, parse):
+        """
+        用新的解析函数重新解析所有缓存的页面，无需重新联网
+        :param parse: 解析函数，接收HTML返回结果字典
+        :return: (重新解析的页面数, 解析成功数)
+        """
+        with self._lock:
+            words = [w for (w,) in self._conn.execute(
+                "SELECT word FROM pages WHERE html IS NOT NULL"
+            )]
+
+        total = ok = 0
+        for word in words:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT html FROM pages WHERE word = ?", (word,)
+                ).fetchone()
+            if row is None or row[0] is None:
+                continue
+            html = zlib.decompress(row[0]).decode('utf-8')
+            try:
+                result = parse(html)
+            except Exception as e:
+                result = {"error": f"解析失败: {str(e)}"}
+            status = STATUS_PARSE_ERROR if "error" in result else STATUS_OK
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE pages SET status = ?, result = ? WHERE word = ?",
+                    (status, json.dumps(result, ensure_ascii=False), word)
+                )
+                self._conn.commit()
+            total += 1
+            ok += status == STATUS_OK
+        return total, ok
+
+    def stats(self):
+        """ 缓存统计信息 """
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM pages GROUP BY status"
+            ).fetchall())
+        return {
+            "entries": sum(counts.values()),
+            "by_status": counts,
+            "bytes": self._total_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="爬虫缓存维护工具")
+    parser.add_argument('command', choices=['stats', 'purge', 'reparse'])
+    parser.add_argument('--path', default='spider_cache.db', help="缓存文件路径")
+    parser.add_argument('--parser', default='lxml', help="reparse 使用的解析模式")
+    args = parser.parse_args()
+
+    cache = SpiderCache(args.path)
+    if args.command == 'stats':
+        print(cache.stats())
+    elif args.command == 'purge':
+        print(f"已删除 {cache.purge_expired()} 个过期条目")
+    else:
+        from parsers import get_parser
+        total, ok = cache.reparse(get_parser(args.parser))
+        print(f"重新解析 {total} 个页面，成功 {ok} 个")
+    cache.close()
@@ -0,0 +1,308 @@
+# word_index.py
+import itertools
+import json
+import os
+import threading
+from bisect import bisect_left, insort
+
+
+class PrefixIndex:
+    """
+    单词前缀索引（内存中的有序数组 + 二分查找），用于搜索框自动补全
+    首次查询时才从数据库加载，之后由写入路径增量更新
+    """
+
+    def __init__(self, loader):
+        """
+        :param loader: 无参函数，返回全部单词的可迭代对象（首次使用时调用）
+        """
+        self._loader = loader
+        self._words = None
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        if self._words is None:
+            self._words = sorted(set(self._loader()))
+        return self._words
+
+    @property
+    def loaded(self):
+        return self._words is not None
+
+    def add(self, word):
+        """ 增量加入新单词（索引尚未加载时忽略，加载时会从数据库读到） """
+        with self._lock:
+            if self._words is None:
+                return
+            i = bisect_left(self._words, word)
+            if i == len(self._words) or self._words[i] != word:
+                insort(self._words, word, lo=i)
+
+    def reset(self):
+        """ 丢弃索引，下次查询时重新加载 """
+        with self._lock:
+            self._words = None
+
+    def complete(self, prefix, limit=10):
+        """
+        返回以 prefix 开头的前 limit 个单词（按字母顺序）
+        :param prefix: 前缀（应已规范化为小写）
+        :param limit: 最多返回的数量
+        """
+        if not prefix:
+            return []
+        with self._lock:
+            words = self._ensure_loaded()
+            i = bisect_left(words, prefix)
+            result = []
+            while i < len(words) and len(result) < limit and words[i].startswith(prefix):
+                result.append(words[i])
+                i += 1
+            return result
+
+    def __len__(self):
+        with self._lock:
+            return len(self._ensure_loaded())
+
+
+def edit_distance(a, b, max_distance):
+    """
+    Damerau-Levenshtein（OSA）编辑距离，超过 max_distance 时提前返回 max_distance + 1
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    prev_prev = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = cur[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            # 相邻字符交换算一次编辑
+            if (prev_prev is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                cur[j] = min(cur[j], prev_prev[j - 2] + 1)
+            row_min = min(row_min, cur[j])
+        if row_min > max_distance:
+            return max_distance + 1
+        prev_prev, prev = prev, cur
+    return prev[-1]
+
+
+class FuzzyIndex:
+    """
+    拼写纠错索引（SymSpell 对称删除算法）
+    预先为每个单词生成删除若干字符后的变体，查询时只需对输入做同样的删除并查表，
+    再用编辑距离校验候选。索引以 JSON 持久化到磁盘，数据库未变化时启动无需重建；
+    加载和重建可以在后台线程中进行，界面线程查询时不会被阻塞
+    """
+
+    VERSION = 2
+    FILE_CHUNK = 5000  # 删除表每行的条目数
+
+    def __init__(self, loader, path=None, fingerprint=None, max_distance=2, prefix_length=7):
+        """
+        :param loader: 无参函数，返回全部单词
+        :param path: 索引文件路径，为 None 时不持久化
+        :param fingerprint: 无参函数，返回数据库当前状态的指纹 (单词数, ...)，变化时重建索引
+        :param max_distance: 最大编辑距离
+        :param prefix_length: 只为单词前若干个字符生成删除变体，控制索引大小
+        """
+        self._loader = loader
+        self.path = path
+        self._fingerprint = fingerprint
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self._words = None  # 单词列表，删除表中保存的是下标
+        self._word_set = None
+        self._deletes = None  # 删除变体 -> 单词下标元组
+        self._dirty = False
+        self._loading = None  # 正在加载索引的后台线程
+        self._pending = []  # 加载期间新增的单词，加载完成后补入
+        self._generation = 0  # reset 之后丢弃旧的加载结果
+        self._lock = threading.Lock()
+
+    def _variants(self, key, max_distance):
+        """ 生成 key 删除至多 max_distance 个字符的全部变体（包括 key 本身） """
+        result = {key}
+        frontier = {key}
+        for _ in range(max_distance):
+            next_frontier = set()
+            for item in frontier:
+                for i in range(len(item)):
+                    next_frontier.add(item[:i] + item[i + 1:])
+            next_frontier -= result
+            result |= next_frontier
+            frontier = next_frontier
+        return result
+
+    def _index_word(self, words, deletes, word):
+        idx = len(words)
+        words.append(word)
+        for variant in self._variants(word[:self.prefix_length], self.max_distance):
+            # 用元组而不是列表：只含整数的元组会被垃圾回收器取消跟踪，
+            # 几百万个删除变体不会让完整回收（会暂停所有线程）越来越慢
+            deletes[variant] = deletes.get(variant, ()) + (idx,)
+
+    def _build(self):
+        words = []
+        deletes = {}
+        for word in sorted(set(self._loader())):
+            self._index_word(words, deletes, word)
+        return words, deletes
+
+    def _load_file(self, fingerprint):
+        """ 从磁盘读取索引，返回 (单词列表, 删除表)；文件不存在或已过期时返回 None """
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                header = json.loads(f.readline())
+                if (header.get('version') != self.VERSION
+                        or header.get('fingerprint') != (list(fingerprint) if fingerprint is not None else None)
+                        or header.get('max_distance') != self.max_distance
+                        or header.get('prefix_length') != self.prefix_length):
+                    return None
+                words = json.loads(f.readline())
+                deletes = {}
+                for line in f:
+                    deletes.update((variant, tuple(ids)) for variant, ids in json.loads(line).items())
+        except (OSError, ValueError, AttributeError):
+            return None
+        return words, deletes
+
+    def _save_file(self, fingerprint):
+        """
+        文件格式为 JSON Lines：第一行是版本和参数，第二行是单词列表，之后每行是删除表的一部分。
+        分块解析时每次只占用 GIL 很短的时间，后台加载不会让界面线程卡顿
+        """
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({
+                'version': self.VERSION,
+                'fingerprint': fingerprint,
+                'max_distance': self.max_distance,
+                'prefix_length': self.prefix_length
+            }) + '\n')
+            f.write(json.dumps(self._words, ensure_ascii=False) + '\n')
+            items = iter(self._deletes.items())
+            while True:
+                chunk = dict(itertools.islice(items, self.FILE_CHUNK))
+                if not chunk:
+                    break
+                f.write(json.dumps(chunk, ensure_ascii=False, separators=(',', ':')) + '\n')
+        os.replace(tmp_path, self.path)  # 原子替换，避免写到一半的文件
+        self._dirty = False
+
+    def _load(self, generation):
+        """ 后台线程：从磁盘加载索引，没有可用的文件时重建并保存 """
+        try:
+            fingerprint = self._fingerprint() if self._fingerprint else None
+            loaded = self._load_file(fingerprint)
+            words, deletes = loaded if loaded is not None else self._build()
+        except Exception:
+            with self._lock:
+                if generation == self._generation:
+                    self._loading = None  # 下次查询时重试
+            raise
+        with self._lock:
+            if generation != self._generation:
+                return  # 加载期间索引被重置，结果已过期
+            self._words, self._word_set, self._deletes = words, set(words), deletes
+            for word in self._pending:
+                if word not in self._word_set:
+                    self._index_word(self._words, self._deletes, word)
+                    self._word_set.add(word)
+            self._dirty = loaded is None or bool(self._pending)
+            self._pending = []
+            self._loading = None
+        if loaded is None:
+            self.save()
+
+    @property
+    def ready(self):
+        """ 索引是否已在内存中 """
+        return self._words is not None
+
+    def load_async(self):
+        """ 在后台线程中加载或重建索引（已加载或正在加载时不做任何事） """
+        with self._lock:
+            if self._words is not None or self._loading is not None:
+                return
+            self._loading = threading.Thread(
+                target=self._load, args=(self._generation,), name='fuzzy-index', daemon=True
+            )
+            self._loading.start()
+
+    def add(self, word):
+        """ 增量加入新单词（索引尚未加载时忽略，正在加载时等加载完成后补入） """
+        with self._lock:
+            if self._words is None:
+                if self._loading is not None:
+                    self._pending.append(word)
+                return
+            if word in self._word_set:
+                return
+            self._index_word(self._words, self._deletes, word)
+            self._word_set.add(word)
+            self._dirty = True
+
+    def reset(self):
+        """ 丢弃内存中的索引，下次查询时按指纹重新加载或重建 """
+        with self._lock:
+            self._words = self._word_set = self._deletes = None
+            self._dirty = False
+            self._loading = None
+            self._pending = []
+            self._generation += 1
+
+    def save(self):
+        """ 有增量更新时把索引写回磁盘（写入较慢，界面应在后台线程中调用） """
+        with self._lock:
+            if not (self._dirty and self.path and self._words is not None):
+                return
+            fingerprint = self._fingerprint() if self._fingerprint else None
+            # 其他进程同时写过数据库时不保存，下次启动重建即可
+            if fingerprint is None or fingerprint[0] == len(self._words):
+                self._save_file(fingerprint)
+
+    def suggest(self, term, limit=5, wait=True):
+        """
+        查找与 term 编辑距离不超过 max_distance 的单词
+        :param term: 输入的单词（应已规范化为小写）
+        :param limit: 最多返回的候选数量
+        :param wait: 为 False 时不等待：索引尚未就绪（或正被其他线程使用）则在后台开始加载并返回空列表
+        :return: 按 (编辑距离, 单词) 排序的候选单词列表，不包括 term 本身
+        """
+        if not term:
+            return []
+        if not self.ready:
+            self.load_async()
+            if not wait:
+                return []
+            loading = self._loading
+            if loading is not None:
+                loading.join()
+        if not self._lock.acquire(blocking=wait):
+            return []
+        try:
+            if self._words is None:
+                return []
+            term_prefix = term[:self.prefix_length]
+            found = {}
+            checked = set()
+            for variant in self._variants(term_prefix, self.max_distance):
+                for idx in self._deletes.get(variant, ()):
+                    if idx in checked:
+                        continue
+                    checked.add(idx)
+                    word = self._words[idx]
+                    if word == term:
+                        continue
+                    distance = edit_distance(term, word, self.max_distance)
+                    if distance <= self.max_distance:
+                        found[word] = distance
+        finally:
+            self._lock.release()
+        return sorted(found, key=lambda w: (found[w], w))[:limit]